@@ -0,0 +1,161 @@
+"""Comandos de mantenimiento.
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m app.cli migrate
+    python -m app.cli check-plans
+    python -m app.cli reconcile-counters [--dry-run]
+    python -m app.cli archive-completed [--batch-size N]
+    python -m app.cli import-missions ARCHIVO [--format jsonl|csv] [--chunk-size N]
+    python -m app.cli rebuild-stats [--batch-size N]
+"""
+import argparse
+import sys
+from contextlib import contextmanager
+
+
+@contextmanager
+def _database():
+    """Motor y fábrica de sesiones de la base configurada (RPG_DATABASE_URL), cerrados al terminar"""
+    from app.config import settings
+    from app.database import create_db_engine, create_session_factory
+
+    engine = create_db_engine(settings.database_url, settings)
+    try:
+        yield engine, create_session_factory(engine)
+    finally:
+        engine.dispose()
+
+
+def migrate(args) -> int:
+    from app.migrations import run_migrations
+
+    with _database() as (engine, SessionLocal):
+        run_migrations(engine)
+    print("Esquema actualizado")
+    return 0
+
+
+def check_plans(args) -> int:
+    from app.query_plans import check_query_plans
+
+    return 1 if check_query_plans() else 0
+
+
+def reconcile_counters(args) -> int:
+    from app.maintenance import reconcile_counters as reconcile
+
+    with _database() as (engine, SessionLocal), SessionLocal() as db:
+        drift = reconcile(db, fix=not args.dry_run)
+
+    for row in drift:
+        print(
+            f"personaje {row.character_id}: "
+            f"mission_count {row.stored_mission_count} -> {row.actual_mission_count}, "
+            f"pending_missions {row.stored_pending_missions} -> {row.actual_pending_missions}"
+        )
+    action = "detectados" if args.dry_run else "corregidos"
+    print(f"{len(drift)} personajes con contadores desfasados ({action})")
+    return 0
+
+
+def archive_completed(args) -> int:
+    from app.maintenance import archive_completed as archive
+
+    with _database() as (engine, SessionLocal), SessionLocal() as db:
+        moved = archive(db, batch_size=args.batch_size)
+
+    print(f"{moved} misiones completadas movidas al historial")
+    return 0
+
+
+def import_missions(args) -> int:
+    from app.importer import guess_format, import_missions as load, parse_rows
+
+    format = args.format or guess_format(args.path)
+    # newline="": los campos CSV entre comillas pueden contener saltos de línea
+    source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8-sig", newline="")
+    try:
+        with _database() as (engine, SessionLocal), SessionLocal() as db:
+            summary = load(db, parse_rows(source, format), chunk_size=args.chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    for error in summary.errors:
+        print(f"línea {error.line}: {error.error}")
+    if summary.failed > len(summary.errors):
+        print(f"... y {summary.failed - len(summary.errors)} errores más")
+    print(f"{summary.imported} misiones importadas, {summary.failed} filas rechazadas")
+    return 1 if summary.failed else 0
+
+
+def rebuild_stats(args) -> int:
+    from app.migrations import run_migrations
+    from app.stats import rebuild_stats as rebuild
+
+    with _database() as (engine, SessionLocal):
+        # Una base anterior a las estadísticas todavía no tiene sus tablas
+        run_migrations(engine)
+        with SessionLocal() as db:
+            result = rebuild(db, batch_size=args.batch_size)
+
+    print(
+        f"{result.entries} entradas leídas: estadísticas de {result.characters} personajes, "
+        f"{result.missions} misiones, {result.difficulties} dificultades y {result.days} días"
+    )
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser(
+        "migrate", help="Crea tablas e índices que falten en la base configurada"
+    ).set_defaults(func=migrate)
+    subparsers.add_parser(
+        "check-plans", help="Falla si alguna consulta caliente hace un SCAN completo"
+    ).set_defaults(func=check_plans)
+
+    reconcile_parser = subparsers.add_parser(
+        "reconcile-counters", help="Recalcula los contadores de misiones de cada personaje"
+    )
+    reconcile_parser.add_argument(
+        "--dry-run", action="store_true", help="Solo informar las diferencias, sin corregirlas"
+    )
+    reconcile_parser.set_defaults(func=reconcile_counters)
+
+    archive_parser = subparsers.add_parser(
+        "archive-completed", help="Mueve al historial las misiones completadas que quedan en la cola"
+    )
+    archive_parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Entradas movidas por transacción"
+    )
+    archive_parser.set_defaults(func=archive_completed)
+
+    import_parser = subparsers.add_parser(
+        "import-missions", help="Importa misiones desde un archivo JSON Lines o CSV"
+    )
+    import_parser.add_argument("path", help="Archivo a importar (- para leer de la entrada estándar)")
+    import_parser.add_argument(
+        "--format", choices=["jsonl", "csv"], help="Por defecto según la extensión del archivo"
+    )
+    import_parser.add_argument(
+        "--chunk-size", type=int, default=1000, help="Filas validadas e insertadas por transacción"
+    )
+    import_parser.set_defaults(func=import_missions)
+
+    stats_parser = subparsers.add_parser(
+        "rebuild-stats", help="Reconstruye las tablas de estadísticas desde la cola y el historial"
+    )
+    stats_parser.add_argument(
+        "--batch-size", type=int, default=10_000, help="Filas leídas por vuelta del cursor"
+    )
+    stats_parser.set_defaults(func=rebuild_stats)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,143 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from dotenv import load_dotenv
+
+# Variables de un archivo .env (si existe) sin pisar las del entorno
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+# PRAGMAs aplicados a cada conexión SQLite nueva según RPG_SQLITE_PROFILE.
+# - stock: valores de fábrica de SQLite (journal rollback, synchronous=FULL, sin espera por bloqueo)
+# - wal: WAL (los lectores no bloquean al escritor) y espera por bloqueo, sin tocar la durabilidad
+# - tuned: WAL + synchronous=NORMAL (un commit no hace fsync; ante un corte de luz se pueden
+#   perder las últimas transacciones, nunca se corrompe la base) y cachés más grandes
+SQLITE_PROFILES: Dict[str, Dict[str, Union[int, str]]] = {
+    "stock": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "busy_timeout": 5000,
+    },
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,  # negativo = KiB, ~64 MB por conexión
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+
+# Calentamiento al arrancar (RPG_WARMUP): cargar la clasificación y el catálogo y abrir el pool.
+# - background: en segundo plano; la app atiende peticiones mientras tanto
+# - blocking: antes de aceptar la primera petición
+# - off: nada; cada estructura se llena con las primeras peticiones que la usan
+WARMUP_MODES = ("background", "blocking", "off")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Configuración de la aplicación leída de variables de entorno (prefijo RPG_)"""
+    database_url: str = "sqlite:///./rpg_missions.db"
+    # Modo async: routers async sobre AsyncSession en lugar de routers sync en el threadpool
+    use_async: bool = False
+    # Por defecto se deriva de database_url con el driver async equivalente
+    async_database_url: Optional[str] = None
+    # Pool de conexiones (QueuePool); se ignora en SQLite en memoria
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    # PRAGMAs de SQLite: perfil base más ajustes individuales (None = valor del perfil)
+    sqlite_profile: str = "tuned"
+    sqlite_journal_mode: Optional[str] = None
+    sqlite_synchronous: Optional[str] = None
+    sqlite_cache_size: Optional[int] = None
+    sqlite_mmap_size: Optional[int] = None
+    sqlite_temp_store: Optional[str] = None
+    sqlite_busy_timeout: Optional[int] = None
+    # Métricas por petición en /metrics y log de consultas más lentas que slow_query_ms (None = desactivado)
+    metrics_enabled: bool = True
+    slow_query_ms: Optional[int] = None
+    # Caché en memoria de las colas (MissionQueueCache); apagada por defecto, ver AppServices
+    queue_cache: bool = False
+    # Group commit: las escrituras de las colas se agrupan en una transacción por lote (solo modo sync)
+    group_commit: bool = False
+    group_commit_max_batch: int = 64
+    group_commit_max_delay_ms: int = 2
+    # Arranque: migrar el esquema (si no, solo se comprueba que esté al día) y modo de calentamiento
+    migrate_on_startup: bool = True
+    warmup: str = "background"
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            database_url=os.getenv("RPG_DATABASE_URL", cls.database_url),
+            use_async=_env_bool("RPG_ASYNC", cls.use_async),
+            async_database_url=os.getenv("RPG_ASYNC_DATABASE_URL"),
+            pool_size=_env_int("RPG_POOL_SIZE", cls.pool_size),
+            max_overflow=_env_int("RPG_MAX_OVERFLOW", cls.max_overflow),
+            pool_timeout=_env_int("RPG_POOL_TIMEOUT", cls.pool_timeout),
+            sqlite_profile=os.getenv("RPG_SQLITE_PROFILE", cls.sqlite_profile).strip().lower(),
+            sqlite_journal_mode=os.getenv("RPG_SQLITE_JOURNAL_MODE"),
+            sqlite_synchronous=os.getenv("RPG_SQLITE_SYNCHRONOUS"),
+            sqlite_cache_size=_env_int("RPG_SQLITE_CACHE_SIZE", None),
+            sqlite_mmap_size=_env_int("RPG_SQLITE_MMAP_SIZE", None),
+            sqlite_temp_store=os.getenv("RPG_SQLITE_TEMP_STORE"),
+            sqlite_busy_timeout=_env_int("RPG_SQLITE_BUSY_TIMEOUT", None),
+            metrics_enabled=_env_bool("RPG_METRICS", cls.metrics_enabled),
+            slow_query_ms=_env_int("RPG_SLOW_QUERY_MS", None),
+            queue_cache=_env_bool("RPG_QUEUE_CACHE", cls.queue_cache),
+            group_commit=_env_bool("RPG_GROUP_COMMIT", cls.group_commit),
+            group_commit_max_batch=_env_int("RPG_GROUP_COMMIT_MAX_BATCH", cls.group_commit_max_batch),
+            group_commit_max_delay_ms=_env_int("RPG_GROUP_COMMIT_MAX_DELAY_MS", cls.group_commit_max_delay_ms),
+            migrate_on_startup=_env_bool("RPG_MIGRATE_ON_STARTUP", cls.migrate_on_startup),
+            warmup=os.getenv("RPG_WARMUP", cls.warmup).strip().lower(),
+        )
+
+    @property
+    def sqlite_pragmas(self) -> Dict[str, Union[int, str]]:
+        """PRAGMAs a aplicar en cada conexión SQLite: el perfil con los ajustes individuales encima"""
+        if self.sqlite_profile not in SQLITE_PROFILES:
+            raise ValueError(
+                f"Unknown RPG_SQLITE_PROFILE '{self.sqlite_profile}' (expected one of: {', '.join(SQLITE_PROFILES)})"
+            )
+        pragmas = dict(SQLITE_PROFILES[self.sqlite_profile])
+        overrides = {
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "cache_size": self.sqlite_cache_size,
+            "mmap_size": self.sqlite_mmap_size,
+            "temp_store": self.sqlite_temp_store,
+            "busy_timeout": self.sqlite_busy_timeout,
+        }
+        pragmas.update({name: value for name, value in overrides.items() if value is not None})
+        return pragmas
+
+    @property
+    def resolved_async_database_url(self) -> str:
+        if self.async_database_url:
+            return self.async_database_url
+        if self.database_url.startswith("sqlite://"):
+            return "sqlite+aiosqlite://" + self.database_url[len("sqlite://"):]
+        if self.database_url.startswith("postgresql://"):
+            return "postgresql+asyncpg://" + self.database_url[len("postgresql://"):]
+        return self.database_url
+
+
+settings = Settings.from_env()
\ No newline at end of file
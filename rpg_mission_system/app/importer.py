@@ -0,0 +1,135 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.models.mission import Mission
+from app.schemas.mission import MissionCreate
+
+# Filas validadas e insertadas por transacción
+IMPORT_CHUNK_SIZE = 1000
+
+# Errores guardados en el resumen; los siguientes solo se cuentan
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = ("jsonl", "csv")
+
+
+class RowError(NamedTuple):
+    """Fila rechazada; line es la línea del archivo (en CSV, la del encabezado es la 1)"""
+    line: int
+    error: str
+
+
+@dataclass
+class ImportSummary:
+    """Resultado de una importación; guarda a lo sumo max_errors errores para no crecer con el archivo"""
+    imported: int = 0
+    failed: int = 0
+    errors: List[RowError] = field(default_factory=list)
+    max_errors: int = MAX_REPORTED_ERRORS
+
+    def fail(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(RowError(line, error))
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": [error._asdict() for error in self.errors],
+        }
+
+
+def guess_format(name: str) -> str:
+    """Formato según la extensión o el Content-Type: csv, o JSON Lines para todo lo demás"""
+    return "csv" if name.lower().rstrip().endswith("csv") else "jsonl"
+
+
+def parse_rows(lines: Iterable[str], format: str) -> Iterator[Tuple[int, Union[dict, RowError]]]:
+    """(línea, fila) por cada registro del archivo, leyendo de a una línea.
+
+    lines debe conservar los saltos de línea (un archivo abierto con newline=""),
+    así un campo CSV entre comillas puede ocupar varias líneas. Las líneas que no
+    se pueden interpretar llegan como RowError.
+    """
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            yield number, RowError(number, f"Invalid JSON: {exc}")
+
+
+def import_missions(
+    db: Session,
+    rows: Iterable[Tuple[int, Union[dict, RowError]]],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    summary: Optional[ImportSummary] = None
+) -> ImportSummary:
+    """Valida las filas con MissionCreate e inserta las válidas, un bloque por transacción.
+
+    Cada bloque se inserta con un solo executemany. Una fila inválida se cuenta en
+    el resumen y no detiene la carga; la memoria usada no depende del tamaño del
+    archivo. Los triggers de missions_fts indexan las misiones nuevas.
+    """
+    summary = summary if summary is not None else ImportSummary()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return summary
+        _import_chunk(db, chunk, summary)
+
+
+def _import_chunk(db: Session, chunk, summary: ImportSummary) -> None:
+    valid = []
+    for line, row in chunk:
+        if isinstance(row, RowError):
+            summary.fail(row.line, row.error)
+            continue
+        try:
+            valid.append((line, MissionCreate.model_validate(row).model_dump()))
+        except ValidationError as exc:
+            summary.fail(line, _describe(exc))
+    if not valid:
+        return
+
+    # insert() sobre la tabla: executemany de Core, sin el camino de inserción masiva del ORM
+    missions = Mission.__table__
+    try:
+        db.execute(insert(missions), [values for line, values in valid])
+        db.commit()
+        summary.imported += len(valid)
+        return
+    except DBAPIError:
+        db.rollback()
+
+    # El bloque falló en la base: fila por fila para aislar las que fallan
+    for line, values in valid:
+        try:
+            db.execute(insert(missions), [values])
+            db.commit()
+            summary.imported += 1
+        except DBAPIError as exc:
+            db.rollback()
+            summary.fail(line, str(getattr(exc, "orig", None) or exc))
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
\ No newline at end of file
@@ -1,34 +1,199 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.routers import characters, missions
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Create FastAPI app
-app = FastAPI(
-    title="Sistema de Misiones RPG",  # Título en español
-    description="Sistema para gestionar misiones en juegos RPG usando una estructura de datos Cola (FIFO)",
-    version="0.1.0"
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # For development - restrict in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(characters.router)
-app.include_router(missions.router)
-
-@app.get("/")
-def read_root():
-    return {
-        "message": "Bienvenido al Sistema de Misiones RPG",
-        "docs": "/docs"
-    }
\ No newline at end of file
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from app.config import WARMUP_MODES, Settings, settings
+from app.database import create_async_db_engine, create_async_session_factory, create_db_engine, create_session_factory
+from app.metrics import MetricsMiddleware, MetricsRegistry
+from app.migrations import prepare_database
+from app.routers import characters, events, export, imports, leaderboard, missions, stats
+from app.services import AppServices
+from app.tda.queue import MissionQueueCache
+
+warmup_logger = logging.getLogger("app.warmup")
+
+
+def _pool_size(engine) -> int:
+    """Conexiones a abrir al calentar: el pool fijo, o una si el pool no tiene tamaño (SQLite en memoria)"""
+    return engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+
+
+def _load_caches(services: AppServices, SessionLocal) -> None:
+    with SessionLocal() as db:
+        services.leaderboard.load(db)
+        services.catalog.load(db)
+
+
+def _prime_pool(engine) -> None:
+    """Abre a la vez hasta pool_size conexiones y las devuelve al pool (con los PRAGMAs ya aplicados)"""
+    connections = []
+    try:
+        for _ in range(_pool_size(engine)):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def _prime_async_pool(engine) -> None:
+    connections = []
+    try:
+        for _ in range(_pool_size(engine.sync_engine)):
+            connections.append(await engine.connect())
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+async def _warm_up(services: AppServices, SessionLocal, engine, async_engine) -> None:
+    """Clasificación y catálogo cargados y pool abierto antes de que los pidan las peticiones.
+
+    Seguro en segundo plano: Leaderboard.load() toma su lock (una petición que llegue
+    antes espera la carga en ensure_loaded) y el catálogo solo agrega misiones.
+    """
+    await run_in_threadpool(_load_caches, services, SessionLocal)
+    await run_in_threadpool(_prime_pool, engine)
+    if async_engine is not None:
+        await _prime_async_pool(async_engine)
+
+
+async def _warm_up_in_background(*args) -> None:
+    try:
+        await _warm_up(*args)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        # Sin calentamiento la app sigue funcionando: las estructuras se llenan con las peticiones
+        warmup_logger.exception("Warm-up failed")
+
+
+def create_app(config: Settings = settings) -> FastAPI:
+    """Crea la app con sus propios servicios en memoria; no toca la base hasta arrancar.
+
+    El motor, las comprobaciones de versión y esquema (con la migración), el
+    calentamiento y el group commit viven en el lifespan: importar este módulo o
+    crear la app no abre conexiones, y cada app creada en el mismo proceso (ej. una
+    por test) tiene su propio motor, cachés, clasificación y suscriptores.
+    """
+    if config.warmup not in WARMUP_MODES:
+        raise ValueError(f"Unknown RPG_WARMUP '{config.warmup}' (expected one of: {', '.join(WARMUP_MODES)})")
+    services = AppServices(queue_cache=MissionQueueCache() if config.queue_cache else None)
+
+    # Per-route latency, in-flight requests and SQL statements per request (+ opt-in slow-query log)
+    metrics = None
+    if config.metrics_enabled or config.slow_query_ms is not None:
+        metrics = MetricsRegistry(
+            slow_query_seconds=config.slow_query_ms / 1000 if config.slow_query_ms is not None else None
+        )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        engine = create_db_engine(config.database_url, config)
+        app.state.SessionLocal = create_session_factory(engine, services.session_info)
+        async_engine = None
+        if config.use_async:
+            async_engine = create_async_db_engine(config)
+            app.state.AsyncSessionLocal = create_async_session_factory(async_engine, services.session_info)
+        if metrics is not None:
+            metrics.instrument_engine(engine)
+            if async_engine is not None:
+                metrics.instrument_engine(async_engine.sync_engine)
+
+        warmup = None
+        try:
+            # Create database tables (and upgrade existing database files), or only check them
+            await run_in_threadpool(prepare_database, engine, config.migrate_on_startup)
+
+            # Group commit: queue writes from the sync routers are applied in shared transactions
+            if config.group_commit and not config.use_async:
+                services.group_commit.max_batch = config.group_commit_max_batch
+                services.group_commit.max_delay = config.group_commit_max_delay_ms / 1000
+                services.group_commit.start(engine, services.session_info)
+
+            warmup_args = (services, app.state.SessionLocal, engine, async_engine)
+            if config.warmup == "blocking":
+                await _warm_up(*warmup_args)
+            elif config.warmup == "background":
+                warmup = asyncio.create_task(_warm_up_in_background(*warmup_args))
+            yield
+        finally:
+            if warmup is not None and not warmup.done():
+                warmup.cancel()
+                try:
+                    await warmup
+                except asyncio.CancelledError:
+                    pass
+            # Apply the pending writes before exiting
+            services.group_commit.stop()
+            if async_engine is not None:
+                await async_engine.dispose()
+            engine.dispose()
+
+    # Create FastAPI app
+    app = FastAPI(
+        title="Sistema de Misiones RPG",  # Título en español
+        description="Sistema para gestionar misiones en juegos RPG usando una estructura de datos Cola (FIFO)",
+        version="0.1.0",
+        lifespan=lifespan
+    )
+    app.state.settings = config
+    app.state.services = services
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # For development - restrict in production
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    if metrics is not None:
+        # Added last so it wraps every other middleware and measures the whole request
+        app.add_middleware(MetricsMiddleware, registry=metrics)
+
+    # Include routers
+    if config.use_async:
+        # Async routers: same endpoints served from the event loop with an AsyncSession
+        from app.routers import async_characters, async_missions
+        app.include_router(async_characters.router)
+        app.include_router(async_missions.router)
+    else:
+        app.include_router(characters.router)
+        app.include_router(missions.router)
+    app.include_router(export.router)
+    # Bulk import (async in both modes; the rows are written from a worker thread)
+    app.include_router(imports.router)
+    # Server-Sent Events per character (async in both modes)
+    app.include_router(events.router)
+    # In-memory leaderboard, updated by the completion paths after each commit
+    app.include_router(leaderboard.router)
+    # Analytics rollups, kept up to date by the accept, complete and cancel paths
+    app.include_router(stats.router)
+
+    @app.get("/")
+    def read_root():
+        return {
+            "message": "Bienvenido al Sistema de Misiones RPG",
+            "docs": "/docs"
+        }
+
+    if config.metrics_enabled:
+        @app.get("/metrics", include_in_schema=False)
+        def read_metrics():
+            """Prometheus text exposition of the request and SQL metrics"""
+            body = metrics.render() + services.events.render()
+            if services.group_commit.running:
+                body += services.group_commit.render()
+            return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+    return app
+
+
+# App con la configuración del entorno (uvicorn app.main:app); crearla no abre la base
+app = create_app()
\ No newline at end of file
@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import List, NamedTuple
+
+from sqlalchemy import case, delete, func, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.models.character import Character
+from app.models.character_mission import CharacterMission
+from app.models.character_mission_history import CharacterMissionHistory
+from app.tda.queue import ACTIVE_STATUSES
+
+# Entradas movidas al historial por transacción en archive_completed()
+ARCHIVE_BATCH_SIZE = 1000
+
+
+class CounterDrift(NamedTuple):
+    """Diferencia entre los contadores guardados y los reales de un personaje"""
+    character_id: int
+    stored_mission_count: int
+    actual_mission_count: int
+    stored_pending_missions: int
+    actual_pending_missions: int
+
+
+def reconcile_counters(db: Session, fix: bool = True) -> List[CounterDrift]:
+    """Recalcula mission_count y pending_missions de todos los personajes en bloque.
+
+    Una sola agregación sobre character_missions y el historial detecta los
+    personajes con diferencias; si fix es True se corrigen en la misma transacción.
+    """
+    entries = union_all(
+        select(
+            CharacterMission.character_id,
+            case((CharacterMission.status.in_(ACTIVE_STATUSES), 1), else_=0).label("active")
+        ),
+        select(CharacterMissionHistory.character_id, literal(0).label("active"))
+    ).subquery()
+    totals = select(
+        entries.c.character_id,
+        func.count().label("total"),
+        func.sum(entries.c.active).label("active")
+    ).group_by(entries.c.character_id).subquery()
+    actual_total = func.coalesce(totals.c.total, 0)
+    actual_active = func.coalesce(totals.c.active, 0)
+
+    drift = [
+        CounterDrift(*row) for row in db.execute(
+            select(
+                Character.id,
+                Character.mission_count,
+                actual_total,
+                Character.pending_missions,
+                actual_active
+            ).outerjoin(
+                totals, totals.c.character_id == Character.id
+            ).where(
+                (Character.mission_count != actual_total) | (Character.pending_missions != actual_active)
+            ).order_by(Character.id)
+        )
+    ]
+
+    if fix and drift:
+        db.execute(update(Character), [
+            {
+                "id": row.character_id,
+                "mission_count": row.actual_mission_count,
+                "pending_missions": row.actual_pending_missions
+            }
+            for row in drift
+        ])
+        db.commit()
+
+    return drift
+
+
+def archive_completed(db: Session, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Mueve al historial las entradas completadas que siguen en character_missions.
+
+    Las completadas antes de existir el historial quedaron en la tabla de la cola.
+    Se recorren por id en bloques de batch_size, cada uno en su propia transacción,
+    conservando las fechas originales. Devuelve cuántas entradas se movieron.
+    """
+    moved = 0
+    last_id = 0
+    while True:
+        ids = list(db.scalars(
+            select(CharacterMission.id).where(
+                CharacterMission.id > last_id,
+                CharacterMission.status == "completed"
+            ).order_by(CharacterMission.id).limit(batch_size)
+        ))
+        if not ids:
+            return moved
+        try:
+            # Las filas pasan por Python para guardar las fechas con el mismo formato que el resto
+            now = datetime.utcnow()
+            rows = db.execute(
+                delete(CharacterMission)
+                .where(CharacterMission.id.in_(ids), CharacterMission.status == "completed")
+                .returning(*CharacterMission.__table__.columns)
+                .execution_options(synchronize_session=False)
+            ).all()
+            if rows:
+                db.execute(insert(CharacterMissionHistory), [
+                    {
+                        **row._mapping,
+                        "accepted_at": row.accepted_at or row.completed_at or now,
+                        "completed_at": row.completed_at or row.accepted_at or now,
+                    }
+                    for row in rows
+                ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        moved += len(rows)
+        last_id = ids[-1]
\ No newline at end of file
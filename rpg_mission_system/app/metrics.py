@@ -0,0 +1,212 @@
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+# Límites de los histogramas (mismos valores por defecto que los clientes de Prometheus)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+# Rutas sin coincidencia (404) se agrupan para no crear una serie por URL
+UNMATCHED_ROUTE = "unmatched"
+# Longitud máxima de sentencia/parámetros en el log de consultas lentas
+SLOW_QUERY_MAX_CHARS = 2000
+
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+
+class Histogram:
+    """Histograma acumulativo al estilo Prometheus (cuentas por límite superior, suma y total)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+
+class RequestStats:
+    """Sentencias SQL ejecutadas durante una petición"""
+    __slots__ = ("scope", "statements", "sql_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # FastAPI deja la ruta resuelta en scope["route"] antes de llamar al endpoint
+        return getattr(self.scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+# Estadísticas de la petición en curso. El threadpool de FastAPI y el greenlet de las
+# AsyncSession heredan el contexto, así las sentencias de ambos modos se suman al mismo objeto.
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("rpg_current_request", default=None)
+
+
+class MetricsRegistry:
+    """Métricas de peticiones HTTP y de SQL por ruta, exportadas en formato texto de Prometheus"""
+
+    def __init__(self, slow_query_seconds: Optional[float] = None):
+        self.slow_query_seconds = slow_query_seconds
+        self._lock = Lock()
+        self._in_flight = 0
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._statements: Dict[Tuple[str, str], Histogram] = {}
+        self._sql_seconds: Dict[Tuple[str, str], float] = {}
+        self._slow_queries: Dict[str, int] = {}
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self._in_flight -= 1
+            self._requests[(method, route, status)] = self._requests.get((method, route, status), 0) + 1
+            self._latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self._statements.setdefault(key, Histogram(STATEMENT_BUCKETS)).observe(stats.statements)
+            self._sql_seconds[key] = self._sql_seconds.get(key, 0.0) + stats.sql_seconds
+
+    def statement_executed(self, seconds: float, statement: str, parameters) -> None:
+        """Suma la sentencia a la petición en curso y la registra si supera el umbral de lentitud"""
+        stats = _current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.sql_seconds += seconds
+        if self.slow_query_seconds is not None and seconds >= self.slow_query_seconds:
+            route = stats.route if stats is not None else None
+            with self._lock:
+                self._slow_queries[route or ""] = self._slow_queries.get(route or "", 0) + 1
+            slow_query_logger.warning(
+                "Slow query (%.1f ms) route=%s statement=%s parameters=%s",
+                seconds * 1000, route or "-",
+                " ".join(statement.split())[:SLOW_QUERY_MAX_CHARS], repr(parameters)[:SLOW_QUERY_MAX_CHARS],
+            )
+
+    def instrument_engine(self, engine) -> None:
+        """Cuenta y cronometra cada sentencia ejecutada por el motor (sync) indicado"""
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("rpg_query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["rpg_query_started"].pop()
+            self.statement_executed(time.perf_counter() - started, statement, parameters)
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(exception_context):
+            # Una sentencia que falla no pasa por after_cursor_execute
+            connection = exception_context.connection
+            if connection is not None and connection.info.get("rpg_query_started"):
+                connection.info["rpg_query_started"].pop()
+
+    def render(self) -> str:
+        """Métricas en formato de exposición de texto de Prometheus"""
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP rpg_http_requests_in_flight Requests currently being served",
+                "# TYPE rpg_http_requests_in_flight gauge",
+                f"rpg_http_requests_in_flight {self._in_flight}",
+                "# HELP rpg_http_requests_total Requests served by route and status",
+                "# TYPE rpg_http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(f'rpg_http_requests_total{{{_labels(method, route)},status="{status}"}} {count}')
+            lines += _render_histograms(
+                "rpg_http_request_duration_seconds", "Request latency by route", self._latency
+            )
+            lines += _render_histograms(
+                "rpg_db_statements_per_request", "SQL statements executed per request by route", self._statements
+            )
+            lines += [
+                "# HELP rpg_db_statement_seconds_total Time spent executing SQL by route",
+                "# TYPE rpg_db_statement_seconds_total counter",
+            ]
+            for (method, route), seconds in sorted(self._sql_seconds.items()):
+                lines.append(f"rpg_db_statement_seconds_total{{{_labels(method, route)}}} {seconds!r}")
+            if self.slow_query_seconds is not None:
+                lines += [
+                    "# HELP rpg_db_slow_statements_total SQL statements slower than the slow-query threshold",
+                    "# TYPE rpg_db_slow_statements_total counter",
+                ]
+                for route, count in sorted(self._slow_queries.items()):
+                    lines.append(f'rpg_db_slow_statements_total{{route="{_escape(route)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method: str, route: str) -> str:
+    return f'method="{method}",route="{_escape(route)}"'
+
+
+def _render_histograms(name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), histogram in sorted(histograms.items()):
+        labels = _labels(method, route)
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mide latencia, peticiones en curso y SQL por ruta.
+
+    La ruta se toma de la plantilla que FastAPI deja en scope["route"] (ej.
+    /personajes/{character_id}), así las URLs con ids distintos comparten serie.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+        self.registry.request_started()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            self.registry.request_finished(
+                scope["method"], stats.route, status_code, time.perf_counter() - started, stats
+            )
@@ -0,0 +1,205 @@
+from typing import List
+
+from sqlalchemy import exists, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn, CreateTable
+
+from app.database import Base
+from app.maintenance import archive_completed
+from app.search import FTS_TABLE, create_search_index
+from app.tda.queue import POSITION_GAP
+# Importar los modelos registra sus tablas en Base.metadata
+from app.models.character import Character  # noqa: F401
+from app.models.mission import Mission  # noqa: F401
+from app.models.character_mission import CharacterMission  # noqa: F401
+from app.models.character_mission_history import CharacterMissionHistory  # noqa: F401
+from app.models.stats import CharacterStats, DailyStats, DifficultyStats, MissionStats  # noqa: F401
+
+# Versión mínima de SQLite: las colas, el archivado y la clasificación usan RETURNING (3.35)
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# Índices reemplazados por versiones nuevas
+DROPPED_INDEXES = [
+    "ix_character_missions_character_position",
+]
+
+# Datos iniciales de las columnas agregadas a tablas existentes
+BACKFILLS = {
+    ("characters", "next_queue_position"): """
+        UPDATE characters SET next_queue_position = 1 + COALESCE(
+            (SELECT MAX(queue_position) FROM character_missions
+             WHERE character_missions.character_id = characters.id), 0)
+    """,
+    ("characters", "mission_count"): """
+        UPDATE characters SET mission_count = (
+            SELECT COUNT(*) FROM character_missions
+            WHERE character_missions.character_id = characters.id)
+    """,
+    ("characters", "pending_missions"): """
+        UPDATE characters SET pending_missions = (
+            SELECT COUNT(*) FROM character_missions
+            WHERE character_missions.character_id = characters.id
+            AND character_missions.status IN ('pending', 'in_progress'))
+    """,
+}
+
+
+def run_migrations(engine: Engine) -> None:
+    """Crea las tablas que falten y actualiza una base existente al esquema actual"""
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        for table, column in _add_missing_columns(conn):
+            backfill = BACKFILLS.get((table, column))
+            if backfill:
+                conn.exec_driver_sql(backfill)
+        if conn.dialect.name == "sqlite":
+            _rebuild_for_autoincrement(conn)
+        for name in DROPPED_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        if _renumber_duplicate_positions(conn):
+            # Las posiciones nuevas quedan por encima de next_queue_position
+            conn.exec_driver_sql(BACKFILLS[("characters", "next_queue_position")])
+        _create_missing_indexes(conn)
+        # Índice de texto completo de las misiones (FTS5, solo SQLite)
+        create_search_index(conn)
+        if conn.dialect.name == "sqlite":
+            # Actualiza las estadísticas del planificador para los índices nuevos
+            conn.exec_driver_sql("PRAGMA optimize")
+
+    # Las completadas de bases anteriores al historial no aparecen en /historial ni en la exportación
+    if _has_completed_in_queue(engine):
+        with Session(engine) as db:
+            archive_completed(db)
+
+
+def check_database_version(engine: Engine) -> None:
+    """Falla si la base no soporta las sentencias que usa la app (SQLite anterior a MIN_SQLITE_VERSION)"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.connect() as conn:
+        version = conn.exec_driver_sql("SELECT sqlite_version()").scalar()
+    if tuple(int(part) for part in version.split(".")) < MIN_SQLITE_VERSION:
+        required = ".".join(str(part) for part in MIN_SQLITE_VERSION)
+        raise RuntimeError(f"SQLite {version} is too old: {required} or newer is required (RETURNING)")
+
+
+def missing_schema(engine: Engine) -> List[str]:
+    """Tablas, columnas e índices del esquema actual que faltan en la base, sin modificarla"""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            missing.append(f"table {table.name}")
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(f"column {table.name}.{column.name}" for column in table.columns if column.name not in columns)
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(f"index {index.name}" for index in table.indexes if index.name not in indexes)
+    if engine.dialect.name == "sqlite" and FTS_TABLE not in tables:
+        missing.append(f"table {FTS_TABLE}")
+    return missing
+
+
+def prepare_database(engine: Engine, migrate: bool = True) -> None:
+    """Comprobaciones al arrancar: versión de la base y esquema.
+
+    Con migrate aplica run_migrations(); sin él (RPG_MIGRATE_ON_STARTUP=0, ej. cuando
+    las migraciones se corren aparte con python -m app.cli migrate) solo comprueba
+    que el esquema esté al día y falla si no lo está.
+    """
+    check_database_version(engine)
+    if migrate:
+        run_migrations(engine)
+        return
+    missing = missing_schema(engine)
+    if missing:
+        raise RuntimeError(
+            f"Database schema is out of date (missing {', '.join(missing)}); run python -m app.cli migrate"
+        )
+
+
+def _has_completed_in_queue(engine: Engine) -> bool:
+    """True si quedan entradas completadas en character_missions"""
+    with engine.connect() as conn:
+        return conn.scalar(select(exists().where(CharacterMission.status == "completed")))
+
+
+def _add_missing_columns(conn):
+    """create_all no agrega columnas nuevas a tablas existentes; devuelve las agregadas"""
+    inspector = inspect(conn)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                added.append((table.name, column.name))
+    return added
+
+
+def _rebuild_for_autoincrement(conn) -> None:
+    """Recrea con AUTOINCREMENT las tablas SQLite creadas sin él.
+
+    SQLite no puede agregar AUTOINCREMENT con ALTER TABLE: se renombra la tabla,
+    se crea de nuevo, se copian las filas y se borra la anterior. Los índices se
+    recrean después en _create_missing_indexes().
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not table.dialect_options["sqlite"]["autoincrement"]:
+            continue
+        sql = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+        ).scalar()
+        if sql is None or "AUTOINCREMENT" in sql.upper():
+            continue
+        old_name = f"_{table.name}_old"
+        indexes = [index["name"] for index in inspector.get_indexes(table.name)]
+        conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {old_name}")
+        for name in indexes:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        conn.execute(CreateTable(table))
+        columns = ", ".join(column.name for column in table.columns)
+        conn.exec_driver_sql(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {old_name}")
+        conn.exec_driver_sql(f"DROP TABLE {old_name}")
+
+
+def _renumber_duplicate_positions(conn) -> bool:
+    """Renumera las colas con posiciones repetidas antes de crear el índice único.
+
+    Las bases anteriores al índice uq_character_missions_character_position pueden
+    tener dos filas de un personaje en la misma posición. Las filas de esos personajes
+    se renumeran con POSITION_GAP en su orden actual (posición y después id).
+    Devuelve True si cambió alguna fila.
+    """
+    existing = {index["name"] for index in inspect(conn).get_indexes(CharacterMission.__tablename__)}
+    if "uq_character_missions_character_position" in existing:
+        return False
+    result = conn.exec_driver_sql(f"""
+        UPDATE character_missions SET queue_position = renumbered.position
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY character_id ORDER BY queue_position, id
+            ) * {POSITION_GAP} AS position
+            FROM character_missions
+            WHERE character_id IN (
+                SELECT character_id FROM character_missions
+                GROUP BY character_id, queue_position HAVING COUNT(*) > 1)
+        ) AS renumbered
+        WHERE character_missions.id = renumbered.id
+    """)
+    return result.rowcount > 0
+
+
+def _create_missing_indexes(conn) -> None:
+    """create_all no agrega índices a tablas que ya existen (ej. rpg_missions.db antiguas)"""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=conn)
\ No newline at end of file
@@ -1,3 +1,5 @@
 from app.models.character import Character
 from app.models.mission import Mission
-from app.models.character_mission import CharacterMission
\ No newline at end of file
+from app.models.character_mission import CharacterMission
+from app.models.character_mission_history import CharacterMissionHistory
+from app.models.stats import CharacterStats, MissionStats, DifficultyStats, DailyStats
\ No newline at end of file
@@ -1,16 +1,27 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
 
 class Character(Base):
     __tablename__ = "characters"
+    __table_args__ = (
+        # Reconstrucción en frío de la clasificación (ORDER BY level DESC, experience DESC)
+        Index("ix_characters_level_experience", "level", "experience"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     level = Column(Integer, default=1)
     experience = Column(Integer, default=0)
     
+    # Siguiente queue_position libre; se lee e incrementa en la misma transacción del enqueue
+    next_queue_position = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    # Contadores desnormalizados mantenidos por MissionQueue en la misma transacción
+    mission_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_missions = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Relationship with missions through character_missions table
     missions = relationship("CharacterMission", back_populates="character")
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -6,6 +6,16 @@ from app.database import Base
 
 class CharacterMission(Base):
     __tablename__ = "character_missions"
+    __table_args__ = (
+        # Cola activa: character_id + status IN (...) ordenado por queue_position
+        Index("ix_character_missions_queue", "character_id", "status", "queue_position"),
+        # Historial completo por personaje; una posición no puede repetirse
+        Index("uq_character_missions_character_position", "character_id", "queue_position", unique=True),
+        # Verificación de misión ya aceptada por el personaje
+        Index("ix_character_missions_character_mission", "character_id", "mission_id", "status"),
+        # Las completadas se mueven al historial con su id: SQLite no debe reutilizar ids borrados
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     character_id = Column(Integer, ForeignKey("characters.id"))
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, Index
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+class CharacterMissionHistory(Base):
+    """Misiones completadas, movidas fuera de character_missions al completarse.
+
+    Conserva el id de la entrada original, así una misión completada tiene el
+    mismo id en la respuesta de /completar, en el historial y en la exportación.
+    """
+    __tablename__ = "character_mission_history"
+    __table_args__ = (
+        # Historial de un personaje ordenado por fecha de completado (paginación por keyset)
+        Index("ix_character_mission_history_character_completed", "character_id", "completed_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    character_id = Column(Integer, ForeignKey("characters.id"), nullable=False)
+    mission_id = Column(Integer, ForeignKey("missions.id"), nullable=False)
+    
+    # Posición que tenía en la cola del personaje
+    queue_position = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="completed")
+    # XP otorgada al completarse; NULL es la XP de la misión (complete() y el tick),
+    # 0 una entrada que dequeue() sacó sin otorgar XP
+    xp_awarded = Column(Integer, nullable=True)
+    
+    # Timestamps
+    accepted_at = Column(DateTime, nullable=False)
+    completed_at = Column(DateTime, nullable=False)
+    
+    # Relationships
+    mission = relationship("Mission")
+    
+    def __repr__(self):
+        return f"CharacterMissionHistory(character_id={self.character_id}, mission_id={self.mission_id}, completed_at={self.completed_at})"
\ No newline at end of file
@@ -0,0 +1,66 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Date, DateTime
+
+from app.database import Base
+
+# Tablas de agregados (rollups) que las rutas de aceptación, completado y cancelación
+# actualizan en la misma transacción; app.stats las mantiene y las reconstruye.
+# El tiempo medio de aceptada a completada es completion_seconds / completed
+
+class CharacterStats(Base):
+    """Totales por personaje"""
+    __tablename__ = "character_stats"
+
+    character_id = Column(Integer, ForeignKey("characters.id"), primary_key=True, autoincrement=False)
+    accepted = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    xp_earned = Column(Integer, nullable=False, default=0)
+    completion_seconds = Column(Float, nullable=False, default=0.0)
+    last_completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"CharacterStats(character_id={self.character_id}, completed={self.completed}, xp_earned={self.xp_earned})"
+
+
+class MissionStats(Base):
+    """Totales por misión; la tasa de completado es completed / accepted"""
+    __tablename__ = "mission_stats"
+
+    mission_id = Column(Integer, ForeignKey("missions.id"), primary_key=True, autoincrement=False)
+    accepted = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    xp_earned = Column(Integer, nullable=False, default=0)
+    completion_seconds = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"MissionStats(mission_id={self.mission_id}, accepted={self.accepted}, completed={self.completed})"
+
+
+class DifficultyStats(Base):
+    """Totales por dificultad de la misión (1-5)"""
+    __tablename__ = "difficulty_stats"
+
+    difficulty = Column(Integer, primary_key=True, autoincrement=False)
+    accepted = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    xp_earned = Column(Integer, nullable=False, default=0)
+    completion_seconds = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"DifficultyStats(difficulty={self.difficulty}, accepted={self.accepted}, completed={self.completed})"
+
+
+class DailyStats(Base):
+    """Totales por día (UTC) de completado o cancelación"""
+    __tablename__ = "daily_stats"
+
+    day = Column(Date, primary_key=True)
+    completed = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    xp_earned = Column(Integer, nullable=False, default=0)
+    completion_seconds = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"DailyStats(day={self.day}, completed={self.completed}, xp_earned={self.xp_earned})"
\ No newline at end of file
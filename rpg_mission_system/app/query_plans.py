@@ -0,0 +1,166 @@
+"""Verificación de planes de consulta (EXPLAIN QUERY PLAN) de los caminos calientes.
+
+Ejecuta MissionQueue y los endpoints de los routers contra una base SQLite
+temporal, captura cada sentencia emitida y revisa su plan. Se considera
+regresión cualquier SCAN completo de una tabla en una sentencia con WHERE;
+los listados sin filtro (paginación) recorren la tabla por diseño.
+"""
+import os
+import re
+import tempfile
+from typing import List, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.maintenance import archive_completed
+from app.migrations import run_migrations
+from app.models.character import Character
+from app.models.mission import Mission
+from app.routers import characters, missions, stats
+from app.schemas.mission import MissionBatchAccept, MissionMove
+from app.tda.catalog import mission_catalog
+from app.tda.queue import MissionQueue, MissionQueueCache, complete_heads, queue_cache
+
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+def capture_hot_path_statements(engine) -> List[Tuple[str, tuple]]:
+    """Ejecuta el flujo de misiones y devuelve las sentencias SQL emitidas"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, tuple(parameters or ())))
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    try:
+        hero = Character(name="Plan", level=1, experience=0)
+        db.add(hero)
+        db.add_all([
+            Mission(title=f"Mision {i}", description="plan", xp_reward=10 * i, difficulty=1)
+            for i in range(1, 5)
+        ])
+        db.commit()
+        character_id = hero.id
+
+        event.listen(engine, "before_cursor_execute", capture)
+        queue_cache.clear()
+        mission_catalog.clear()
+        request = Request({"type": "http", "headers": []})
+
+        # Endpoints de personajes
+        characters.get_characters(skip=0, limit=10, after_id=None, db=db)
+        characters.get_characters(skip=0, limit=10, after_id=0, db=db)
+        characters.accept_mission(character_id, 1, db=db)
+        characters.accept_mission(character_id, 2, db=db)
+        characters.accept_missions(character_id, MissionBatchAccept(mission_ids=[2, 4, 99]), db=db)
+        characters.get_character(character_id, db=db)
+        characters.get_character_missions(character_id, include_history=False, db=db)
+        characters.move_mission(character_id, 4, MissionMove(position="front"), db=db)
+        characters.move_mission(character_id, 4, MissionMove(position="before", anchor_mission_id=2), db=db)
+        characters.move_mission(character_id, 4, MissionMove(position="after", anchor_mission_id=2), db=db)
+        characters.complete_current_mission(character_id, db=db)
+        characters.get_character_missions(character_id, include_history=True, db=db)
+        history = Response()
+        characters.get_character_history(character_id, history, limit=1, before=None, db=db)
+        characters.get_character_history(character_id, Response(), limit=1, before=history.headers["X-Next-Cursor"], db=db)
+
+        # Endpoints de misiones
+        missions.get_missions(request, skip=0, limit=10, after_id=None, db=db)
+        missions.get_missions(request, skip=0, limit=10, after_id=2, db=db)
+        missions.get_mission(3, request, db=db)
+        missions.search_missions("mision", None, None, None, None, skip=0, limit=10, db=db)
+        missions.search_missions("mis", 1, 5, 0, 100, skip=0, limit=10, db=db)
+        missions.accept_mission(3, character_id, db=db)
+        missions.start_mission(2, character_id, db=db)
+        missions.complete_mission(2, character_id, db=db)
+
+        # MissionQueue sin caché y con caché fría
+        for cache in (None, MissionQueueCache()):
+            queue = MissionQueue(db, character_id, cache=cache)
+            queue.size()
+            queue.first()
+            queue.get_all()
+            queue.enqueue(4 if cache is None else 1)
+            queue.start_next_mission()
+            queue.dequeue()
+
+        # Renumeración de la cola cuando se agota un hueco, y cancelación
+        queue = MissionQueue(db, character_id)
+        queue.enqueue(1)
+        queue._rebalance(queue._lock_character())
+        db.commit()
+        # Las colas de arriba no usan queue_cache: descartar lo que tenga guardado
+        queue_cache.clear()
+        characters.cancel_mission(character_id, 1, db=db)
+
+        # Tick por conjuntos: personajes explícitos y "todos con misión en curso"
+        MissionQueue(db, character_id).enqueue(2)
+        complete_heads(db, [character_id])
+        MissionQueue(db, character_id).start_next_mission()
+        complete_heads(db)
+
+        # Estadísticas servidas desde los rollups
+        stats.get_character_stats(character_id, db=db)
+        stats.get_mission_stats(2, db=db)
+        stats.get_difficulty_stats(db=db)
+        stats.get_daily_stats(None, None, db=db)
+
+        # Compactación de entradas completadas antiguas
+        archive_completed(db, batch_size=10)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+        queue_cache.clear()
+        mission_catalog.clear()
+        db.close()
+
+    return statements
+
+
+def find_full_scans(engine, statements) -> List[Tuple[str, List[str]]]:
+    """Devuelve las sentencias cuyo plan recorre una tabla completa"""
+    tables = set(Base.metadata.tables)
+    offenders = []
+    seen = set()
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            if statement in seen or not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                continue
+            seen.add(statement)
+            if " WHERE " not in statement.upper().replace("\n", " "):
+                continue
+            plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            scans = [
+                detail for detail in plan
+                if (match := _FULL_SCAN.match(detail)) and match.group(1) in tables
+            ]
+            if scans:
+                offenders.append((statement, plan))
+    return offenders
+
+
+def check_query_plans() -> int:
+    """Ejecuta la verificación sobre una base temporal; devuelve el número de regresiones"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmpdir, 'plans.db')}",
+            connect_args={"check_same_thread": False}
+        )
+        try:
+            run_migrations(engine)
+            statements = capture_hot_path_statements(engine)
+            offenders = find_full_scans(engine, statements)
+        finally:
+            engine.dispose()
+
+    for statement, plan in offenders:
+        print("SCAN completo en:")
+        print("  " + " ".join(statement.split()))
+        for detail in plan:
+            print("    " + detail)
+    print(f"{len(statements)} sentencias revisadas, {len(offenders)} con SCAN completo")
+    return len(offenders)
\ No newline at end of file
@@ -1,7 +1,19 @@
 # app/routers/__init__.py
 from app.routers.characters import router as characters_router
 from app.routers.missions import router as missions_router
+from app.routers.export import router as export_router
+from app.routers.imports import router as imports_router
+from app.routers.events import router as events_router
+from app.routers.leaderboard import router as leaderboard_router
+from app.routers.stats import router as stats_router
+from app.routers.async_characters import router as async_characters_router
+from app.routers.async_missions import router as async_missions_router
 
 # Reasignar nombres para mayor claridad
 personajes_router = characters_router
-misiones_router = missions_router
\ No newline at end of file
+misiones_router = missions_router
+exportar_router = export_router
+importar_router = imports_router
+eventos_router = events_router
+clasificacion_router = leaderboard_router
+estadisticas_router = stats_router
\ No newline at end of file
@@ -0,0 +1,179 @@
+# Versión async de app/routers/characters.py (RPG_ASYNC=1).
+# Cada endpoint corre en el event loop con una AsyncSession y espera sus sentencias;
+# las escrituras de la cola pasan por AsyncMissionQueue. Las consultas se arman con
+# los mismos helpers del router sync, así ambos modos no se desincronizan.
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.database import get_async_db, MAX_PAGE_SIZE
+from app.models.character import Character
+from app.models.character_mission import CharacterMission
+from app.routers.characters import (
+    characters_page, characters_page_query, history_query, merge_queue_items, queue_items_queries, set_history_cursor
+)
+from app.serialization import FastJSONResponse
+from app.schemas.character import Character as CharacterSchema
+from app.schemas.character import CharacterCreate, CharacterDetail
+from app.schemas.character import CharacterBatchComplete, CharacterCompletionSummary
+from app.schemas.mission import MissionQueueItem, CharacterMission as CharacterMissionSchema
+from app.schemas.mission import MissionBatchAccept, MissionBatchAcceptResult, MissionHistoryItem, MissionMove
+from app.services import services
+from app.tda.async_queue import complete_heads_async
+from app.tda.queue import ACTIVE_STATUSES
+
+router = APIRouter(
+    prefix="/personajes",
+    tags=["characters"]
+)
+
+async def _require_character(db: AsyncSession, character_id: int) -> None:
+    if await db.scalar(select(Character.id).where(Character.id == character_id)) is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+
+async def character_queue_items(db: AsyncSession, character_id: int, include_history: bool = False) -> List[dict]:
+    """Queue items of a character in queue order, as plain dicts shaped like MissionQueueItem"""
+    queries = queue_items_queries(character_id, include_history)
+    return merge_queue_items([(await db.execute(query)).all() for query in queries])
+
+@router.post("/", response_model=CharacterSchema)
+async def create_character(character: CharacterCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new character"""
+    db_character = Character(**character.dict())
+    db.add(db_character)
+    await db.commit()
+    await db.refresh(db_character)
+    services(db).leaderboard.update(db_character.id, db_character.name, db_character.level, db_character.experience)
+    return db_character
+
+@router.get("/", response_model=List[CharacterSchema])
+async def get_characters(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = Query(None, ge=0, description="Keyset cursor: return characters with id greater than this"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a list of characters (use after_id / X-Next-Cursor for keyset pagination)"""
+    return characters_page((await db.execute(characters_page_query(skip, limit, after_id))).all(), limit)
+
+@router.post("/completar", response_model=List[CharacterCompletionSummary])
+async def complete_current_missions(batch: CharacterBatchComplete, db: AsyncSession = Depends(get_async_db)):
+    """Complete the head mission of many characters at once (game tick) and award XP"""
+    app_services = services(db)
+    results = await complete_heads_async(
+        db, batch.character_ids, chunk_size=batch.chunk_size,
+        cache=app_services.queue_cache, events=app_services.events, leaderboard=app_services.leaderboard
+    )
+    return [result._asdict() for result in results]
+
+@router.get("/{character_id}", response_model=CharacterDetail)
+async def get_character(character_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a character by ID with mission stats"""
+    character = await db.get(Character, character_id)
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return character
+
+@router.get("/{character_id}/misiones", response_model=List[MissionQueueItem])
+async def get_character_missions(
+    character_id: int,
+    include_history: bool = Query(False, description="Also return completed missions from the history"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the live mission queue of a character in queue order"""
+    await _require_character(db, character_id)
+    return FastJSONResponse(await character_queue_items(db, character_id, include_history))
+
+@router.get("/{character_id}/historial", response_model=List[MissionHistoryItem])
+async def get_character_history(
+    character_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor: return older entries"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the finished (completed or cancelled) missions of a character, most recent first (use before / X-Next-Cursor to page)"""
+    await _require_character(db, character_id)
+    entries = (await db.execute(history_query(character_id, limit, before))).all()
+    set_history_cursor(response, entries, limit)
+    return entries
+
+@router.post("/{character_id}/misiones/{mission_id}", response_model=CharacterMissionSchema)
+async def accept_mission(character_id: int, mission_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Accept a mission for a character (add to queue)"""
+    app_services = services(db)
+    if not await app_services.catalog.get_async(db, mission_id):
+        raise HTTPException(status_code=404, detail="Mission not found")
+    await _require_character(db, character_id)
+
+    existing = await db.scalar(select(CharacterMission.id).where(
+        CharacterMission.character_id == character_id,
+        CharacterMission.mission_id == mission_id,
+        CharacterMission.status.in_(ACTIVE_STATUSES)
+    ).limit(1))
+    if existing is not None:
+        raise HTTPException(status_code=400, detail="Mission already accepted")
+
+    return await app_services.async_mission_queue(db, character_id).enqueue(mission_id)
+
+@router.post("/{character_id}/misiones", response_model=List[MissionBatchAcceptResult])
+async def accept_missions(character_id: int, batch: MissionBatchAccept, db: AsyncSession = Depends(get_async_db)):
+    """Accept several missions for a character in one transaction (added to the queue in order)"""
+    await _require_character(db, character_id)
+    results = await services(db).async_mission_queue(db, character_id).enqueue_many(batch.mission_ids)
+    return [
+        {"mission_id": mission_id, "result": result, "character_mission": character_mission}
+        for mission_id, result, character_mission in results
+    ]
+
+@router.post("/{character_id}/completar", response_model=CharacterMissionSchema)
+async def complete_current_mission(character_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Complete the current mission in the queue and award XP"""
+    try:
+        completed_mission = await services(db).async_mission_queue(db, character_id).complete()
+    except ValueError as exc:
+        # Lost the completion race more times than there were queued entries
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    if not completed_mission:
+        await _require_character(db, character_id)
+        raise HTTPException(status_code=404, detail="No missions in queue")
+
+    return completed_mission
+
+@router.post("/{character_id}/misiones/{mission_id}/cancelar", response_model=CharacterMissionSchema)
+async def cancel_mission(character_id: int, mission_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Cancel a queued mission (removed from the queue and kept in the history as cancelled)"""
+    await _require_character(db, character_id)
+    cancelled_mission = await services(db).async_mission_queue(db, character_id).cancel(mission_id)
+    if not cancelled_mission:
+        raise HTTPException(status_code=404, detail="Mission not in queue")
+    return cancelled_mission
+
+@router.post("/{character_id}/misiones/{mission_id}/mover", response_model=CharacterMissionSchema)
+async def move_mission(character_id: int, mission_id: int, move: MissionMove, db: AsyncSession = Depends(get_async_db)):
+    """Reorder a queued mission: to the front, or before/after another queued mission"""
+    if move.position != "front":
+        if move.anchor_mission_id is None:
+            raise HTTPException(status_code=400, detail="anchor_mission_id is required to move before/after a mission")
+        if move.anchor_mission_id == mission_id:
+            raise HTTPException(status_code=400, detail="A mission cannot be moved relative to itself")
+    await _require_character(db, character_id)
+
+    mission_queue = services(db).async_mission_queue(db, character_id)
+    try:
+        if move.position == "front":
+            moved_mission = await mission_queue.move_to_front(mission_id)
+        elif move.position == "before":
+            moved_mission = await mission_queue.move_before(mission_id, move.anchor_mission_id)
+        else:
+            moved_mission = await mission_queue.move_after(mission_id, move.anchor_mission_id)
+    except ValueError as exc:
+        # Missions in progress stay ahead of the pending ones
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    if not moved_mission:
+        raise HTTPException(status_code=404, detail="Mission not in queue")
+
+    return moved_mission
\ No newline at end of file
@@ -0,0 +1,127 @@
+# Versión async de app/routers/missions.py (RPG_ASYNC=1).
+# Cada endpoint corre en el event loop con una AsyncSession y espera sus sentencias;
+# las escrituras de la cola pasan por AsyncMissionQueue. Las consultas se arman con
+# los mismos helpers del router sync, así ambos modos no se desincronizan.
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.database import get_async_db, MAX_PAGE_SIZE
+from app.models.character import Character
+from app.models.mission import Mission
+from app.routers.missions import conditional_response, missions_page, missions_page_query
+from app.schemas.mission import Mission as MissionSchema
+from app.schemas.mission import MissionCreate, CharacterMission as CharacterMissionSchema
+from app.search import search_query
+from app.serialization import FastJSONResponse
+from app.services import services
+from app.tda.catalog import MissionCatalog, MissionRecord
+
+router = APIRouter(
+    prefix="/misiones",
+    tags=["missions"]
+)
+
+async def _require_character(db: AsyncSession, character_id: int) -> None:
+    if await db.scalar(select(Character.id).where(Character.id == character_id)) is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+
+@router.post("/", response_model=MissionSchema)
+async def create_mission(mission: MissionCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new mission"""
+    db_mission = Mission(**mission.dict())
+    db.add(db_mission)
+    await db.commit()
+    await db.refresh(db_mission)
+    services(db).catalog.add(MissionCatalog.record(db_mission))
+    return db_mission
+
+@router.get("/", response_model=List[MissionSchema])
+async def get_missions(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = Query(None, ge=0, description="Keyset cursor: return missions with id greater than this"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a list of missions (use after_id / X-Next-Cursor for keyset pagination; supports If-None-Match)"""
+    rows = await db.execute(missions_page_query(skip, limit, after_id))
+    return missions_page(request, services(db).catalog, rows, limit)
+
+@router.get("/buscar", response_model=List[MissionSchema])
+async def search_missions(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in the title or description"),
+    min_difficulty: Optional[int] = Query(None, ge=1, le=5),
+    max_difficulty: Optional[int] = Query(None, ge=1, le=5),
+    min_xp: Optional[int] = Query(None, ge=0),
+    max_xp: Optional[int] = Query(None, ge=0),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over missions, most relevant first (every word must match, as a prefix)"""
+    try:
+        query = search_query(
+            db.get_bind().dialect.name, q, min_difficulty, max_difficulty, min_xp, max_xp, skip, limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Search query has no words")
+    records = [MissionRecord(*row) for row in await db.execute(query)]
+    catalog = services(db).catalog
+    for record in records:
+        catalog.add(record)
+    return FastJSONResponse([record._asdict() for record in records])
+
+@router.get("/{mission_id}", response_model=MissionSchema)
+async def get_mission(mission_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get a mission by ID (served from the in-memory catalog; supports If-None-Match)"""
+    mission = await services(db).catalog.get_async(db, mission_id)
+    if not mission:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    return conditional_response(request, mission._asdict())
+
+# Mantener los endpoints adicionales para compatibilidad
+@router.post("/{mission_id}/accept", response_model=CharacterMissionSchema)
+async def accept_mission(mission_id: int, character_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Accept a mission for a character (add to queue)"""
+    # Same checks and queue as POST /personajes/{id}/misiones/{mission_id}
+    from app.routers.async_characters import accept_mission as accept
+    return await accept(character_id, mission_id, db=db)
+
+@router.post("/{mission_id}/start", response_model=CharacterMissionSchema)
+async def start_mission(mission_id: int, character_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Start the next mission in the queue"""
+    await _require_character(db, character_id)
+
+    mission_queue = services(db).async_mission_queue(db, character_id)
+    next_mission = await mission_queue.peek()
+
+    if not next_mission:
+        raise HTTPException(status_code=404, detail="No missions in queue")
+
+    if next_mission.mission_id != mission_id:
+        raise HTTPException(status_code=400,
+                           detail=f"This mission is not the next in queue. Next mission ID: {next_mission.mission_id}")
+
+    # Start the mission (the head may already be in progress)
+    if next_mission.status == "pending":
+        started = await mission_queue.start_next_mission()
+        if started is not None:
+            return started
+    return await mission_queue.first()
+
+@router.post("/{mission_id}/complete", response_model=CharacterMissionSchema)
+async def complete_mission(mission_id: int, character_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Complete the current mission and award XP"""
+    mission_queue = services(db).async_mission_queue(db, character_id)
+    try:
+        completed_mission = await mission_queue.complete(mission_id=mission_id, require_in_progress=True)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    if not completed_mission:
+        await _require_character(db, character_id)
+        raise HTTPException(status_code=400, detail="Mission not in progress")
+
+    return completed_mission
\ No newline at end of file
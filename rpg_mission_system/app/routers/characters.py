@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_db, MAX_PAGE_SIZE
 from app.models.character import Character
 from app.models.character_mission import CharacterMission
+from app.models.character_mission_history import CharacterMissionHistory
 from app.models.mission import Mission
+from app.serialization import FastJSONResponse
 from app.schemas.character import Character as CharacterSchema
 from app.schemas.character import CharacterCreate, CharacterDetail
+from app.schemas.character import CharacterBatchComplete, CharacterCompletionSummary
 from app.schemas.mission import MissionQueueItem, CharacterMission as CharacterMissionSchema
-from app.tda.queue import MissionQueue
+from app.schemas.mission import MissionBatchAccept, MissionBatchAcceptResult, MissionHistoryItem, MissionMove
+from app.services import coalesce, services
+from app.tda.queue import ACTIVE_STATUSES, complete_heads
 
 router = APIRouter(
     prefix="/personajes",  # Cambiado a español según el PDF
@@ -23,82 +30,170 @@ def create_character(character: CharacterCreate, db: Session = Depends(get_db)):
     db.add(db_character)
     db.commit()
     db.refresh(db_character)
+    services(db).leaderboard.update(db_character.id, db_character.name, db_character.level, db_character.experience)
     return db_character
 
 @router.get("/", response_model=List[CharacterSchema])
 def get_characters(
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = Query(None, ge=0, description="Keyset cursor: return characters with id greater than this"),
     db: Session = Depends(get_db)
 ):
-    """Get a list of characters"""
-    characters = db.query(Character).offset(skip).limit(limit).all()
-    return characters
+    """Get a list of characters (use after_id / X-Next-Cursor for keyset pagination)"""
+    return characters_page(db.execute(characters_page_query(skip, limit, after_id)).all(), limit)
+
+def characters_page_query(skip: int, limit: int, after_id: Optional[int]):
+    """One page of characters: only the schema columns (also run by the async router)"""
+    query = select(Character.name, Character.level, Character.experience, Character.id).order_by(Character.id)
+    if after_id is not None:
+        query = query.where(Character.id > after_id)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def characters_page(characters, limit: int) -> FastJSONResponse:
+    """Rows serialized straight to JSON, with X-Next-Cursor when the page is full"""
+    response = FastJSONResponse([row._asdict() for row in characters])
+    if len(characters) == limit:
+        response.headers["X-Next-Cursor"] = str(characters[-1].id)
+    return response
+
+@router.post("/completar", response_model=List[CharacterCompletionSummary])
+def complete_current_missions(batch: CharacterBatchComplete, db: Session = Depends(get_db)):
+    """Complete the head mission of many characters at once (game tick) and award XP"""
+    # Set-based completion in chunked transactions; characters with an empty queue are skipped
+    app_services = services(db)
+    results = complete_heads(
+        db, batch.character_ids, chunk_size=batch.chunk_size,
+        cache=app_services.queue_cache, events=app_services.events, leaderboard=app_services.leaderboard
+    )
+    return [result._asdict() for result in results]
 
 @router.get("/{character_id}", response_model=CharacterDetail)
 def get_character(character_id: int, db: Session = Depends(get_db)):
     """Get a character by ID with mission stats"""
-    character = db.query(Character).filter(Character.id == character_id).first()
+    # Mission counters are stored on the character and kept up to date by MissionQueue
+    character = db.get(Character, character_id)
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
-    
-    # Get mission counts for the character details
-    pending_missions = db.query(CharacterMission).filter(
-        CharacterMission.character_id == character_id,
-        CharacterMission.status.in_(["pending", "in_progress"])
-    ).count()
-    
-    mission_count = db.query(CharacterMission).filter(
-        CharacterMission.character_id == character_id
-    ).count()
-    
-    # Crear manualmente el objeto de respuesta para asegurar que todos los campos estén presentes
-    response = {
-        "id": character.id,
-        "name": character.name,
-        "level": character.level,
-        "experience": character.experience,
-        "mission_count": mission_count,
-        "pending_missions": pending_missions
-    }
-    
-    return response
+    return character
+
+def _queue_columns(entry):
+    """Columns of MissionQueueItem, in schema order, for the live queue or the history table"""
+    return (
+        entry.id,
+        Mission.title,
+        Mission.description,
+        Mission.xp_reward,
+        Mission.difficulty,
+        entry.status,
+        entry.queue_position,
+        entry.accepted_at,
+    )
+
+def queue_items_queries(character_id: int, include_history: bool = False) -> list:
+    """Statements for the queue items of a character: the live queue, then the history if requested"""
+    queries = [
+        select(*_queue_columns(CharacterMission)).join(
+            Mission, CharacterMission.mission_id == Mission.id
+        ).where(
+            CharacterMission.character_id == character_id,
+            CharacterMission.status.in_(ACTIVE_STATUSES)
+        ).order_by(CharacterMission.queue_position)
+    ]
+    if include_history:
+        # Completed missions live in the history table (paginated view: /historial)
+        queries.append(
+            select(*_queue_columns(CharacterMissionHistory)).join(
+                Mission, CharacterMissionHistory.mission_id == Mission.id
+            ).where(CharacterMissionHistory.character_id == character_id)
+        )
+    return queries
+
+def merge_queue_items(results: List[list]) -> List[dict]:
+    """Rows of queue_items_queries() merged in queue order, as plain dicts shaped like MissionQueueItem"""
+    items = results[0]
+    if len(results) > 1:
+        items = sorted(items + results[1], key=lambda row: row.queue_position)
+    return [row._asdict() for row in items]
+
+def character_queue_items(db: Session, character_id: int, include_history: bool = False) -> List[dict]:
+    """Queue items of a character in queue order, as plain dicts shaped like MissionQueueItem"""
+    queries = queue_items_queries(character_id, include_history)
+    return merge_queue_items([db.execute(query).all() for query in queries])
 
 @router.get("/{character_id}/misiones", response_model=List[MissionQueueItem])
-def get_character_missions(character_id: int, db: Session = Depends(get_db)):
-    """Get all missions for a character in queue order"""
-    character = db.query(Character).filter(Character.id == character_id).first()
+def get_character_missions(
+    character_id: int,
+    include_history: bool = Query(False, description="Also return completed missions from the history"),
+    db: Session = Depends(get_db)
+):
+    """Get the live mission queue of a character in queue order"""
+    if db.scalar(select(Character.id).where(Character.id == character_id)) is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return FastJSONResponse(character_queue_items(db, character_id, include_history))
+
+@router.get("/{character_id}/historial", response_model=List[MissionHistoryItem])
+def get_character_history(
+    character_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor: return older entries"),
+    db: Session = Depends(get_db)
+):
+    """Get the finished (completed or cancelled) missions of a character, most recent first (use before / X-Next-Cursor to page)"""
+    character = db.get(Character, character_id)
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
     
-    # Get all missions with join to get mission details
-    missions = db.query(
-        CharacterMission.id,
-        CharacterMission.status,
-        CharacterMission.queue_position,
-        CharacterMission.accepted_at,
-        Character.id.label("character_id"),
-        Character.name.label("character_name"),
-        Mission.id.label("mission_id"),
+    entries = db.execute(history_query(character_id, limit, before)).all()
+    set_history_cursor(response, entries, limit)
+    return entries
+
+def history_query(character_id: int, limit: int, before: Optional[str]):
+    """One page of the history of a character, most recent first (400 on a malformed cursor)"""
+    query = select(
+        CharacterMissionHistory.id,
+        CharacterMissionHistory.mission_id,
+        CharacterMissionHistory.status,
+        CharacterMissionHistory.queue_position,
+        CharacterMissionHistory.accepted_at,
+        CharacterMissionHistory.completed_at,
         Mission.title,
-        Mission.description,
         Mission.xp_reward,
         Mission.difficulty
     ).join(
-        Mission, CharacterMission.mission_id == Mission.id
-    ).join(
-        Character, CharacterMission.character_id == Character.id
-    ).filter(
-        CharacterMission.character_id == character_id
-    ).order_by(CharacterMission.queue_position.asc()).all()
-    
-    return missions
+        Mission, CharacterMissionHistory.mission_id == Mission.id
+    ).where(
+        CharacterMissionHistory.character_id == character_id
+    )
+    if before is not None:
+        # Cursor "<completed_at ISO>,<id>"; the id breaks ties between equal timestamps
+        try:
+            completed_at, _, entry_id = before.rpartition(",")
+            cursor = (datetime.fromisoformat(completed_at), int(entry_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(CharacterMissionHistory.completed_at, CharacterMissionHistory.id) < tuple_(*cursor)
+        )
+    return query.order_by(
+        CharacterMissionHistory.completed_at.desc(), CharacterMissionHistory.id.desc()
+    ).limit(limit)
+
+def set_history_cursor(response: Response, entries, limit: int) -> None:
+    """X-Next-Cursor ("<completed_at ISO>,<id>") of the last entry when the page is full"""
+    if len(entries) == limit:
+        response.headers["X-Next-Cursor"] = f"{entries[-1].completed_at.isoformat()},{entries[-1].id}"
 
 @router.post("/{character_id}/misiones/{mission_id}", response_model=CharacterMissionSchema)
+@coalesce
 def accept_mission(character_id: int, mission_id: int, db: Session = Depends(get_db)):
     """Accept a mission for a character (add to queue)"""
-    # Check if mission exists
-    mission = db.query(Mission).filter(Mission.id == mission_id).first()
+    # Check if mission exists (in-memory catalog)
+    app_services = services(db)
+    mission = app_services.catalog.get(db, mission_id)
     if not mission:
         raise HTTPException(status_code=404, detail="Mission not found")
     
@@ -118,43 +213,96 @@ def accept_mission(character_id: int, mission_id: int, db: Session = Depends(get
         raise HTTPException(status_code=400, detail="Mission already accepted")
     
     # Use the queue to add the mission
-    mission_queue = MissionQueue(db, character_id)
+    mission_queue = app_services.mission_queue(db, character_id)
     character_mission = mission_queue.enqueue(mission_id)
     
     return character_mission
 
+@router.post("/{character_id}/misiones", response_model=List[MissionBatchAcceptResult])
+@coalesce
+def accept_missions(character_id: int, batch: MissionBatchAccept, db: Session = Depends(get_db)):
+    """Accept several missions for a character in one transaction (added to the queue in order)"""
+    # Check if character exists
+    character = db.query(Character).filter(Character.id == character_id).first()
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
+    
+    # Missions are validated as a set and inserted with consecutive queue positions
+    mission_queue = services(db).mission_queue(db, character_id)
+    results = mission_queue.enqueue_many(batch.mission_ids)
+    
+    return [
+        {"mission_id": mission_id, "result": result, "character_mission": character_mission}
+        for mission_id, result, character_mission in results
+    ]
+
 @router.post("/{character_id}/completar", response_model=CharacterMissionSchema)
+@coalesce
 def complete_current_mission(character_id: int, db: Session = Depends(get_db)):
     """Complete the current mission in the queue and award XP"""
+    # Complete the head of the queue and award XP in a single transaction
+    mission_queue = services(db).mission_queue(db, character_id)
+    try:
+        completed_mission = mission_queue.complete()
+    except ValueError as exc:
+        # Lost the completion race more times than there were queued entries
+        raise HTTPException(status_code=409, detail=str(exc))
+    
+    if not completed_mission:
+        # Check if character exists
+        character = db.query(Character).filter(Character.id == character_id).first()
+        if not character:
+            raise HTTPException(status_code=404, detail="Character not found")
+        raise HTTPException(status_code=404, detail="No missions in queue")
+    
+    return completed_mission
+
+@router.post("/{character_id}/misiones/{mission_id}/cancelar", response_model=CharacterMissionSchema)
+@coalesce
+def cancel_mission(character_id: int, mission_id: int, db: Session = Depends(get_db)):
+    """Cancel a queued mission (removed from the queue and kept in the history as cancelled)"""
     # Check if character exists
     character = db.query(Character).filter(Character.id == character_id).first()
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
     
-    # Use the queue to get the next mission
-    mission_queue = MissionQueue(db, character_id)
-    current_mission = mission_queue.first()
-    
-    if not current_mission:
-        raise HTTPException(status_code=404, detail="No missions in queue")
+    mission_queue = services(db).mission_queue(db, character_id)
+    cancelled_mission = mission_queue.cancel(mission_id)
     
-    if current_mission.status != "in_progress":
-        # Start the mission first if it's not already in progress
-        current_mission.status = "in_progress"
-        db.commit()
+    if not cancelled_mission:
+        raise HTTPException(status_code=404, detail="Mission not in queue")
     
-    # Complete the mission
-    completed_mission = mission_queue.dequeue()
+    return cancelled_mission
+
+@router.post("/{character_id}/misiones/{mission_id}/mover", response_model=CharacterMissionSchema)
+@coalesce
+def move_mission(character_id: int, mission_id: int, move: MissionMove, db: Session = Depends(get_db)):
+    """Reorder a queued mission: to the front, or before/after another queued mission"""
+    if move.position != "front":
+        if move.anchor_mission_id is None:
+            raise HTTPException(status_code=400, detail="anchor_mission_id is required to move before/after a mission")
+        if move.anchor_mission_id == mission_id:
+            raise HTTPException(status_code=400, detail="A mission cannot be moved relative to itself")
     
-    # Award XP to character
-    mission = db.query(Mission).filter(Mission.id == completed_mission.mission_id).first()
-    character.experience += mission.xp_reward
+    # Check if character exists
+    character = db.query(Character).filter(Character.id == character_id).first()
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
     
-    # Level up if enough XP (simple leveling system)
-    xp_for_next_level = character.level * 100
-    if character.experience >= xp_for_next_level:
-        character.level += 1
+    # Sparse positions: only the moved entry is written (the queue is renumbered only when a gap runs out)
+    mission_queue = services(db).mission_queue(db, character_id)
+    try:
+        if move.position == "front":
+            moved_mission = mission_queue.move_to_front(mission_id)
+        elif move.position == "before":
+            moved_mission = mission_queue.move_before(mission_id, move.anchor_mission_id)
+        else:
+            moved_mission = mission_queue.move_after(mission_id, move.anchor_mission_id)
+    except ValueError as exc:
+        # Missions in progress stay ahead of the pending ones
+        raise HTTPException(status_code=409, detail=str(exc))
     
-    db.commit()
+    if not moved_mission:
+        raise HTTPException(status_code=404, detail="Mission not in queue")
     
-    return completed_mission
\ No newline at end of file
+    return moved_mission
\ No newline at end of file
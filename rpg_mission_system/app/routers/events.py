@@ -0,0 +1,103 @@
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.routers import async_characters, characters
+from app.schemas.character import CharacterDetail
+from app.serialization import dumps
+from app.tda.events import DROPPED, EventHub
+
+router = APIRouter(
+    prefix="/personajes",
+    tags=["events"]
+)
+
+# Comentario SSE enviado cuando no hay eventos, para que proxies y clientes no corten la conexión
+KEEPALIVE_SECONDS = 15
+
+def _snapshot(session, character_id: int, event_hub: EventHub) -> dict:
+    """Current character stats and live queue, serialized like the REST endpoints.
+
+    The hub's sequence number is read before the first query: events up to it were
+    published after their commit, so the snapshot already includes them.
+    """
+    sequence = event_hub.sequence
+    character = characters.get_character(character_id, db=session)
+    return _snapshot_event(sequence, character, characters.character_queue_items(session, character_id))
+
+async def _snapshot_async(db, character_id: int, event_hub: EventHub) -> dict:
+    """_snapshot() on an AsyncSession (RPG_ASYNC=1)"""
+    sequence = event_hub.sequence
+    character = await async_characters.get_character(character_id, db=db)
+    return _snapshot_event(sequence, character, await async_characters.character_queue_items(db, character_id))
+
+def _snapshot_event(sequence: int, character, queue: list) -> dict:
+    return {
+        "type": "snapshot",
+        "sequence": sequence,
+        "character": jsonable_encoder(CharacterDetail.model_validate(character, from_attributes=True)),
+        "queue": queue,
+    }
+
+async def _read_snapshot(request: Request, character_id: int, event_hub: EventHub) -> dict:
+    # Short-lived session instead of Depends(get_db): a dependency would keep its
+    # connection checked out of the pool for as long as the stream stays open
+    state = request.app.state
+    if state.settings.use_async:
+        async with state.AsyncSessionLocal() as db:
+            return await _snapshot_async(db, character_id, event_hub)
+    def read():
+        with state.SessionLocal() as db:
+            return _snapshot(db, character_id, event_hub)
+    return await run_in_threadpool(read)
+
+def _format(sequence: int, event: dict) -> str:
+    return f"id: {sequence}\nevent: {event['type']}\ndata: {dumps(event).decode()}\n\n"
+
+@router.get("/{character_id}/eventos")
+async def stream_character_events(character_id: int, request: Request):
+    """Server-Sent Events stream of queue, XP and level changes of a character.
+
+    The first event is a snapshot of the character and its live queue; after that
+    only deltas are sent (enqueued, started, moved, reordered, removed, completed).
+    Deltas already covered by the snapshot (sequence at or below its own) are skipped.
+    Every delta carries absolute values keyed by entry id, so applying one the
+    snapshot already reflects leaves the client state unchanged.
+    A client that falls too far behind receives "dropped" and should reconnect.
+    """
+    # Subscribe before reading the snapshot so no change between both is lost
+    event_hub = request.app.state.services.events
+    subscription = event_hub.subscribe(character_id)
+    try:
+        snapshot = await _read_snapshot(request, character_id, event_hub)
+    except BaseException:
+        # Character not found (404) or client gone before the first byte
+        event_hub.unsubscribe(subscription)
+        raise
+
+    async def stream():
+        try:
+            yield _format(snapshot["sequence"], snapshot)
+            while True:
+                try:
+                    sequence, event = await asyncio.wait_for(subscription.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if sequence <= snapshot["sequence"] and event is not DROPPED:
+                    # Committed and published before the snapshot was read
+                    continue
+                yield _format(sequence, event)
+                if event is DROPPED:
+                    return
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
\ No newline at end of file
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.character import Character
+from app.models.character_mission import CharacterMission
+from app.models.character_mission_history import CharacterMissionHistory
+from app.models.mission import Mission
+from app.serialization import dumps
+
+router = APIRouter(
+    prefix="/exportar",
+    tags=["export"]
+)
+
+# Filas leídas del cursor (y líneas enviadas) por bloque
+EXPORT_BATCH_SIZE = 1000
+
+def _ndjson(db: Session, statement) -> StreamingResponse:
+    """Stream the rows of a statement as NDJSON without loading them all in memory"""
+    def lines():
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for rows in result.partitions():
+            yield b"".join(dumps(dict(row._mapping)) + b"\n" for row in rows)
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/personajes")
+def export_characters(db: Session = Depends(get_db)):
+    """Export every character as NDJSON"""
+    return _ndjson(db, select(
+        Character.id,
+        Character.name,
+        Character.level,
+        Character.experience
+    ).order_by(Character.id))
+
+@router.get("/misiones")
+def export_missions(db: Session = Depends(get_db)):
+    """Export the mission catalog as NDJSON"""
+    return _ndjson(db, select(
+        Mission.id,
+        Mission.title,
+        Mission.description,
+        Mission.xp_reward,
+        Mission.difficulty
+    ).order_by(Mission.id))
+
+@router.get("/personajes/{character_id}/misiones")
+def export_character_missions(character_id: int, db: Session = Depends(get_db)):
+    """Export a character's full mission history (all statuses) as NDJSON"""
+    character = db.get(Character, character_id)
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
+
+    # Live queue and archived (completed) entries, merged in queue order
+    entries = union_all(
+        select(
+            CharacterMission.id,
+            CharacterMission.character_id,
+            CharacterMission.mission_id,
+            CharacterMission.status,
+            CharacterMission.queue_position,
+            CharacterMission.accepted_at,
+            CharacterMission.completed_at
+        ).where(CharacterMission.character_id == character_id),
+        select(
+            CharacterMissionHistory.id,
+            CharacterMissionHistory.character_id,
+            CharacterMissionHistory.mission_id,
+            CharacterMissionHistory.status,
+            CharacterMissionHistory.queue_position,
+            CharacterMissionHistory.accepted_at,
+            CharacterMissionHistory.completed_at
+        ).where(CharacterMissionHistory.character_id == character_id)
+    ).subquery()
+    return _ndjson(db, select(entries).order_by(entries.c.queue_position))
\ No newline at end of file
@@ -0,0 +1,75 @@
+import csv
+import io
+from typing import Literal, Optional
+
+import anyio.from_thread
+from fastapi import APIRouter, HTTPException, Query, Request
+from starlette.concurrency import run_in_threadpool
+
+from app.importer import IMPORT_CHUNK_SIZE, guess_format, import_missions, parse_rows
+from app.schemas.mission import MissionImportSummary
+
+router = APIRouter(
+    prefix="/importar",
+    tags=["import"]
+)
+
+# Filas por transacción como máximo
+MAX_CHUNK_SIZE = 10_000
+
+class _RequestBody(io.RawIOBase):
+    """Request body as a blocking binary file for a worker thread.
+
+    Each read pulls the next chunk from the event loop, so only the current chunk
+    of the upload is held in memory.
+    """
+
+    def __init__(self, request: Request):
+        self._chunks = request.stream()
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = anyio.from_thread.run(self._next_chunk)
+            if chunk is None:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+@router.post("/misiones", response_model=MissionImportSummary)
+async def import_missions_file(
+    request: Request,
+    format: Optional[Literal["jsonl", "csv"]] = Query(None, description="Defaults to csv for a text/csv body, JSON Lines otherwise"),
+    chunk_size: int = Query(IMPORT_CHUNK_SIZE, ge=1, le=MAX_CHUNK_SIZE, description="Rows validated and inserted per transaction")
+):
+    """Bulk import missions from a JSON Lines or CSV request body.
+
+    The body is streamed and imported in chunked transactions; invalid rows are
+    reported by line number without stopping the load. Rows committed before a
+    malformed body (not UTF-8, broken CSV) is detected stay imported.
+    """
+    format = format or guess_format(request.headers.get("content-type", "").split(";")[0])
+
+    def load():
+        # Sync engine in a worker thread (also in async mode): a long batch job off the event loop
+        lines = io.TextIOWrapper(io.BufferedReader(_RequestBody(request)), encoding="utf-8-sig", newline="")
+        with request.app.state.SessionLocal() as db:
+            return import_missions(db, parse_rows(lines, format), chunk_size)
+
+    try:
+        summary = await run_in_threadpool(load)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise HTTPException(status_code=400, detail=f"Malformed {format} body: {exc}")
+    return summary.as_dict()
\ No newline at end of file
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.database import get_db, MAX_PAGE_SIZE
+from app.schemas.character import CharacterRank
+from app.serialization import FastJSONResponse
+from app.services import services
+from app.tda.leaderboard import Leaderboard
+
+router = APIRouter(
+    prefix="/clasificacion",
+    tags=["leaderboard"]
+)
+
+# Puestos por encima y por debajo como máximo en /vecinos
+MAX_WINDOW = 50
+
+def get_leaderboard(db: Session = Depends(get_db)) -> Leaderboard:
+    """In-memory leaderboard of the app; built from the characters table if the warm-up has not loaded it yet"""
+    leaderboard = services(db).leaderboard
+    leaderboard.ensure_loaded(db)
+    return leaderboard
+
+@router.get("/", response_model=List[CharacterRank])
+def get_top(
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    board: Leaderboard = Depends(get_leaderboard)
+):
+    """Get the top characters by level and experience (ranks offset + 1 to offset + limit)"""
+    return FastJSONResponse([entry._asdict() for entry in board.top(limit, offset)])
+
+@router.get("/{character_id}", response_model=CharacterRank)
+def get_rank(character_id: int, board: Leaderboard = Depends(get_leaderboard)):
+    """Get the rank of a character"""
+    entry = board.rank(character_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return entry._asdict()
+
+@router.get("/{character_id}/vecinos", response_model=List[CharacterRank])
+def get_neighbors(
+    character_id: int,
+    window: int = Query(5, ge=1, le=MAX_WINDOW, description="Ranks above and below the character"),
+    board: Leaderboard = Depends(get_leaderboard)
+):
+    """Get the characters ranked right above and below a character"""
+    entries = board.around(character_id, window)
+    if not entries:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return FastJSONResponse([entry._asdict() for entry in entries])
\ No newline at end of file
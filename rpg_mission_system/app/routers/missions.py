@@ -1,20 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import hashlib
 
-from app.database import get_db
+from app.database import get_db, MAX_PAGE_SIZE
 from app.models.mission import Mission
 from app.models.character import Character
 from app.models.character_mission import CharacterMission
 from app.schemas.mission import Mission as MissionSchema
 from app.schemas.mission import MissionCreate, CharacterMission as CharacterMissionSchema
-from app.tda.queue import MissionQueue
+from app.search import search_missions as search_catalog
+from app.serialization import FastJSONResponse, dumps
+from app.services import coalesce, services
+from app.tda.catalog import MissionCatalog, MissionRecord, RECORD_COLUMNS
 
 router = APIRouter(
     prefix="/misiones",  # Cambiado a español según el PDF
     tags=["missions"]
 )
 
+def conditional_response(request: Request, payload) -> Response:
+    """JSON response with an ETag; returns 304 when the client already has this version"""
+    body = dumps(payload)
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.post("/", response_model=MissionSchema)
 def create_mission(mission: MissionCreate, db: Session = Depends(get_db)):
     """Create a new mission"""
@@ -22,32 +37,81 @@ def create_mission(mission: MissionCreate, db: Session = Depends(get_db)):
     db.add(db_mission)
     db.commit()
     db.refresh(db_mission)
+    services(db).catalog.add(MissionCatalog.record(db_mission))
     return db_mission
 
 @router.get("/", response_model=List[MissionSchema])
 def get_missions(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = Query(None, ge=0, description="Keyset cursor: return missions with id greater than this"),
+    db: Session = Depends(get_db)
+):
+    """Get a list of missions (use after_id / X-Next-Cursor for keyset pagination; supports If-None-Match)"""
+    rows = db.execute(missions_page_query(skip, limit, after_id))
+    return missions_page(request, services(db).catalog, rows, limit)
+
+def missions_page_query(skip: int, limit: int, after_id: Optional[int]):
+    """One page of missions: only the catalog columns (also run by the async router)"""
+    query = select(*RECORD_COLUMNS).order_by(Mission.id)
+    if after_id is not None:
+        query = query.where(Mission.id > after_id)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def missions_page(request: Request, catalog: MissionCatalog, rows, limit: int) -> Response:
+    """Rows as tuples (no ORM objects or per-row schema validation), added to the catalog; ETag and X-Next-Cursor"""
+    records = [MissionRecord(*row) for row in rows]
+    for record in records:
+        catalog.add(record)
+    
+    response = conditional_response(request, [record._asdict() for record in records])
+    if len(records) == limit:
+        response.headers["X-Next-Cursor"] = str(records[-1].id)
+    return response
+
+# Declared before /{mission_id} so "buscar" is not parsed as a mission id
+@router.get("/buscar", response_model=List[MissionSchema])
+def search_missions(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in the title or description"),
+    min_difficulty: Optional[int] = Query(None, ge=1, le=5),
+    max_difficulty: Optional[int] = Query(None, ge=1, le=5),
+    min_xp: Optional[int] = Query(None, ge=0),
+    max_xp: Optional[int] = Query(None, ge=0),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
-    """Get a list of missions"""
-    missions = db.query(Mission).offset(skip).limit(limit).all()
-    return missions
+    """Full-text search over missions, most relevant first (every word must match, as a prefix)"""
+    try:
+        records = search_catalog(
+            db, q, min_difficulty=min_difficulty, max_difficulty=max_difficulty,
+            min_xp=min_xp, max_xp=max_xp, skip=skip, limit=limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Search query has no words")
+    catalog = services(db).catalog
+    for record in records:
+        catalog.add(record)
+    return FastJSONResponse([record._asdict() for record in records])
 
 @router.get("/{mission_id}", response_model=MissionSchema)
-def get_mission(mission_id: int, db: Session = Depends(get_db)):
-    """Get a mission by ID"""
-    mission = db.query(Mission).filter(Mission.id == mission_id).first()
+def get_mission(mission_id: int, request: Request, db: Session = Depends(get_db)):
+    """Get a mission by ID (served from the in-memory catalog; supports If-None-Match)"""
+    mission = services(db).catalog.get(db, mission_id)
     if not mission:
         raise HTTPException(status_code=404, detail="Mission not found")
-    return mission
+    return conditional_response(request, mission._asdict())
 
 # Mantener los endpoints adicionales para compatibilidad
 @router.post("/{mission_id}/accept", response_model=CharacterMissionSchema)
+@coalesce
 def accept_mission(mission_id: int, character_id: int, db: Session = Depends(get_db)):
     """Accept a mission for a character (add to queue)"""
-    # Check if mission exists
-    mission = db.query(Mission).filter(Mission.id == mission_id).first()
+    # Check if mission exists (in-memory catalog)
+    mission = services(db).catalog.get(db, mission_id)
     if not mission:
         raise HTTPException(status_code=404, detail="Mission not found")
     
@@ -67,12 +131,13 @@ def accept_mission(mission_id: int, character_id: int, db: Session = Depends(get
         raise HTTPException(status_code=400, detail="Mission already accepted")
     
     # Use the queue to add the mission
-    mission_queue = MissionQueue(db, character_id)
+    mission_queue = services(db).mission_queue(db, character_id)
     character_mission = mission_queue.enqueue(mission_id)
     
     return character_mission
 
 @router.post("/{mission_id}/start", response_model=CharacterMissionSchema)
+@coalesce
 def start_mission(mission_id: int, character_id: int, db: Session = Depends(get_db)):
     """Start the next mission in the queue"""
     # Check if character exists
@@ -81,8 +146,8 @@ def start_mission(mission_id: int, character_id: int, db: Session = Depends(get_
         raise HTTPException(status_code=404, detail="Character not found")
     
     # Use the queue to get the next mission
-    mission_queue = MissionQueue(db, character_id)
-    next_mission = mission_queue.first()
+    mission_queue = services(db).mission_queue(db, character_id)
+    next_mission = mission_queue.peek()
     
     if not next_mission:
         raise HTTPException(status_code=404, detail="No missions in queue")
@@ -91,44 +156,24 @@ def start_mission(mission_id: int, character_id: int, db: Session = Depends(get_
         raise HTTPException(status_code=400, 
                            detail=f"This mission is not the next in queue. Next mission ID: {next_mission.mission_id}")
     
-    # Start the mission
-    next_mission.status = "in_progress"
-    db.commit()
-    db.refresh(next_mission)
-    
-    return next_mission
+    # Start the mission (the head may already be in progress)
+    if next_mission.status == "pending":
+        return mission_queue.start_next_mission()
+    return mission_queue.first()
 
 @router.post("/{mission_id}/complete", response_model=CharacterMissionSchema)
+@coalesce
 def complete_mission(mission_id: int, character_id: int, db: Session = Depends(get_db)):
     """Complete the current mission and award XP"""
-    # Check if character exists
-    character = db.query(Character).filter(Character.id == character_id).first()
-    if not character:
-        raise HTTPException(status_code=404, detail="Character not found")
-    
-    # Check if the mission is in progress
-    mission_entry = db.query(CharacterMission).filter(
-        CharacterMission.character_id == character_id,
-        CharacterMission.mission_id == mission_id,
-        CharacterMission.status == "in_progress"
-    ).first()
-    
-    if not mission_entry:
+    # Complete the in-progress entry and award XP in a single transaction
+    mission_queue = services(db).mission_queue(db, character_id)
+    completed_mission = mission_queue.complete(mission_id=mission_id, require_in_progress=True)
+    
+    if not completed_mission:
+        # Check if character exists
+        character = db.query(Character).filter(Character.id == character_id).first()
+        if not character:
+            raise HTTPException(status_code=404, detail="Character not found")
         raise HTTPException(status_code=400, detail="Mission not in progress")
     
-    # Use the queue to dequeue (complete) the mission
-    mission_queue = MissionQueue(db, character_id)
-    completed_mission = mission_queue.dequeue()
-    
-    # Award XP to character
-    mission = db.query(Mission).filter(Mission.id == mission_id).first()
-    character.experience += mission.xp_reward
-    
-    # Level up if enough XP (simple leveling system)
-    xp_for_next_level = character.level * 100
-    if character.experience >= xp_for_next_level:
-        character.level += 1
-    
-    db.commit()
-    
     return completed_mission
\ No newline at end of file
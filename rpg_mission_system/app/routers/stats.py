@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app.models.character import Character
+from app.models.mission import Mission
+from app.models.stats import CharacterStats, DailyStats, DifficultyStats, MissionStats
+from app.schemas import stats as schemas
+from app.serialization import FastJSONResponse
+
+router = APIRouter(
+    prefix="/estadisticas",
+    tags=["stats"]
+)
+
+# Días por consulta como máximo en /dias
+MAX_DAYS = 366
+
+def _summary(row, key: str, value) -> dict:
+    """Counters of a rollup row plus the derived averages and rates"""
+    summary = {key: value}
+    if row is None:
+        return summary
+    table = row.__table__
+    summary.update({column.name: getattr(row, column.name) for column in table.columns if not column.primary_key})
+    seconds = summary.pop("completion_seconds")
+    summary["average_completion_seconds"] = seconds / row.completed if row.completed else None
+    if "accepted" in summary:
+        summary["completion_rate"] = row.completed / row.accepted if row.accepted else None
+    return summary
+
+@router.get("/personajes/{character_id}", response_model=schemas.CharacterStats)
+def get_character_stats(character_id: int, db: Session = Depends(get_db)):
+    """Get the totals of a character: XP earned, missions completed and average time to complete"""
+    row = db.get(CharacterStats, character_id)
+    if row is None and db.get(Character, character_id) is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return _summary(row, "character_id", character_id)
+
+@router.get("/misiones/{mission_id}", response_model=schemas.MissionStats)
+def get_mission_stats(mission_id: int, db: Session = Depends(get_db)):
+    """Get the acceptance and completion totals of a mission"""
+    row = db.get(MissionStats, mission_id)
+    if row is None and db.get(Mission, mission_id) is None:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    return _summary(row, "mission_id", mission_id)
+
+@router.get("/dificultades", response_model=List[schemas.DifficultyStats])
+def get_difficulty_stats(db: Session = Depends(get_db)):
+    """Get the completion rate and average time to complete per mission difficulty"""
+    rows = db.scalars(select(DifficultyStats).order_by(DifficultyStats.difficulty))
+    return FastJSONResponse([_summary(row, "difficulty", row.difficulty) for row in rows])
+
+@router.get("/dias", response_model=List[schemas.DailyStats])
+def get_daily_stats(
+    since: Optional[date] = Query(None, alias="desde", description="First day (UTC); defaults to 29 days before until"),
+    until: Optional[date] = Query(None, alias="hasta", description="Last day (UTC); defaults to today"),
+    db: Session = Depends(get_db)
+):
+    """Get the missions completed per day; days without activity are omitted"""
+    until = until or datetime.utcnow().date()
+    since = since or until - timedelta(days=29)
+    if since > until:
+        raise HTTPException(status_code=400, detail="desde must not be after hasta")
+    if (until - since).days >= MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_DAYS} days per request")
+    rows = db.scalars(
+        select(DailyStats).where(DailyStats.day.between(since, until)).order_by(DailyStats.day)
+    )
+    return FastJSONResponse([_summary(row, "day", row.day) for row in rows])
\ No newline at end of file
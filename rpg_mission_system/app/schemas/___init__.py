@@ -1,3 +1,8 @@
 # app/schemas/__init__.py
 from app.schemas.character import Character, CharacterCreate, CharacterDetail
-from app.schemas.mission import Mission, MissionCreate, CharacterMission, MissionQueueItem
\ No newline at end of file
+from app.schemas.character import CharacterBatchComplete, CharacterCompletionSummary, CharacterRank
+from app.schemas.mission import Mission, MissionCreate, CharacterMission, MissionQueueItem
+from app.schemas.mission import MissionBatchAccept, MissionBatchAcceptResult, MissionHistoryItem
+from app.schemas.mission import MissionMove
+from app.schemas.mission import MissionImportError, MissionImportSummary
+from app.schemas.stats import CharacterStats, MissionStats, DifficultyStats, DailyStats
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 # Character base schema with common attributes
@@ -24,4 +24,23 @@ class CharacterDetail(Character):
     pending_missions: int = 0
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+# Position of a character in the leaderboard (rank starts at 1)
+class CharacterRank(Character):
+    rank: int
+
+# Schema for completing the head mission of many characters at once (game tick)
+class CharacterBatchComplete(BaseModel):
+    # None means every character with a mission in progress
+    character_ids: Optional[List[int]] = None
+    chunk_size: int = Field(500, ge=1, le=5000)
+
+# Per-character summary of a batch completion
+class CharacterCompletionSummary(BaseModel):
+    character_id: int
+    character_mission_id: int
+    mission_id: int
+    xp_gained: int
+    experience: int
+    level: int
\ No newline at end of file
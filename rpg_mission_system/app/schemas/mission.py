@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from datetime import datetime
 
 # Mission base schema with common attributes
@@ -48,4 +48,48 @@ class MissionQueueItem(BaseModel):
     accepted_at: datetime
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+# Schema for a finished ("completed" or "cancelled") mission in a character's history
+class MissionHistoryItem(BaseModel):
+    id: int
+    mission_id: int
+    status: str
+    title: str
+    xp_reward: int
+    difficulty: int
+    queue_position: int
+    accepted_at: datetime
+    completed_at: datetime
+    
+    class Config:
+        orm_mode = True
+
+# Maximum number of missions accepted in a single batch request
+MAX_BATCH_ACCEPT = 1000
+
+# Schema for accepting several missions at once
+class MissionBatchAccept(BaseModel):
+    mission_ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_ACCEPT)
+
+# Per-mission result of a batch accept: "accepted", "duplicate" or "not_found"
+class MissionBatchAcceptResult(BaseModel):
+    mission_id: int
+    result: str
+    character_mission: Optional[CharacterMission] = None
+
+# Schema for reordering a queued mission: to the front, or before/after another queued mission
+class MissionMove(BaseModel):
+    position: Literal["front", "before", "after"]
+    anchor_mission_id: Optional[int] = None
+
+# Rejected row of a bulk mission import (line number in the uploaded file)
+class MissionImportError(BaseModel):
+    line: int
+    error: str
+
+# Result of a bulk mission import; errors holds at most the first 100 rejected rows
+class MissionImportSummary(BaseModel):
+    imported: int
+    failed: int
+    errors: List[MissionImportError]
\ No newline at end of file
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+# Completion counters shared by every rollup; the average is None until something completes
+class CompletionStats(BaseModel):
+    completed: int = 0
+    cancelled: int = 0
+    xp_earned: int = 0
+    average_completion_seconds: Optional[float] = None
+
+# Counters for anything that can be accepted; completion_rate is completed / accepted
+class AcceptanceStats(CompletionStats):
+    accepted: int = 0
+    completion_rate: Optional[float] = None
+
+# Totals of a character
+class CharacterStats(AcceptanceStats):
+    character_id: int
+    last_completed_at: Optional[datetime] = None
+
+# Totals of a mission
+class MissionStats(AcceptanceStats):
+    mission_id: int
+
+# Totals of every mission of a difficulty
+class DifficultyStats(AcceptanceStats):
+    difficulty: int
+
+# Missions completed and cancelled on a day (UTC)
+class DailyStats(CompletionStats):
+    day: date
\ No newline at end of file
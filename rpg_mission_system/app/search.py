@@ -0,0 +1,152 @@
+import re
+from typing import List, Optional
+
+from sqlalchemy import column, func, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+from app.models.mission import Mission
+from app.tda.catalog import MissionRecord, RECORD_COLUMNS
+
+# Tabla FTS5 de contenido externo sobre missions(title, description): guarda solo
+# el índice invertido y lee el texto de missions por rowid (= missions.id)
+FTS_TABLE = "missions_fts"
+
+# Peso de cada columna en bm25(): una coincidencia en el título pesa más
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Términos considerados por búsqueda
+MAX_TERMS = 16
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+# Triggers que mantienen el índice al día con cualquier escritura sobre missions
+# (create_mission, cargas masivas, SQL directo)
+_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, description,
+        content='missions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER missions_fts_insert AFTER INSERT ON missions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER missions_fts_delete AFTER DELETE ON missions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER missions_fts_update AFTER UPDATE OF title, description ON missions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+def create_search_index(conn) -> bool:
+    """Crea la tabla FTS5 y sus triggers si faltan, e indexa las misiones existentes.
+
+    Solo en SQLite; devuelve True si el índice se creó en esta llamada.
+    """
+    if conn.dialect.name != "sqlite":
+        return False
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).scalar()
+    if exists:
+        return False
+    for ddl in _FTS_DDL:
+        conn.exec_driver_sql(ddl)
+    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def search_terms(text: str) -> List[str]:
+    """Palabras de la búsqueda, en minúsculas y sin repetir"""
+    terms = []
+    for term in _TERM.findall(text.lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def fts_query(terms: List[str]) -> str:
+    """Expresión MATCH: todas las palabras, cada una como prefijo ("drag" encuentra "dragon").
+
+    Cada término va entre comillas, así la sintaxis de FTS5 (AND, NEAR, *, :) del
+    texto del usuario no se interpreta.
+    """
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+def search_missions(
+    db: Session,
+    text: str,
+    min_difficulty: Optional[int] = None,
+    max_difficulty: Optional[int] = None,
+    min_xp: Optional[int] = None,
+    max_xp: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> List[MissionRecord]:
+    """Misiones que contienen todas las palabras, de la más relevante a la menos.
+
+    En SQLite usa el índice FTS5 (ordenado por bm25); en otros motores recurre a
+    LIKE sobre título y descripción, ordenado por id.
+    """
+    query = search_query(
+        db.get_bind().dialect.name, text, min_difficulty, max_difficulty, min_xp, max_xp, skip, limit
+    )
+    return [MissionRecord(*row) for row in db.execute(query)]
+
+
+def search_query(
+    dialect: str,
+    text: str,
+    min_difficulty: Optional[int] = None,
+    max_difficulty: Optional[int] = None,
+    min_xp: Optional[int] = None,
+    max_xp: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20
+):
+    """SELECT de search_missions() para el dialecto indicado (también lo ejecuta el router async)"""
+    terms = search_terms(text)
+    if not terms:
+        raise ValueError("Empty search query")
+
+    filters = []
+    if min_difficulty is not None:
+        filters.append(Mission.difficulty >= min_difficulty)
+    if max_difficulty is not None:
+        filters.append(Mission.difficulty <= max_difficulty)
+    if min_xp is not None:
+        filters.append(Mission.xp_reward >= min_xp)
+    if max_xp is not None:
+        filters.append(Mission.xp_reward <= max_xp)
+
+    if dialect == "sqlite":
+        fts = table(FTS_TABLE, column("rowid"))
+        fts_column = literal_column(FTS_TABLE)
+        query = select(*RECORD_COLUMNS).select_from(
+            fts.join(Mission, Mission.id == fts.c.rowid)
+        ).where(
+            fts_column.op("MATCH")(fts_query(terms)), *filters
+        ).order_by(
+            func.bm25(fts_column, TITLE_WEIGHT, DESCRIPTION_WEIGHT), Mission.id
+        )
+    else:
+        query = select(*RECORD_COLUMNS).where(
+            *(or_(Mission.title.ilike(f"%{term}%"), Mission.description.ilike(f"%{term}%")) for term in terms),
+            *filters
+        ).order_by(Mission.id)
+
+    return query.offset(skip).limit(limit)
\ No newline at end of file
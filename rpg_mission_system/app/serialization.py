@@ -0,0 +1,35 @@
+import json
+from datetime import date, datetime
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa json de la biblioteca estándar
+    orjson = None
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    """JSON compacto en bytes; fechas en ISO 8601, igual que los esquemas de pydantic"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode()
+
+
+class FastJSONResponse(Response):
+    """Respuesta JSON para filas que ya vienen con la forma del esquema.
+
+    Los listados seleccionan solo las columnas del esquema de respuesta y devuelven
+    dicts; al devolver una Response, FastAPI no valida fila por fila con pydantic.
+    El response_model del endpoint se mantiene para la documentación OpenAPI.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
\ No newline at end of file
@@ -0,0 +1,76 @@
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.tda.async_queue import AsyncMissionQueue
+from app.tda.catalog import MissionCatalog, mission_catalog
+from app.tda.events import EventHub, event_hub
+from app.tda.group_commit import GroupCommitWriter, group_commit
+from app.tda.leaderboard import Leaderboard, leaderboard
+from app.tda.queue import MissionQueue, MissionQueueCache, queue_cache
+
+# Clave de session.info con los servicios de la app dueña de la sesión
+SERVICES_KEY = "app_services"
+
+
+@dataclass
+class AppServices:
+    """Estructuras en memoria de una instancia de la app.
+
+    create_app() crea unas nuevas por app y las deja en el info de cada sesión de
+    su fábrica; así dos apps en el mismo proceso (ej. en tests) no comparten cachés,
+    clasificación, suscriptores ni escritor de group commit.
+
+    Todas viven en la memoria del proceso: con varios workers cada uno tiene las
+    suyas y no ve las escrituras de los demás ni las de la CLI.
+    """
+    # None con RPG_QUEUE_CACHE=0 (por defecto): las colas se leen siempre de la base
+    queue_cache: Optional[MissionQueueCache] = None
+    catalog: MissionCatalog = field(default_factory=MissionCatalog)
+    events: EventHub = field(default_factory=EventHub)
+    leaderboard: Leaderboard = field(default_factory=Leaderboard)
+    group_commit: GroupCommitWriter = field(default_factory=GroupCommitWriter)
+
+    def mission_queue(self, db: Session, character_id: int) -> MissionQueue:
+        """Cola del personaje con la caché, el catálogo, los eventos y la clasificación de la app"""
+        return MissionQueue(
+            db, character_id, cache=self.queue_cache, catalog=self.catalog, events=self.events,
+            leaderboard=self.leaderboard
+        )
+
+    def async_mission_queue(self, db: AsyncSession, character_id: int) -> AsyncMissionQueue:
+        """mission_queue() para los routers async"""
+        return AsyncMissionQueue(
+            db, character_id, cache=self.queue_cache, catalog=self.catalog, events=self.events,
+            leaderboard=self.leaderboard
+        )
+
+    @property
+    def session_info(self) -> dict:
+        """info de las sesiones de la app: services(db) encuentra estos servicios"""
+        return {SERVICES_KEY: self}
+
+
+# Servicios de las sesiones que no vienen de una app (CLI, benchmarks, check-plans);
+# los módulos de app.tda crean una instancia de cada estructura para ellos
+default_services = AppServices(
+    queue_cache if settings.queue_cache else None, mission_catalog, event_hub, leaderboard, group_commit
+)
+
+
+def services(db: Session) -> AppServices:
+    """Servicios de la app dueña de la sesión, o los compartidos si la sesión no viene de una app"""
+    return db.info.get(SERVICES_KEY, default_services)
+
+
+def coalesce(endpoint):
+    """Decorador de endpoints sync con parámetro db: con el group commit de la app en marcha,
+    el cuerpo del endpoint se ejecuta como una operación de un lote (GroupCommitWriter.run)"""
+    @wraps(endpoint)
+    def wrapper(*args, db: Session, **kwargs):
+        return services(db).group_commit.run(db, lambda session: endpoint(*args, db=session, **kwargs))
+    return wrapper
\ No newline at end of file
@@ -0,0 +1,276 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from app.models.character_mission import CharacterMission
+from app.models.character_mission_history import CharacterMissionHistory
+from app.models.mission import Mission
+from app.models.stats import CharacterStats, DailyStats, DifficultyStats, MissionStats
+from app.tda.catalog import MissionCatalog
+
+# Filas leídas por vuelta del cursor en rebuild_stats()
+REBUILD_BATCH_SIZE = 10_000
+
+# Tabla de agregados -> columna clave
+_ROLLUPS = (
+    (CharacterStats, "character_id"),
+    (MissionStats, "mission_id"),
+    (DifficultyStats, "difficulty"),
+    (DailyStats, "day"),
+)
+
+
+def _upsert(model, key: str):
+    """INSERT ... ON CONFLICT DO UPDATE que suma los contadores a la fila existente.
+
+    Texto armado una vez desde la tabla: la misma sintaxis vale en SQLite y
+    PostgreSQL, y a diferencia de insert().on_conflict_do_update() su compilación
+    queda en la caché de sentencias (se ejecuta en cada aceptación y completado).
+    """
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    assignments = [
+        f"{name} = {table.name}.{name} + excluded.{name}"
+        for name in columns if name != key and name != "last_completed_at"
+    ]
+    if "last_completed_at" in columns:
+        # La más reciente entre la guardada y la nueva (NULL si no hay completadas)
+        assignments.append(
+            f"last_completed_at = CASE WHEN {table.name}.last_completed_at >= excluded.last_completed_at "
+            f"THEN {table.name}.last_completed_at "
+            f"ELSE COALESCE(excluded.last_completed_at, {table.name}.last_completed_at) END"
+        )
+    return text(
+        f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join(':' + name for name in columns)}) "
+        f"ON CONFLICT ({key}) DO UPDATE SET {', '.join(assignments)}"
+    ).bindparams(*(bindparam(column.name, type_=column.type) for column in table.columns))
+
+
+_UPSERTS = {model: _upsert(model, key) for model, key in _ROLLUPS}
+
+
+class StatsRebuild(NamedTuple):
+    """Entradas leídas y filas escritas por rebuild_stats()"""
+    entries: int
+    characters: int
+    missions: int
+    difficulties: int
+    days: int
+
+
+class _Totals:
+    """Incrementos pendientes de escribir, agrupados por tabla y clave"""
+
+    def __init__(self):
+        self.rows = {model: defaultdict(Counter) for model, key in _ROLLUPS}
+        self.last_completed: Dict[int, datetime] = {}
+
+    def accepted(self, character_id: int, mission_id: int, difficulty: Optional[int]) -> None:
+        delta = {"accepted": 1}
+        self.rows[CharacterStats][character_id].update(delta)
+        self.rows[MissionStats][mission_id].update(delta)
+        if difficulty is not None:
+            self.rows[DifficultyStats][difficulty].update(delta)
+
+    def archived(self, row, xp_reward: Optional[int], difficulty: Optional[int]) -> None:
+        """Suma una entrada movida al historial: completada (con su XP y su duración) o cancelada"""
+        if row["status"] == "completed":
+            delta = {
+                "completed": 1,
+                "xp_earned": xp_reward or 0,
+                "completion_seconds": max((row["completed_at"] - row["accepted_at"]).total_seconds(), 0.0),
+            }
+            last = self.last_completed.get(row["character_id"])
+            if last is None or row["completed_at"] > last:
+                self.last_completed[row["character_id"]] = row["completed_at"]
+        else:
+            delta = {"cancelled": 1}
+        self.rows[CharacterStats][row["character_id"]].update(delta)
+        self.rows[MissionStats][row["mission_id"]].update(delta)
+        if difficulty is not None:
+            self.rows[DifficultyStats][difficulty].update(delta)
+        self.rows[DailyStats][row["completed_at"].date()].update(delta)
+
+    def upserts(self) -> List[Tuple[TextClause, List[Dict]]]:
+        """(sentencia, filas) de cada tabla con incrementos: cada fila suma a la existente o se crea"""
+        upserts = []
+        for model, key in _ROLLUPS:
+            totals = self.rows[model]
+            if not totals:
+                continue
+            counters = [
+                column.name for column in model.__table__.columns
+                if not column.primary_key and column.name != "last_completed_at"
+            ]
+            rows = []
+            # Orden por clave: dos transacciones concurrentes bloquean las filas en el mismo orden
+            for value in sorted(totals):
+                row = {key: value, **{name: totals[value][name] for name in counters}}
+                if model is CharacterStats:
+                    row["last_completed_at"] = self.last_completed.get(value)
+                rows.append(row)
+            upserts.append((_UPSERTS[model], rows))
+        return upserts
+
+    def write(self, db: Session) -> Dict[type, int]:
+        """Escribe los incrementos en la transacción actual. Devuelve las filas por tabla"""
+        for statement, rows in self.upserts():
+            db.execute(statement, rows)
+        return {model: len(self.rows[model]) for model, key in _ROLLUPS}
+
+    async def write_async(self, db: AsyncSession) -> None:
+        """write() para AsyncSession"""
+        for statement, rows in self.upserts():
+            await db.execute(statement, rows)
+
+    @classmethod
+    def for_accepted(cls, character_id: int, mission_ids: List[int], missions: Dict) -> "_Totals":
+        totals = cls()
+        for mission_id in mission_ids:
+            totals.accepted(character_id, mission_id, missions.get(mission_id, (None, None))[1])
+        return totals
+
+    @classmethod
+    def for_archived(cls, rows: List[Dict], missions: Dict, award_xp: bool) -> "_Totals":
+        totals = cls()
+        for row in rows:
+            xp_reward, difficulty = missions.get(row["mission_id"], (None, None))
+            totals.archived(row, xp_reward if award_xp else 0, difficulty)
+        return totals
+
+
+def _mission_query(mission_ids: Iterable[int]):
+    return select(Mission.id, Mission.xp_reward, Mission.difficulty).where(Mission.id.in_(set(mission_ids)))
+
+
+def _missions(
+    db: Session, mission_ids: Iterable[int], catalog: Optional[MissionCatalog]
+) -> Dict[int, Tuple[Optional[int], Optional[int]]]:
+    """(xp_reward, difficulty) por misión: del catálogo en memoria, o en una sola consulta"""
+    if catalog is not None:
+        return {
+            record.id: (record.xp_reward, record.difficulty)
+            for record in catalog.get_many(db, mission_ids).values()
+        }
+    return {row.id: (row.xp_reward, row.difficulty) for row in db.execute(_mission_query(mission_ids))}
+
+
+async def _missions_async(
+    db: AsyncSession, mission_ids: Iterable[int], catalog: Optional[MissionCatalog]
+) -> Dict[int, Tuple[Optional[int], Optional[int]]]:
+    if catalog is not None:
+        return {
+            record.id: (record.xp_reward, record.difficulty)
+            for record in (await catalog.get_many_async(db, mission_ids)).values()
+        }
+    return {row.id: (row.xp_reward, row.difficulty) for row in await db.execute(_mission_query(mission_ids))}
+
+
+def record_accepted(
+    db: Session, character_id: int, mission_ids: List[int], catalog: Optional[MissionCatalog] = None
+) -> None:
+    """Suma a las estadísticas las misiones que el personaje acaba de aceptar.
+
+    Se ejecuta dentro de la transacción de la aceptación: el commit confirma la
+    entrada y los agregados juntos, y un rollback descarta ambos.
+    """
+    if not mission_ids:
+        return
+    missions = _missions(db, mission_ids, catalog)
+    _Totals.for_accepted(character_id, mission_ids, missions).write(db)
+
+
+async def record_accepted_async(
+    db: AsyncSession, character_id: int, mission_ids: List[int], catalog: Optional[MissionCatalog] = None
+) -> None:
+    """record_accepted() para AsyncSession"""
+    if not mission_ids:
+        return
+    missions = await _missions_async(db, mission_ids, catalog)
+    await _Totals.for_accepted(character_id, mission_ids, missions).write_async(db)
+
+
+def record_archived(
+    db: Session, rows: List[Dict], catalog: Optional[MissionCatalog] = None, award_xp: bool = True
+) -> None:
+    """Suma a las estadísticas las entradas que _archive() acaba de mover al historial.
+
+    Las completadas suman su XP (si award_xp) y el tiempo entre accepted_at y
+    completed_at; las canceladas solo se cuentan. En la misma transacción que el archivado.
+    """
+    if not rows:
+        return
+    missions = _missions(db, {row["mission_id"] for row in rows}, catalog)
+    _Totals.for_archived(rows, missions, award_xp).write(db)
+
+
+async def record_archived_async(
+    db: AsyncSession, rows: List[Dict], catalog: Optional[MissionCatalog] = None, award_xp: bool = True
+) -> None:
+    """record_archived() para AsyncSession"""
+    if not rows:
+        return
+    missions = await _missions_async(db, {row["mission_id"] for row in rows}, catalog)
+    await _Totals.for_archived(rows, missions, award_xp).write_async(db)
+
+
+def rebuild_stats(db: Session, batch_size: int = REBUILD_BATCH_SIZE) -> StatsRebuild:
+    """Reconstruye todas las tablas de estadísticas desde la cola y el historial.
+
+    Una sola pasada sobre cada tabla, leída en bloques de batch_size; en memoria
+    quedan solo los totales por personaje, misión, dificultad y día. Borra y escribe
+    en una transacción: en SQLite el DELETE inicial toma el bloqueo de escritura, así
+    ninguna aceptación o completado queda fuera ni se cuenta dos veces. Cada entrada
+    completada suma su xp_awarded, o la XP de su misión si es NULL (como complete()).
+    """
+    totals = _Totals()
+    entries = 0
+    try:
+        for model, key in _ROLLUPS:
+            db.execute(delete(model))
+
+        # Entradas activas: solo cuentan como aceptadas
+        for row in db.execute(
+            select(CharacterMission.character_id, CharacterMission.mission_id, Mission.difficulty)
+            .outerjoin(Mission, CharacterMission.mission_id == Mission.id)
+            .execution_options(yield_per=batch_size)
+        ):
+            entries += 1
+            totals.accepted(row.character_id, row.mission_id, row.difficulty)
+
+        # Historial: aceptadas y además completadas o canceladas
+        for row in db.execute(
+            select(
+                CharacterMissionHistory.character_id,
+                CharacterMissionHistory.mission_id,
+                CharacterMissionHistory.status,
+                CharacterMissionHistory.accepted_at,
+                CharacterMissionHistory.completed_at,
+                func.coalesce(CharacterMissionHistory.xp_awarded, Mission.xp_reward).label("xp_reward"),
+                Mission.difficulty
+            )
+            .outerjoin(Mission, CharacterMissionHistory.mission_id == Mission.id)
+            .execution_options(yield_per=batch_size)
+        ):
+            entries += 1
+            totals.accepted(row.character_id, row.mission_id, row.difficulty)
+            totals.archived(row._mapping, row.xp_reward, row.difficulty)
+
+        written = totals.write(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return StatsRebuild(
+        entries,
+        written[CharacterStats],
+        written[MissionStats],
+        written[DifficultyStats],
+        written[DailyStats]
+    )
\ No newline at end of file
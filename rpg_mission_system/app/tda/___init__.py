@@ -1 +1,5 @@
-from app.tda.queue import MissionQueue
\ No newline at end of file
+from app.tda.queue import MissionQueue
+from app.tda.async_queue import AsyncMissionQueue
+from app.tda.events import EventHub
+from app.tda.leaderboard import Leaderboard
+from app.tda.group_commit import GroupCommitWriter
\ No newline at end of file
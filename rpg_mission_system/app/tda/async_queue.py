@@ -0,0 +1,511 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.character_mission import CharacterMission
+from app.models.character_mission_history import CharacterMissionHistory
+from app.models.mission import Mission
+from app.stats import record_accepted_async, record_archived_async
+from app.tda.catalog import MissionCatalog
+from app.tda.events import EventHub
+from app.tda.leaderboard import Leaderboard
+from app.tda.queue import (
+    ACTIVE_STATUSES,
+    POSITION_GAP,
+    TICK_CHUNK_SIZE,
+    MissionQueueCache,
+    QueueEntry,
+    TickResult,
+    _QueueHooks,
+    _active_ids_query,
+    _active_query,
+    _archive_statement,
+    _archived,
+    _count_query,
+    _find_query,
+    _gains_statement,
+    _heads_query,
+    _history_rows,
+    _in_progress_characters_query,
+    _insert_entries,
+    _keeps_order,
+    _last_in_progress_query,
+    _lock_statement,
+    _move_statement,
+    _order_bound,
+    _pending_decrement,
+    _pending_query,
+    _position_bound_query,
+    _progress_statement,
+    _queue_query,
+    _rebalance_statements,
+    _register_tick_hooks,
+    _reserve_statement,
+    _slot_bound,
+    _slot_position,
+    _start_statement,
+    _tick_results,
+    _xp_subquery,
+)
+
+
+class AsyncMissionQueue(_QueueHooks):
+    """MissionQueue para AsyncSession (RPG_ASYNC=1).
+
+    Mismas operaciones y garantías que MissionQueue: cada sentencia se espera en el
+    event loop en lugar de ocupar un hilo del threadpool. Las sentencias y los
+    cálculos de posiciones vienen de app.tda.queue, y la caché, los eventos y la
+    clasificación se aplican con los mismos hooks de commit de la Session.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        character_id: int,
+        cache: Optional[MissionQueueCache] = None,
+        catalog: Optional[MissionCatalog] = None,
+        events: Optional[EventHub] = None,
+        leaderboard: Optional[Leaderboard] = None
+    ):
+        """Inicializa la cola de misiones para un personaje específico"""
+        self.db = db
+        self.character_id = character_id
+        self.cache = cache
+        self.catalog = catalog
+        self.events = events
+        self.leaderboard = leaderboard
+
+    async def is_empty(self) -> bool:
+        """Verifica si la cola de misiones está vacía"""
+        return await self.size() == 0
+
+    async def size(self) -> int:
+        """Devuelve el número de misiones en la cola"""
+        cached = await self._lookup()
+        if cached is not None:
+            return cached[0]
+        return await self.db.scalar(_count_query(self.character_id))
+
+    async def enqueue(self, mission_id: int) -> CharacterMission:
+        """Agrega una misión al final de la cola"""
+        return (await self._insert([mission_id]))[mission_id]
+
+    async def enqueue_many(self, mission_ids: Iterable[int]) -> List[Tuple[int, str, Optional[CharacterMission]]]:
+        """Agrega varias misiones al final de la cola en una sola transacción.
+
+        Devuelve, en el orden recibido, (mission_id, resultado, entrada) donde el
+        resultado es "accepted", "duplicate" o "not_found".
+        """
+        mission_ids = list(mission_ids)
+        requested = set(mission_ids)
+
+        if self.catalog is not None:
+            existing = set(await self.catalog.get_many_async(self.db, requested))
+        else:
+            existing = set(await self.db.scalars(select(Mission.id).where(Mission.id.in_(requested))))
+        active = set(await self.db.scalars(
+            select(CharacterMission.mission_id).where(
+                CharacterMission.character_id == self.character_id,
+                CharacterMission.mission_id.in_(existing),
+                CharacterMission.status.in_(ACTIVE_STATUSES)
+            )
+        )) if existing else set()
+
+        outcomes = []
+        accepted = []
+        for mission_id in mission_ids:
+            if mission_id not in existing:
+                outcomes.append((mission_id, "not_found"))
+            elif mission_id in active:
+                outcomes.append((mission_id, "duplicate"))
+            else:
+                active.add(mission_id)
+                accepted.append(mission_id)
+                outcomes.append((mission_id, "accepted"))
+
+        inserted = await self._insert(accepted) if accepted else {}
+        return [
+            (mission_id, result, inserted.get(mission_id) if result == "accepted" else None)
+            for mission_id, result in outcomes
+        ]
+
+    async def dequeue(self) -> Optional[CharacterMission]:
+        """Elimina y devuelve la misión al frente de la cola (la mueve al historial como completada, sin XP)"""
+        head = await self.peek()
+        if head is None:
+            return None
+
+        archived = await self._archive(
+            CharacterMission.id == head.id, CharacterMission.status.in_(ACTIVE_STATUSES), xp_awarded=0
+        )
+        if not archived:
+            await self._lost_race()
+            return None
+
+        await self._record_archived(archived, award_xp=False)
+        await self.db.execute(_pending_decrement(self.character_id))
+        self._on_commit(lambda: self.cache.remove(self.character_id, head.id))
+        self._publish({"type": "removed", "id": head.id, "mission_id": head.mission_id, "status": "completed"})
+        await self._commit()
+        return CharacterMission(**archived[0])
+
+    async def complete(
+        self, mission_id: Optional[int] = None, require_in_progress: bool = False
+    ) -> Optional[CharacterMission]:
+        """Completa una misión activa y otorga su XP al personaje en una sola transacción.
+
+        Igual que MissionQueue.complete(): el DELETE condicionado al estado resuelve las
+        carreras, y las vueltas perdidas se limitan a las entradas activas al perder la
+        primera (después levanta ValueError).
+        """
+        statuses = ("in_progress",) if require_in_progress else ACTIVE_STATUSES
+        retries = None
+        while True:
+            if retries is not None:
+                target = await self._find_active(mission_id, use_cache=False)
+            else:
+                target = await self.peek() if mission_id is None else await self._find_active(mission_id)
+            if target is None or target.status not in statuses:
+                return None
+
+            archived = await self._archive(CharacterMission.id == target.id, CharacterMission.status.in_(statuses))
+
+            if not archived:
+                await self._lost_race()
+                if retries is None:
+                    retries = await self.db.scalar(_count_query(self.character_id))
+                if retries <= 0:
+                    raise ValueError("The queue kept changing while completing its head; retry")
+                retries -= 1
+                continue
+
+            await self._record_archived(archived)
+            xp_reward = await self._xp_reward(target.mission_id)
+            progress = (await self.db.execute(_progress_statement(self.character_id, xp_reward))).first()
+            self._on_commit(lambda: self.cache.remove(self.character_id, target.id))
+            if self.leaderboard is not None:
+                self._after_commit(lambda: self.leaderboard.update(
+                    self.character_id, progress.name, progress.level, progress.experience
+                ))
+            self._publish({
+                "type": "completed", "id": target.id, "mission_id": target.mission_id,
+                "experience": progress.experience, "level": progress.level,
+            })
+            await self._commit()
+            return CharacterMission(**archived[0])
+
+    async def peek(self) -> Optional[QueueEntry]:
+        """Devuelve el registro compacto del frente de la cola; sin consultar la base si está en caché"""
+        cached = await self._lookup()
+        if cached is not None:
+            return cached[1]
+        return await self._find_active(None, use_cache=False)
+
+    async def first(self) -> Optional[CharacterMission]:
+        """Devuelve la misión al frente de la cola sin eliminarla"""
+        head = await self.peek()
+        return await self.db.get(CharacterMission, head.id) if head else None
+
+    async def get_all(self) -> List[CharacterMission]:
+        """Devuelve todas las misiones en la cola en orden (las completadas están en el historial)"""
+        return list(await self.db.scalars(
+            select(CharacterMission).where(
+                CharacterMission.character_id == self.character_id,
+                CharacterMission.status.in_(ACTIVE_STATUSES)
+            ).order_by(CharacterMission.queue_position)
+        ))
+
+    async def start_next_mission(self) -> Optional[CharacterMission]:
+        """Inicia la siguiente misión pendiente (primera en la cola)"""
+        entries = await self._entries()
+        if entries is not None:
+            pending = next((e for e in entries if e.status == "pending"), None)
+            entry_id = pending.id if pending else None
+        else:
+            entry_id = await self.db.scalar(_pending_query(self.character_id))
+        if entry_id is None:
+            return None
+
+        # pending_missions cuenta pending e in_progress: el contador no cambia
+        row = (await self.db.execute(_start_statement(entry_id))).first()
+        if row is None:
+            # Otra petición la inició, completó o canceló primero
+            await self._lost_race()
+            return None
+        entry = QueueEntry(row.id, row.mission_id, row.status, row.queue_position)
+        self._on_commit(lambda: self.cache.replace(self.character_id, entry))
+        self._publish({"type": "started", "entry": entry._asdict()})
+        await self._commit()
+        return CharacterMission(**row._mapping)
+
+    async def cancel(self, mission_id: int) -> Optional[CharacterMission]:
+        """Quita una misión activa de la cola; queda en el historial con estado "cancelled" """
+        target = await self._find_active(mission_id)
+        if target is None:
+            return None
+
+        archived = await self._archive(
+            CharacterMission.id == target.id, CharacterMission.status.in_(ACTIVE_STATUSES), status="cancelled"
+        )
+        if not archived:
+            await self._lost_race()
+            return None
+
+        await self._record_archived(archived)
+        await self.db.execute(_pending_decrement(self.character_id))
+        self._on_commit(lambda: self.cache.remove(self.character_id, target.id))
+        self._publish({"type": "removed", "id": target.id, "mission_id": target.mission_id, "status": "cancelled"})
+        await self._commit()
+        return CharacterMission(**archived[0])
+
+    async def move_to_front(self, mission_id: int) -> Optional[CharacterMission]:
+        """Mueve una misión activa al frente de la cola"""
+        return await self._move(mission_id, None, before=True)
+
+    async def move_before(self, mission_id: int, anchor_mission_id: int) -> Optional[CharacterMission]:
+        """Mueve una misión activa justo antes de otra misión de la cola"""
+        return await self._move(mission_id, anchor_mission_id, before=True)
+
+    async def move_after(self, mission_id: int, anchor_mission_id: int) -> Optional[CharacterMission]:
+        """Mueve una misión activa justo después de otra misión de la cola"""
+        return await self._move(mission_id, anchor_mission_id, before=False)
+
+    async def _move(self, mission_id: int, anchor_mission_id: Optional[int], before: bool) -> Optional[CharacterMission]:
+        """Mismo algoritmo que MissionQueue._move(): solo escribe la fila movida salvo que se agote el hueco"""
+        tail = await self._lock_character()
+        rebalanced = False
+        while True:
+            entries = await self._active_entries({mission_id, anchor_mission_id} - {None})
+            target = entries.get(mission_id)
+            anchor = entries.get(anchor_mission_id) if anchor_mission_id is not None else None
+            if target is None or (anchor_mission_id is not None and anchor is None):
+                await self.db.rollback()
+                return None
+            slot_anchor, slot_before = anchor, before
+            if anchor is None and target.status == "pending":
+                row = (await self.db.execute(_last_in_progress_query(self.character_id))).first()
+                slot_anchor = QueueEntry(*row) if row else None
+                slot_before = slot_anchor is None
+
+            criteria, highest = _slot_bound(slot_anchor, slot_before)
+            bound = await self._position_bound(*criteria, highest=highest)
+            position, has_gap = _slot_position(target, slot_anchor, slot_before, tail, bound)
+            if has_gap or rebalanced:
+                break
+            tail = await self._rebalance(tail)
+            rebalanced = True
+
+        if position is not None:
+            criteria, highest = _order_bound(target)
+            if not _keeps_order(target, position, await self._position_bound(*criteria, highest=highest)):
+                await self.db.rollback()
+                raise ValueError("A pending mission cannot be moved ahead of a mission in progress")
+
+        if position is None:
+            # Ya está en su lugar (o la cola no admite el cambio); si hubo rebalanceo se confirma
+            if rebalanced:
+                self._on_commit(lambda: self.cache.invalidate(self.character_id))
+                await self._publish_reordered()
+                await self._commit()
+            else:
+                await self.db.rollback()
+            return await self.db.get(CharacterMission, target.id)
+
+        row = (await self.db.execute(_move_statement(target.id, position))).first()
+        if rebalanced:
+            self._on_commit(lambda: self.cache.invalidate(self.character_id))
+            await self._publish_reordered()
+        else:
+            entry = QueueEntry(row.id, row.mission_id, row.status, row.queue_position)
+            self._on_commit(lambda: self.cache.move(self.character_id, entry))
+            self._publish({"type": "moved", "entry": entry._asdict()})
+        await self._commit()
+        return CharacterMission(**row._mapping)
+
+    async def _insert(self, mission_ids: List[int]) -> Dict[int, CharacterMission]:
+        """Inserta las entradas al final de la cola con sus estadísticas y confirma; devuelve las filas por mission_id"""
+        first_position = await self._reserve_positions(len(mission_ids))
+        try:
+            rows = (await self.db.execute(*_insert_entries(self.character_id, first_position, mission_ids))).all()
+            await record_accepted_async(self.db, self.character_id, mission_ids, self.catalog)
+        except Exception:
+            await self.db.rollback()
+            raise
+        # Las filas devueltas pueden no venir en orden; la posición define el orden de la cola
+        rows.sort(key=lambda row: row.queue_position)
+        entries = [QueueEntry(row.id, row.mission_id, row.status, row.queue_position) for row in rows]
+        self._on_commit(lambda: [self.cache.append(self.character_id, entry) for entry in entries])
+        self._publish({"type": "enqueued", "entries": [entry._asdict() for entry in entries]})
+        await self._commit()
+        return {row.mission_id: CharacterMission(**row._mapping) for row in rows}
+
+    async def _archive(self, *criteria, status: str = "completed", xp_awarded: Optional[int] = None) -> List[Dict]:
+        """Mueve al historial las entradas activas que cumplen los criterios (ver queue._archive)"""
+        rows = _archived(await self.db.execute(_archive_statement(*criteria)), status)
+        if rows:
+            await self.db.execute(insert(CharacterMissionHistory), _history_rows(rows, xp_awarded))
+        return rows
+
+    async def _lost_race(self) -> None:
+        """Otra petición cambió la entrada primero: se descarta la transacción y la cola en caché"""
+        await self.db.rollback()
+        if self.cache is not None:
+            self.cache.invalidate(self.character_id)
+
+    async def _xp_reward(self, mission_id: int):
+        """XP de la misión: del catálogo en memoria, o una subconsulta dentro del UPDATE"""
+        if self.catalog is not None:
+            record = await self.catalog.get_async(self.db, mission_id)
+            if record is not None:
+                return record.xp_reward
+        return _xp_subquery(mission_id)
+
+    async def _find_active(self, mission_id: Optional[int], use_cache: bool = True) -> Optional[QueueEntry]:
+        """Busca la entrada activa de una misión concreta, o el frente de la cola si mission_id es None"""
+        entries = await self._entries() if use_cache else None
+        if entries is not None:
+            if mission_id is None:
+                return entries[0] if entries else None
+            return next((e for e in entries if e.mission_id == mission_id), None)
+        row = (await self.db.execute(_find_query(self.character_id, mission_id))).first()
+        return QueueEntry(*row) if row else None
+
+    async def _reserve_positions(self, count: int) -> int:
+        """Reserva `count` posiciones (separadas por POSITION_GAP) al final de la cola y devuelve la primera"""
+        result = await self.db.execute(_reserve_statement(self.character_id, count))
+        next_position = result.scalar_one_or_none()
+        if next_position is None:
+            await self.db.rollback()
+            raise ValueError(f"Character {self.character_id} not found")
+        return next_position - count * POSITION_GAP
+
+    async def _lock_character(self) -> int:
+        """Toma el bloqueo de escritura sobre el personaje y devuelve su next_queue_position"""
+        next_position = (await self.db.execute(_lock_statement(self.character_id))).scalar_one_or_none()
+        if next_position is None:
+            await self.db.rollback()
+            raise ValueError(f"Character {self.character_id} not found")
+        return next_position
+
+    async def _active_entries(self, mission_ids) -> dict:
+        """Entradas activas (leídas de la base) de las misiones indicadas, por mission_id"""
+        rows = await self.db.execute(_active_query(self.character_id, CharacterMission.mission_id.in_(mission_ids)))
+        return {row.mission_id: QueueEntry(*row) for row in rows}
+
+    async def _position_bound(self, *criteria, highest: bool) -> Optional[int]:
+        return await self.db.scalar(_position_bound_query(self.character_id, *criteria, highest=highest))
+
+    async def _rebalance(self, tail: int) -> int:
+        """Renumera la cola activa con POSITION_GAP a partir del final; devuelve el nuevo final"""
+        ids = list(await self.db.scalars(_active_ids_query(self.character_id)))
+        statements, new_tail = _rebalance_statements(self.character_id, tail, ids)
+        for statement, params in statements:
+            await self.db.execute(statement, params)
+        return new_tail
+
+    async def _entries(self) -> Optional[Tuple[QueueEntry, ...]]:
+        """Cola activa desde la caché, cargándola de la base la primera vez"""
+        if self.cache is None:
+            return None
+        entries = self.cache.entries(self.character_id)
+        if entries is None:
+            entries = await self._load()
+        return entries
+
+    async def _lookup(self) -> Optional[Tuple[int, Optional[QueueEntry]]]:
+        if self.cache is None:
+            return None
+        cached = self.cache.lookup(self.character_id)
+        if cached is None:
+            entries = await self._load()
+            cached = len(entries), (entries[0] if entries else None)
+        return cached
+
+    async def _load(self) -> Tuple[QueueEntry, ...]:
+        token = self.cache.begin_load(self.character_id)
+        entries = tuple(QueueEntry(*row) for row in await self.db.execute(_queue_query(self.character_id)))
+        self.cache.fill(self.character_id, entries, token)
+        return entries
+
+    async def _record_archived(self, archived: List[Dict], award_xp: bool = True) -> None:
+        """Suma las entradas movidas al historial a las tablas de estadísticas, en la transacción actual"""
+        try:
+            await record_archived_async(self.db, archived, self.catalog, award_xp)
+        except Exception:
+            await self.db.rollback()
+            raise
+
+    async def _publish_reordered(self) -> None:
+        """Tras renumerar, todas las posiciones cambiaron: se publica la cola completa"""
+        if self.events is None:
+            return
+        rows = await self.db.execute(_queue_query(self.character_id))
+        self._publish({"type": "reordered", "entries": [QueueEntry(*row)._asdict() for row in rows]})
+
+    async def _commit(self) -> None:
+        try:
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+
+async def complete_heads_async(
+    db: AsyncSession,
+    character_ids: Optional[Iterable[int]] = None,
+    chunk_size: int = TICK_CHUNK_SIZE,
+    cache: Optional[MissionQueueCache] = None,
+    events: Optional[EventHub] = None,
+    leaderboard: Optional[Leaderboard] = None
+) -> List[TickResult]:
+    """complete_heads() para AsyncSession: mismas sentencias por conjuntos, un bloque por transacción"""
+    results = []
+    if character_ids is not None:
+        ids = sorted(set(character_ids))
+        for start in range(0, len(ids), chunk_size):
+            results.extend(await _complete_heads_chunk(db, ids[start:start + chunk_size], cache, events, leaderboard))
+        return results
+
+    last_id = 0
+    while True:
+        ids = list(await db.scalars(_in_progress_characters_query(last_id, chunk_size)))
+        if not ids:
+            return results
+        results.extend(await _complete_heads_chunk(db, ids, cache, events, leaderboard))
+        last_id = ids[-1]
+
+
+async def _complete_heads_chunk(
+    db: AsyncSession,
+    character_ids: List[int],
+    cache: Optional[MissionQueueCache],
+    events: Optional[EventHub],
+    leaderboard: Optional[Leaderboard]
+) -> List[TickResult]:
+    heads = (await db.execute(_heads_query(character_ids))).all()
+    if not heads:
+        return []
+    xp_by_entry = dict(heads)
+
+    try:
+        # El filtro por estado descarta las cabezas completadas por otra petición mientras tanto
+        completed = _archived(
+            await db.execute(_archive_statement(
+                CharacterMission.id.in_(xp_by_entry), CharacterMission.status.in_(ACTIVE_STATUSES)
+            )),
+            "completed"
+        )
+        if not completed:
+            await db.rollback()
+            return []
+        await db.execute(insert(CharacterMissionHistory), _history_rows(completed, None))
+        await record_archived_async(db, completed)
+        characters = (await db.execute(_gains_statement(completed))).all()
+    except Exception:
+        await db.rollback()
+        raise
+
+    progress = _register_tick_hooks(db, completed, characters, cache, events, leaderboard)
+    await db.commit()
+    return _tick_results(completed, xp_by_entry, progress)
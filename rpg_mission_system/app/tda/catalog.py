@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from threading import RLock
+from typing import Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.mission import Mission
+
+
+class MissionRecord(NamedTuple):
+    """Registro compacto e inmutable de una misión del catálogo"""
+    id: int
+    title: str
+    description: str
+    xp_reward: int
+    difficulty: int
+
+
+# Columnas de MissionRecord, en el mismo orden
+RECORD_COLUMNS = (Mission.id, Mission.title, Mission.description, Mission.xp_reward, Mission.difficulty)
+
+
+def _record_query(*criteria):
+    return select(*RECORD_COLUMNS).where(*criteria)
+
+
+class MissionCatalog:
+    """Caché LRU en memoria del catálogo de misiones (id -> MissionRecord).
+
+    Las misiones se escriben muy poco y se leen en cada aceptación y completado.
+    Los ids que no existen no se guardan, así una misión recién creada en otro
+    proceso se encuentra en la siguiente consulta.
+    """
+
+    def __init__(self, max_missions: int = 100_000):
+        self.max_missions = max_missions
+        self._records: "OrderedDict[int, MissionRecord]" = OrderedDict()
+        self._lock = RLock()
+
+    def get(self, db: Session, mission_id: int) -> Optional[MissionRecord]:
+        """Devuelve la misión desde la caché, o la lee de la base si falta"""
+        record = self._cached(mission_id)
+        if record is not None:
+            return record
+        return self._found(db.execute(_record_query(Mission.id == mission_id)).first())
+
+    async def get_async(self, db: AsyncSession, mission_id: int) -> Optional[MissionRecord]:
+        """get() para AsyncSession"""
+        record = self._cached(mission_id)
+        if record is not None:
+            return record
+        return self._found((await db.execute(_record_query(Mission.id == mission_id))).first())
+
+    def get_many(self, db: Session, mission_ids: Iterable[int]) -> Dict[int, MissionRecord]:
+        """Devuelve las misiones existentes de la lista; las que faltan se leen en una sola consulta"""
+        found, missing = self._cached_many(mission_ids)
+        if missing:
+            for row in db.execute(_record_query(Mission.id.in_(missing))):
+                record = self._found(row)
+                found[record.id] = record
+        return found
+
+    async def get_many_async(self, db: AsyncSession, mission_ids: Iterable[int]) -> Dict[int, MissionRecord]:
+        """get_many() para AsyncSession"""
+        found, missing = self._cached_many(mission_ids)
+        if missing:
+            for row in await db.execute(_record_query(Mission.id.in_(missing))):
+                record = self._found(row)
+                found[record.id] = record
+        return found
+
+    def load(self, db: Session) -> int:
+        """Precarga las max_missions misiones más nuevas (calentamiento al arrancar); devuelve cuántas"""
+        rows = db.execute(select(*RECORD_COLUMNS).order_by(Mission.id.desc()).limit(self.max_missions)).all()
+        # De la más antigua a la más nueva: las nuevas quedan al final de la LRU
+        for row in reversed(rows):
+            self.add(MissionRecord(*row))
+        return len(rows)
+
+    def add(self, record: MissionRecord) -> None:
+        with self._lock:
+            self._records[record.id] = record
+            self._records.move_to_end(record.id)
+            while len(self._records) > self.max_missions:
+                self._records.popitem(last=False)
+
+    def _cached(self, mission_id: int) -> Optional[MissionRecord]:
+        with self._lock:
+            record = self._records.get(mission_id)
+            if record is not None:
+                self._records.move_to_end(mission_id)
+            return record
+
+    def _cached_many(self, mission_ids: Iterable[int]) -> Tuple[Dict[int, MissionRecord], Set[int]]:
+        """(misiones en caché por id, ids que faltan)"""
+        found = {}
+        missing = set()
+        with self._lock:
+            for mission_id in set(mission_ids):
+                record = self._records.get(mission_id)
+                if record is None:
+                    missing.add(mission_id)
+                else:
+                    self._records.move_to_end(mission_id)
+                    found[mission_id] = record
+        return found, missing
+
+    def _found(self, row) -> Optional[MissionRecord]:
+        """Guarda en la caché la fila leída de la base"""
+        if row is None:
+            return None
+        record = MissionRecord(*row)
+        self.add(record)
+        return record
+
+    def invalidate(self, mission_id: int) -> None:
+        with self._lock:
+            self._records.pop(mission_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    @staticmethod
+    def record(mission: Mission) -> MissionRecord:
+        return MissionRecord(mission.id, mission.title, mission.description, mission.xp_reward, mission.difficulty)
+
+
+mission_catalog = MissionCatalog()
\ No newline at end of file
@@ -0,0 +1,121 @@
+import asyncio
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple
+
+# Capacidad por defecto del buffer de cada suscriptor
+DEFAULT_BUFFER_SIZE = 64
+
+# Evento final que recibe un suscriptor que no consumió a tiempo
+DROPPED = {"type": "dropped"}
+
+
+class Subscription:
+    """Buffer acotado de eventos de un suscriptor, ligado al event loop que lo creó"""
+
+    def __init__(self, character_id: int, maxsize: int):
+        self.character_id = character_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Tuple[int, dict]]" = asyncio.Queue(maxsize)
+        self.dropped = False
+
+    async def get(self) -> Tuple[int, dict]:
+        """Espera el siguiente evento (número de secuencia, evento)"""
+        return await self.queue.get()
+
+    def _push(self, item: Tuple[int, dict]) -> None:
+        """Agrega un evento sin esperar; si el buffer está lleno descarta al suscriptor"""
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Consumidor lento: se vacía el buffer y se le avisa para que vuelva a conectarse
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((item[0], DROPPED))
+
+
+class EventHub:
+    """Pub/sub en memoria de cambios por personaje (cola de misiones, XP y nivel).
+
+    publish() se puede llamar desde cualquier hilo (los endpoints sync corren en el
+    threadpool): la entrega se agenda en el event loop de cada suscriptor. Un
+    suscriptor cuyo buffer se llena se descarta en lugar de bloquear al que publica.
+    """
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._sequence = 0
+        self._lock = Lock()
+        self.dropped = 0
+
+    def subscribe(self, character_id: int, buffer_size: Optional[int] = None) -> Subscription:
+        """Registra un suscriptor; debe llamarse desde el event loop que consumirá los eventos"""
+        subscription = Subscription(character_id, buffer_size or self.buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(character_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.character_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.character_id]
+
+    @property
+    def sequence(self) -> int:
+        """Número de secuencia del último evento publicado (0 si aún no hubo ninguno)"""
+        with self._lock:
+            return self._sequence
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def render(self) -> str:
+        """Suscriptores activos y descartados, en formato de texto de Prometheus"""
+        return "\n".join([
+            "# HELP rpg_event_subscribers Open Server-Sent Events subscriptions",
+            "# TYPE rpg_event_subscribers gauge",
+            f"rpg_event_subscribers {self.subscriber_count()}",
+            "# HELP rpg_event_subscribers_dropped_total Subscribers dropped for falling behind",
+            "# TYPE rpg_event_subscribers_dropped_total counter",
+            f"rpg_event_subscribers_dropped_total {self.dropped}",
+        ]) + "\n"
+
+    def publish(self, character_id: int, event: dict) -> None:
+        """Envía un evento a los suscriptores del personaje sin bloquear"""
+        with self._lock:
+            subscribers = self._subscribers.get(character_id)
+            if not subscribers:
+                return
+            subscribers = tuple(subscribers)
+            self._sequence += 1
+            item = (self._sequence, event)
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for subscription in subscribers:
+            if subscription.loop is current_loop:
+                self._deliver(subscription, item)
+            else:
+                try:
+                    subscription.loop.call_soon_threadsafe(self._deliver, subscription, item)
+                except RuntimeError:
+                    # El loop del suscriptor ya se cerró
+                    self.unsubscribe(subscription)
+
+    def _deliver(self, subscription: Subscription, item: Tuple[int, dict]) -> None:
+        if subscription.dropped:
+            return
+        subscription._push(item)
+        if subscription.dropped:
+            self.unsubscribe(subscription)
+            with self._lock:
+                self.dropped += 1
+
+
+event_hub = EventHub()
\ No newline at end of file
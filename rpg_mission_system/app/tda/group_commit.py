@@ -0,0 +1,173 @@
+from concurrent.futures import Future
+from contextvars import copy_context
+from queue import Empty, SimpleQueue
+from threading import Lock, Thread, current_thread
+from time import monotonic
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.tda.queue import DEFERRED_HOOKS_KEY
+
+T = TypeVar("T")
+
+# Operaciones por transacción como máximo
+DEFAULT_MAX_BATCH = 64
+
+# Espera máxima para juntar más operaciones después de la primera de un lote
+DEFAULT_MAX_DELAY = 0.002
+
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Escritor único que aplica las escrituras concurrentes en una sola transacción (group commit).
+
+    En SQLite cada commit es un fsync: con un commit por petición el rendimiento de
+    escritura lo fija el disco, no la CPU. Las peticiones entregan su operación con
+    submit() y esperan; un hilo las toma en orden de llegada y las aplica en una
+    transacción cada max_delay segundos o cuando junta max_batch. Así el orden FIFO
+    por personaje se mantiene.
+
+    Cada operación recibe su propia Session unida a la transacción del lote con
+    join_transaction_mode="create_savepoint": su commit libera un SAVEPOINT y su
+    rollback (o una excepción) deshace solo esa operación, que responde enseguida con
+    su error. Las demás reciben su resultado cuando el lote ya está confirmado; si ese
+    commit falla, todas reciben el error.
+    """
+
+    def __init__(self, max_batch: int = DEFAULT_MAX_BATCH, max_delay: float = DEFAULT_MAX_DELAY):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.engine: Optional[Engine] = None
+        self.session_info: dict = {}
+        self.batches = 0
+        self.operations = 0
+        self._requests: "SimpleQueue[object]" = SimpleQueue()
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, engine: Engine, session_info: Optional[dict] = None) -> None:
+        """Arranca el hilo escritor sobre el motor indicado; session_info se copia en el info de cada Session"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.engine = engine
+            self.session_info = dict(session_info or {})
+            self._thread = Thread(target=self._run, name="group-commit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Aplica las operaciones pendientes y detiene el hilo escritor"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._requests.put(_STOP)
+            thread.join(timeout)
+
+    def submit(self, operation: Callable[[Session], T]) -> T:
+        """Encola operation(session) y espera a que su lote se confirme; devuelve su resultado.
+
+        La operación corre en el hilo escritor con una copia del contexto de quien la
+        entrega, así las métricas de la petición cuentan sus sentencias.
+        """
+        if self._thread is None:
+            raise RuntimeError("Group commit writer is not running")
+        future: "Future[T]" = Future()
+        context = copy_context()
+        self._requests.put((lambda session: context.run(operation, session), future))
+        return future.result()
+
+    def run(self, db: Session, operation: Callable[[Session], T]) -> T:
+        """Con el escritor en marcha, operation(session) se aplica como parte de un lote;
+        si no (o si ya se está en el hilo escritor), operation(db) directamente"""
+        if self._thread is None or current_thread() is self._thread:
+            return operation(db)
+        return self.submit(operation)
+
+    def render(self) -> str:
+        """Lotes y operaciones confirmadas, en formato de texto de Prometheus"""
+        return "\n".join([
+            "# HELP rpg_group_commit_batches_total Transactions committed by the group commit writer",
+            "# TYPE rpg_group_commit_batches_total counter",
+            f"rpg_group_commit_batches_total {self.batches}",
+            "# HELP rpg_group_commit_operations_total Operations applied by the group commit writer",
+            "# TYPE rpg_group_commit_operations_total counter",
+            f"rpg_group_commit_operations_total {self.operations}",
+        ]) + "\n"
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = []
+            request = self._requests.get()
+            deadline = monotonic() + self.max_delay
+            while True:
+                if request is _STOP:
+                    stopping = True
+                    break
+                batch.append(request)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    request = self._requests.get(timeout=max(0.0, deadline - monotonic()))
+                except Empty:
+                    break
+            if batch:
+                self._apply(batch)
+
+    def _apply(self, batch: List[Tuple[Callable[[Session], object], Future]]) -> None:
+        deferred = []
+        applied = []
+        try:
+            with self.engine.connect() as conn:
+                conn.begin()
+                if conn.dialect.name == "sqlite":
+                    # pysqlite no emite BEGIN hasta la primera escritura; sin una transacción
+                    # abierta, liberar el primer SAVEPOINT confirmaría por su cuenta
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+                for operation, future in batch:
+                    session = Session(
+                        bind=conn,
+                        join_transaction_mode="create_savepoint",
+                        autoflush=False,
+                        expire_on_commit=False,
+                        info={**self.session_info, DEFERRED_HOOKS_KEY: deferred}
+                    )
+                    try:
+                        result = operation(session)
+                    except BaseException as exc:
+                        session.rollback()
+                        future.set_exception(exc)
+                    else:
+                        applied.append((future, result))
+                    finally:
+                        # Lo que la operación no confirmó se deshace al cerrar, como con get_db
+                        session.close()
+                conn.commit()
+        except Exception as exc:
+            for hooks, actions in deferred:
+                for cache, character_id, apply in hooks:
+                    cache.invalidate(character_id)
+            for future, result in applied:
+                future.set_exception(exc)
+            for operation, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.operations += len(batch)
+        for hooks, actions in deferred:
+            for apply in actions:
+                apply()
+        for future, result in applied:
+            future.set_result(result)
+
+
+group_commit = GroupCommitWriter()
\ No newline at end of file
@@ -0,0 +1,130 @@
+from threading import RLock
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sortedcontainers import SortedList
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.character import Character
+
+# Filas leídas por bloque al construir la clasificación
+LOAD_BATCH_SIZE = 10_000
+
+
+class LeaderboardEntry(NamedTuple):
+    """Posición de un personaje en la clasificación (rank empieza en 1)"""
+    rank: int
+    id: int
+    name: str
+    level: int
+    experience: int
+
+
+class Leaderboard:
+    """Clasificación en memoria por nivel y experiencia (estadísticas de orden en O(log n)).
+
+    Una SortedList de claves (-level, -experience, id) da el puesto de un personaje
+    con bisect y la página de una posición con islice; a igual nivel y experiencia
+    va primero el personaje más antiguo. Se construye al arrancar con load() y se
+    actualiza después de cada commit que cambia la experiencia. La experiencia y el
+    nivel solo crecen, así una actualización que llega tarde (otro hilo confirmó un
+    valor mayor primero) se descarta.
+    """
+
+    def __init__(self):
+        self._keys = SortedList()
+        self._characters: Dict[int, Tuple[Tuple[int, int, int], str]] = {}
+        self._lock = RLock()
+        self.loaded = False
+
+    def load(self, db: Session, batch_size: int = LOAD_BATCH_SIZE) -> int:
+        """Reconstruye la clasificación desde la tabla characters; devuelve cuántos personajes cargó.
+
+        Las actualizaciones de otros hilos esperan a que termine la carga: las que
+        llegan después ya están en la lectura o se aplican sobre ella.
+        """
+        with self._lock:
+            characters = {}
+            # Recorre ix_characters_level_experience: las claves llegan casi ordenadas
+            result = db.execute(
+                select(Character.id, Character.name, Character.level, Character.experience)
+                .order_by(Character.level.desc(), Character.experience.desc())
+                .execution_options(yield_per=batch_size)
+            )
+            for character_id, name, level, experience in result:
+                characters[character_id] = ((-(level or 0), -(experience or 0), character_id), name)
+            self._keys = SortedList(key for key, name in characters.values())
+            self._characters = characters
+            self.loaded = True
+            return len(characters)
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Carga la clasificación si todavía no se construyó (ej. la app no ejecutó el arranque)"""
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self.load(db)
+
+    def update(self, character_id: int, name: str, level: int, experience: int) -> None:
+        """Agrega un personaje o mueve el que ya estaba a su nuevo puesto"""
+        key = (-(level or 0), -(experience or 0), character_id)
+        with self._lock:
+            current = self._characters.get(character_id)
+            if current is not None:
+                if key >= current[0]:
+                    # Mismo puntaje o uno anterior a lo ya registrado
+                    return
+                self._keys.remove(current[0])
+            self._keys.add(key)
+            self._characters[character_id] = (key, name)
+
+    def remove(self, character_id: int) -> None:
+        with self._lock:
+            current = self._characters.pop(character_id, None)
+            if current is not None:
+                self._keys.remove(current[0])
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def top(self, limit: int, offset: int = 0) -> List[LeaderboardEntry]:
+        """Los `limit` primeros a partir del puesto offset + 1"""
+        with self._lock:
+            return [
+                self._entry(offset + index + 1, key)
+                for index, key in enumerate(self._keys.islice(offset, offset + limit))
+            ]
+
+    def rank(self, character_id: int) -> Optional[LeaderboardEntry]:
+        """Puesto de un personaje, o None si no está en la clasificación"""
+        with self._lock:
+            current = self._characters.get(character_id)
+            if current is None:
+                return None
+            return self._entry(self._keys.index(current[0]) + 1, current[0])
+
+    def around(self, character_id: int, window: int) -> List[LeaderboardEntry]:
+        """El personaje con hasta `window` puestos por encima y por debajo"""
+        with self._lock:
+            current = self._characters.get(character_id)
+            if current is None:
+                return []
+            position = self._keys.index(current[0])
+            start = max(0, position - window)
+            return [
+                self._entry(start + index + 1, key)
+                for index, key in enumerate(self._keys.islice(start, position + window + 1))
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = SortedList()
+            self._characters = {}
+            self.loaded = False
+
+    def _entry(self, rank: int, key: Tuple[int, int, int]) -> LeaderboardEntry:
+        level, experience, character_id = key
+        return LeaderboardEntry(rank, character_id, self._characters[character_id][1], -level, -experience)
+
+
+leaderboard = Leaderboard()
\ No newline at end of file
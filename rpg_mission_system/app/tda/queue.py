@@ -1,83 +1,1119 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from datetime import datetime
+from threading import RLock
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import case, delete, event, func, insert, select, update
+from app.models.character import Character
 from app.models.character_mission import CharacterMission
+from app.models.character_mission_history import CharacterMissionHistory
+from app.models.mission import Mission
+from app.stats import record_accepted, record_archived
+from app.tda.catalog import MissionCatalog
+from app.tda.events import EventHub
+from app.tda.leaderboard import Leaderboard
+
+ACTIVE_STATUSES = ("pending", "in_progress")
+
+# XP necesaria por nivel (sistema simple: nivel * 100)
+XP_PER_LEVEL = 100
+
+# Personajes por transacción en complete_heads()
+TICK_CHUNK_SIZE = 500
+
+# Separación entre posiciones consecutivas al encolar. Mover una entrada le asigna
+# una posición en el hueco entre sus nuevos vecinos, sin renumerar el resto
+POSITION_GAP = 1024
+
+
+class QueueEntry(NamedTuple):
+    """Registro compacto de una misión activa en la cola de un personaje"""
+    id: int
+    mission_id: int
+    status: str
+    queue_position: int
+
+
+# Columnas de QueueEntry, en el mismo orden
+ENTRY_COLUMNS = (CharacterMission.id, CharacterMission.mission_id, CharacterMission.status, CharacterMission.queue_position)
+
+
+class MissionQueueCache:
+    """Caché LRU en memoria de las colas activas (pending/in_progress) por personaje.
+
+    Es write-through: MissionQueue solo la modifica después de un commit exitoso,
+    y un rollback invalida los personajes afectados.
+    """
+
+    def __init__(self, max_characters: int = 1024):
+        self.max_characters = max_characters
+        self._queues: "OrderedDict[int, Deque[QueueEntry]]" = OrderedDict()
+        self._loads = {}
+        self._lock = RLock()
+
+    def lookup(self, character_id: int) -> Optional[Tuple[int, Optional[QueueEntry]]]:
+        """Devuelve (tamaño, cabeza) de la cola si está en caché, o None"""
+        with self._lock:
+            queue = self._queues.get(character_id)
+            if queue is None:
+                return None
+            self._queues.move_to_end(character_id)
+            return len(queue), (queue[0] if queue else None)
+
+    def entries(self, character_id: int) -> Optional[Tuple[QueueEntry, ...]]:
+        """Devuelve una copia de la cola en caché, o None"""
+        with self._lock:
+            queue = self._queues.get(character_id)
+            if queue is None:
+                return None
+            self._queues.move_to_end(character_id)
+            return tuple(queue)
+
+    def begin_load(self, character_id: int) -> object:
+        """Marca el inicio de una carga desde la base; devuelve el token para fill()"""
+        token = object()
+        with self._lock:
+            self._loads[character_id] = token
+        return token
+
+    def fill(self, character_id: int, entries, token: object) -> bool:
+        """Guarda la cola leída si nadie la modificó desde begin_load()"""
+        with self._lock:
+            if self._loads.get(character_id) is not token:
+                return False
+            del self._loads[character_id]
+            if self.max_characters <= 0:
+                return False
+            self._queues[character_id] = deque(entries)
+            self._queues.move_to_end(character_id)
+            while len(self._queues) > self.max_characters:
+                self._queues.popitem(last=False)
+            return True
+
+    def append(self, character_id: int, entry: QueueEntry) -> None:
+        """Agrega una entrada nueva (si el personaje está en caché) en el lugar de su posición.
+
+        Casi siempre va al final; los hooks de dos commits cercanos pueden llegar en
+        orden inverso, y entonces la entrada se inserta por bisect como en move().
+        """
+        with self._lock:
+            self._loads.pop(character_id, None)
+            queue = self._queues.get(character_id)
+            if queue is None or any(current.id == entry.id for current in queue):
+                return
+            if not queue or queue[-1].queue_position < entry.queue_position:
+                queue.append(entry)
+                return
+            index = bisect_left([current.queue_position for current in queue], entry.queue_position)
+            queue.insert(index, entry)
+
+    def replace(self, character_id: int, entry: QueueEntry) -> None:
+        """Actualiza una entrada existente (por ejemplo, su estado)"""
+        with self._lock:
+            self._loads.pop(character_id, None)
+            queue = self._queues.get(character_id)
+            if queue is None:
+                return
+            for index, current in enumerate(queue):
+                if current.id == entry.id:
+                    queue[index] = entry
+                    return
+
+    def move(self, character_id: int, entry: QueueEntry) -> None:
+        """Reubica una entrada según su nueva posición manteniendo la cola ordenada"""
+        with self._lock:
+            self._loads.pop(character_id, None)
+            queue = self._queues.get(character_id)
+            if queue is None:
+                return
+            entries = [current for current in queue if current.id != entry.id]
+            if len(entries) == len(queue):
+                # La entrada no estaba: la copia en caché no es confiable
+                del self._queues[character_id]
+                return
+            index = bisect_left([current.queue_position for current in entries], entry.queue_position)
+            entries.insert(index, entry)
+            self._queues[character_id] = deque(entries)
+
+    def remove(self, character_id: int, entry_id: int) -> None:
+        """Quita una entrada de la cola; O(1) cuando es la cabeza"""
+        with self._lock:
+            self._loads.pop(character_id, None)
+            queue = self._queues.get(character_id)
+            if not queue:
+                return
+            if queue[0].id == entry_id:
+                queue.popleft()
+                return
+            for current in queue:
+                if current.id == entry_id:
+                    queue.remove(current)
+                    return
+
+    def invalidate(self, character_id: int) -> None:
+        """Descarta la cola de un personaje; se recargará en el próximo acceso"""
+        with self._lock:
+            self._loads.pop(character_id, None)
+            self._queues.pop(character_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._loads.clear()
+            self._queues.clear()
+
 
-class MissionQueue:    
-    def __init__(self, db: Session, character_id: int):
+queue_cache = MissionQueueCache()
+
+_HOOKS_KEY = "mission_queue_hooks"
+# Acciones sin estado que deshacer (eventos, clasificación): se descartan si hay rollback
+_AFTER_COMMIT_KEY = "mission_queue_after_commit"
+# Sesiones de GroupCommitWriter: su commit solo libera un SAVEPOINT. La caché se
+# actualiza en ese momento (las operaciones siguientes del lote la leen), pero los
+# eventos y la clasificación esperan al commit de la transacción del lote
+DEFERRED_HOOKS_KEY = "mission_queue_deferred_hooks"
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_cache_hooks(session):
+    """Aplica a la caché los cambios de las escrituras ya confirmadas, publica sus eventos y actualiza la clasificación"""
+    hooks = session.info.pop(_HOOKS_KEY, [])
+    actions = session.info.pop(_AFTER_COMMIT_KEY, [])
+    for cache, character_id, apply in hooks:
+        apply()
+    deferred = session.info.get(DEFERRED_HOOKS_KEY)
+    if deferred is not None:
+        deferred.append((hooks, actions))
+        return
+    for apply in actions:
+        apply()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_hooks(session):
+    """Descarta los cambios pendientes e invalida las colas afectadas"""
+    for cache, character_id, apply in session.info.pop(_HOOKS_KEY, []):
+        cache.invalidate(character_id)
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+
+
+class _QueueHooks:
+    """Cambios de caché, eventos y clasificación que una cola aplica tras su commit.
+
+    Se guardan en el info de la sesión; con AsyncSession, info es el de su Session
+    sync, así los mismos listeners de after_commit/after_rollback los aplican.
+    """
+
+    def _entry(self, mission: CharacterMission) -> QueueEntry:
+        return QueueEntry(mission.id, mission.mission_id, mission.status, mission.queue_position)
+
+    def _on_commit(self, apply) -> None:
+        """Registra un cambio de caché que se aplica solo si el commit tiene éxito"""
+        if self.cache is not None:
+            self.db.info.setdefault(_HOOKS_KEY, []).append((self.cache, self.character_id, apply))
+
+    def _after_commit(self, apply) -> None:
+        """Registra una acción que se ejecuta solo si el commit tiene éxito"""
+        self.db.info.setdefault(_AFTER_COMMIT_KEY, []).append(apply)
+
+    def _publish(self, payload: dict) -> None:
+        """Registra un evento para los suscriptores del personaje; se publica solo si el commit tiene éxito"""
+        if self.events is not None:
+            self._after_commit(lambda: self.events.publish(self.character_id, payload))
+
+
+class MissionQueue(_QueueHooks):
+    def __init__(
+        self,
+        db: Session,
+        character_id: int,
+        cache: Optional[MissionQueueCache] = None,
+        catalog: Optional[MissionCatalog] = None,
+        events: Optional[EventHub] = None,
+        leaderboard: Optional[Leaderboard] = None
+    ):
         """Inicializa la cola de misiones para un personaje específico"""
         self.db = db
         self.character_id = character_id
-    
+        self.cache = cache
+        self.catalog = catalog
+        self.events = events
+        self.leaderboard = leaderboard
+
     def is_empty(self) -> bool:
         """Verifica si la cola de misiones está vacía"""
         return self.size() == 0
-    
+
     def size(self) -> int:
         """Devuelve el número de misiones en la cola"""
-        return self.db.query(CharacterMission).filter(
-            CharacterMission.character_id == self.character_id,
-            CharacterMission.status.in_(["pending", "in_progress"])
-        ).count()
-    
+        cached = self._lookup()
+        if cached is not None:
+            return cached[0]
+        return self.db.scalar(_count_query(self.character_id))
+
     def enqueue(self, mission_id: int) -> CharacterMission:
         """Agrega una misión al final de la cola"""
-        # Obtener la siguiente posición en la cola
-        max_position = self.db.query(func.max(CharacterMission.queue_position)).filter(
-            CharacterMission.character_id == self.character_id
-        ).scalar() or 0
-        
+        # Reservar la siguiente posición incrementando el contador del personaje;
+        # el UPDATE toma el bloqueo de escritura, así dos enqueue no obtienen la misma
+        position = self._reserve_positions(1)
+
         # Crear una nueva misión de personaje con la siguiente posición
         character_mission = CharacterMission(
             character_id=self.character_id,
             mission_id=mission_id,
-            queue_position=max_position + 1,
+            queue_position=position,
             status="pending"
         )
-        
+
         self.db.add(character_mission)
-        self.db.commit()
+        self._flush()
+        self._record_accepted([mission_id])
+        entry = self._entry(character_mission)
+        self._on_commit(lambda: self.cache.append(self.character_id, entry))
+        self._publish({"type": "enqueued", "entries": [entry._asdict()]})
+        self._commit()
         self.db.refresh(character_mission)
-        
+
         return character_mission
-    
-    def dequeue(self) -> CharacterMission:
-        """Elimina y devuelve la misión al frente de la cola (marcar como completada)"""
-        # Obtener la misión con la posición más baja en la cola que no esté completada
+
+    def enqueue_many(self, mission_ids: Iterable[int]) -> List[Tuple[int, str, Optional[CharacterMission]]]:
+        """Agrega varias misiones al final de la cola en una sola transacción.
+
+        Devuelve, en el orden recibido, (mission_id, resultado, entrada) donde el
+        resultado es "accepted", "duplicate" o "not_found".
+        """
+        mission_ids = list(mission_ids)
+        requested = set(mission_ids)
+
+        # Validación por conjuntos: una consulta para existencia y otra para duplicados
+        if self.catalog is not None:
+            existing = set(self.catalog.get_many(self.db, requested))
+        else:
+            existing = set(self.db.scalars(select(Mission.id).where(Mission.id.in_(requested))))
+        active = set(self.db.scalars(
+            select(CharacterMission.mission_id).where(
+                CharacterMission.character_id == self.character_id,
+                CharacterMission.mission_id.in_(existing),
+                CharacterMission.status.in_(ACTIVE_STATUSES)
+            )
+        )) if existing else set()
+
+        outcomes = []
+        accepted = []
+        for mission_id in mission_ids:
+            if mission_id not in existing:
+                outcomes.append((mission_id, "not_found"))
+            elif mission_id in active:
+                outcomes.append((mission_id, "duplicate"))
+            else:
+                active.add(mission_id)
+                accepted.append(mission_id)
+                outcomes.append((mission_id, "accepted"))
+
+        inserted = {}
+        if accepted:
+            first_position = self._reserve_positions(len(accepted))
+            try:
+                rows = self.db.execute(*_insert_entries(self.character_id, first_position, accepted)).all()
+                record_accepted(self.db, self.character_id, accepted, self.catalog)
+            except Exception:
+                self.db.rollback()
+                raise
+            # Las filas devueltas pueden no venir en orden; la posición define el orden de la cola
+            rows.sort(key=lambda row: row.queue_position)
+            entries = [QueueEntry(row.id, row.mission_id, row.status, row.queue_position) for row in rows]
+            self._on_commit(lambda: [self.cache.append(self.character_id, entry) for entry in entries])
+            self._publish({"type": "enqueued", "entries": [entry._asdict() for entry in entries]})
+            self._commit()
+            inserted = {row.mission_id: CharacterMission(**row._mapping) for row in rows}
+
+        return [
+            (mission_id, result, inserted.get(mission_id) if result == "accepted" else None)
+            for mission_id, result in outcomes
+        ]
+
+    def dequeue(self) -> Optional[CharacterMission]:
+        """Elimina y devuelve la misión al frente de la cola (la mueve al historial como completada)"""
+        head = self.peek()
+        if head is None:
+            return None
+
+        archived = _archive(
+            self.db, CharacterMission.id == head.id, CharacterMission.status.in_(ACTIVE_STATUSES), xp_awarded=0
+        )
+        if not archived:
+            # Otra petición la completó primero
+            self.db.rollback()
+            if self.cache is not None:
+                self.cache.invalidate(self.character_id)
+            return None
+
+        # dequeue() no otorga XP; el historial lo guarda para que rebuild_stats() coincida
+        self._record_archived(archived, award_xp=False)
+        self.db.execute(_pending_decrement(self.character_id))
+        self._on_commit(lambda: self.cache.remove(self.character_id, head.id))
+        self._publish({"type": "removed", "id": head.id, "mission_id": head.mission_id, "status": "completed"})
+        self._commit()
+        return CharacterMission(**archived[0])
+
+    def complete(self, mission_id: Optional[int] = None, require_in_progress: bool = False) -> Optional[CharacterMission]:
+        """Completa una misión activa y otorga su XP al personaje en una sola transacción.
+
+        Sin mission_id completa el frente de la cola. La entrada se mueve al historial;
+        el DELETE condicionado al estado actúa como control de concurrencia optimista:
+        si otra petición completó la entrada primero no se otorga XP y se vuelve a
+        buscar el objetivo, ya leído de la base. Devuelve None solo si no queda una
+        entrada que completar (cola vacía, o la misión no está activa).
+
+        Cada vuelta perdida es una entrada que otro completó, así que se reintenta como
+        mucho tantas veces como entradas activas había al perder la primera; si aun así
+        no se completa ninguna (la cola se sigue llenando), levanta ValueError.
+        """
+        statuses = ("in_progress",) if require_in_progress else ACTIVE_STATUSES
+        retries = None
+        while True:
+            if retries is not None:
+                target = self._find_active(mission_id, use_cache=False)
+            else:
+                target = self.peek() if mission_id is None else self._find_active(mission_id)
+            if target is None or target.status not in statuses:
+                return None
+
+            archived = _archive(self.db, CharacterMission.id == target.id, CharacterMission.status.in_(statuses))
+
+            if not archived:
+                # Perdimos la carrera: otra petición completó la entrada y la caché (si la hay)
+                # estaba desactualizada
+                self.db.rollback()
+                if self.cache is not None:
+                    self.cache.invalidate(self.character_id)
+                if retries is None:
+                    retries = self._active_count()
+                if retries <= 0:
+                    raise ValueError("The queue kept changing while completing its head; retry")
+                retries -= 1
+                continue
+
+            self._record_archived(archived)
+            progress = self.db.execute(
+                _progress_statement(self.character_id, self._xp_reward(target.mission_id))
+            ).first()
+            self._on_commit(lambda: self.cache.remove(self.character_id, target.id))
+            if self.leaderboard is not None:
+                self._after_commit(lambda: self.leaderboard.update(
+                    self.character_id, progress.name, progress.level, progress.experience
+                ))
+            self._publish({
+                "type": "completed", "id": target.id, "mission_id": target.mission_id,
+                "experience": progress.experience, "level": progress.level,
+            })
+            self._commit()
+            # Objeto fuera de la sesión construido con el RETURNING; no requiere releer la fila
+            return CharacterMission(**archived[0])
+
+    def peek(self) -> Optional[QueueEntry]:
+        """Devuelve el registro compacto del frente de la cola; sin consultar la base si está en caché"""
+        cached = self._lookup()
+        if cached is not None:
+            return cached[1]
         mission = self.first()
-        
-        if mission:
-            # Marcar como completada
-            mission.status = "completed"
-            mission.completed_at = func.now()
-            self.db.commit()
-            self.db.refresh(mission)
-        
-        return mission
-    
+        return self._entry(mission) if mission else None
+
     def first(self) -> CharacterMission:
         """Devuelve la misión al frente de la cola sin eliminarla"""
+        cached = self._lookup()
+        if cached is not None:
+            head = cached[1]
+            return self.db.get(CharacterMission, head.id) if head else None
         return self.db.query(CharacterMission).filter(
             CharacterMission.character_id == self.character_id,
-            CharacterMission.status.in_(["pending", "in_progress"])
+            CharacterMission.status.in_(ACTIVE_STATUSES)
         ).order_by(CharacterMission.queue_position).first()
-    
+
     def get_all(self):
-        """Devuelve todas las misiones en la cola en orden"""
+        """Devuelve todas las misiones en la cola en orden (las completadas están en el historial)"""
         return self.db.query(CharacterMission).filter(
-            CharacterMission.character_id == self.character_id
+            CharacterMission.character_id == self.character_id,
+            CharacterMission.status.in_(ACTIVE_STATUSES)
         ).order_by(CharacterMission.queue_position).all()
-    
+
     def start_next_mission(self) -> CharacterMission:
         """Inicia la siguiente misión pendiente (primera en la cola)"""
         # Obtener la primera misión pendiente
-        mission = self.db.query(CharacterMission).filter(
-            CharacterMission.character_id == self.character_id,
-            CharacterMission.status == "pending"
-        ).order_by(CharacterMission.queue_position).first()
-        
+        entries = self._entries()
+        if entries is not None:
+            pending = next((e for e in entries if e.status == "pending"), None)
+            mission = self.db.get(CharacterMission, pending.id) if pending else None
+        else:
+            mission = self.db.query(CharacterMission).filter(
+                CharacterMission.character_id == self.character_id,
+                CharacterMission.status == "pending"
+            ).order_by(CharacterMission.queue_position).first()
+
         if mission:
+            # pending_missions cuenta pending e in_progress: el contador no cambia
             mission.status = "in_progress"
-            self.db.commit()
+            entry = self._entry(mission)
+            self._on_commit(lambda: self.cache.replace(self.character_id, entry))
+            self._publish({"type": "started", "entry": entry._asdict()})
+            self._commit()
             self.db.refresh(mission)
-        
-        return mission
\ No newline at end of file
+
+        return mission
+
+    def cancel(self, mission_id: int) -> Optional[CharacterMission]:
+        """Quita una misión activa de la cola; queda en el historial con estado "cancelled" """
+        target = self._find_active(mission_id)
+        if target is None:
+            return None
+
+        archived = _archive(
+            self.db, CharacterMission.id == target.id, CharacterMission.status.in_(ACTIVE_STATUSES),
+            status="cancelled"
+        )
+        if not archived:
+            # Otra petición la completó o canceló primero
+            self.db.rollback()
+            if self.cache is not None:
+                self.cache.invalidate(self.character_id)
+            return None
+
+        self._record_archived(archived)
+        self.db.execute(_pending_decrement(self.character_id))
+        self._on_commit(lambda: self.cache.remove(self.character_id, target.id))
+        self._publish({"type": "removed", "id": target.id, "mission_id": target.mission_id, "status": "cancelled"})
+        self._commit()
+        return CharacterMission(**archived[0])
+
+    def move_to_front(self, mission_id: int) -> Optional[CharacterMission]:
+        """Mueve una misión activa al frente de la cola"""
+        return self._move(mission_id, None, before=True)
+
+    def move_before(self, mission_id: int, anchor_mission_id: int) -> Optional[CharacterMission]:
+        """Mueve una misión activa justo antes de otra misión de la cola"""
+        return self._move(mission_id, anchor_mission_id, before=True)
+
+    def move_after(self, mission_id: int, anchor_mission_id: int) -> Optional[CharacterMission]:
+        """Mueve una misión activa justo después de otra misión de la cola"""
+        return self._move(mission_id, anchor_mission_id, before=False)
+
+    def _move(self, mission_id: int, anchor_mission_id: Optional[int], before: bool) -> Optional[CharacterMission]:
+        """Asigna a la entrada una posición en el hueco entre sus nuevos vecinos; solo escribe esa fila.
+
+        Las misiones en curso quedan fijas delante de las pendientes: el frente de una
+        misión pendiente es justo después de la última en curso, y un movimiento que
+        rompería ese orden levanta ValueError sin cambiar nada.
+        Si el hueco se agotó, la cola se renumera una vez (_rebalance) y se vuelve a calcular.
+        Devuelve None si la misión (o la de referencia) no está activa en la cola.
+        """
+        tail = self._lock_character()
+        rebalanced = False
+        while True:
+            entries = self._active_entries({mission_id, anchor_mission_id} - {None})
+            target = entries.get(mission_id)
+            anchor = entries.get(anchor_mission_id) if anchor_mission_id is not None else None
+            if target is None or (anchor_mission_id is not None and anchor is None):
+                self.db.rollback()
+                return None
+            slot_anchor, slot_before = anchor, before
+            if anchor is None and target.status == "pending":
+                slot_anchor = self._last_in_progress()
+                slot_before = slot_anchor is None
+
+            position, has_gap = self._slot(target, slot_anchor, slot_before, tail)
+            if has_gap or rebalanced:
+                break
+            tail = self._rebalance(tail)
+            rebalanced = True
+
+        if position is not None and not self._keeps_in_progress_first(target, position):
+            self.db.rollback()
+            raise ValueError("A pending mission cannot be moved ahead of a mission in progress")
+
+        if position is None:
+            # Ya está en su lugar (o la cola no admite el cambio); si hubo rebalanceo se confirma
+            if rebalanced:
+                self._on_commit(lambda: self.cache.invalidate(self.character_id))
+                self._publish_reordered()
+                self._commit()
+            else:
+                self.db.rollback()
+            return self.db.get(CharacterMission, target.id)
+
+        row = self.db.execute(_move_statement(target.id, position)).first()
+        if rebalanced:
+            self._on_commit(lambda: self.cache.invalidate(self.character_id))
+            self._publish_reordered()
+        else:
+            entry = QueueEntry(row.id, row.mission_id, row.status, row.queue_position)
+            self._on_commit(lambda: self.cache.move(self.character_id, entry))
+            self._publish({"type": "moved", "entry": entry._asdict()})
+        self._commit()
+        return CharacterMission(**row._mapping)
+
+    def _xp_reward(self, mission_id: int):
+        """XP de la misión: del catálogo en memoria, o una subconsulta dentro del UPDATE"""
+        if self.catalog is not None:
+            record = self.catalog.get(self.db, mission_id)
+            if record is not None:
+                return record.xp_reward
+        return _xp_subquery(mission_id)
+
+    def _find_active(self, mission_id: Optional[int], use_cache: bool = True) -> Optional[QueueEntry]:
+        """Busca la entrada activa de una misión concreta, o el frente de la cola si mission_id es None"""
+        entries = self._entries() if use_cache else None
+        if entries is not None:
+            if mission_id is None:
+                return entries[0] if entries else None
+            return next((e for e in entries if e.mission_id == mission_id), None)
+        row = self.db.execute(_find_query(self.character_id, mission_id)).first()
+        return QueueEntry(*row) if row else None
+
+    def _active_count(self) -> int:
+        """Entradas activas de la cola leídas de la base (sin la caché)"""
+        return self.db.scalar(_count_query(self.character_id))
+
+    def _reserve_positions(self, count: int) -> int:
+        """Reserva `count` posiciones (separadas por POSITION_GAP) al final de la cola y devuelve la primera.
+
+        En la misma sentencia actualiza los contadores desnormalizados del personaje.
+        """
+        next_position = self.db.execute(_reserve_statement(self.character_id, count)).scalar_one_or_none()
+        if next_position is None:
+            self.db.rollback()
+            raise ValueError(f"Character {self.character_id} not found")
+        return next_position - count * POSITION_GAP
+
+    def _lock_character(self) -> int:
+        """Toma el bloqueo de escritura sobre el personaje y devuelve su next_queue_position.
+
+        Serializa los cambios de orden de una misma cola: los vecinos se leen ya con el bloqueo.
+        """
+        next_position = self.db.execute(_lock_statement(self.character_id)).scalar_one_or_none()
+        if next_position is None:
+            self.db.rollback()
+            raise ValueError(f"Character {self.character_id} not found")
+        return next_position
+
+    def _active_entries(self, mission_ids) -> dict:
+        """Entradas activas (leídas de la base) de las misiones indicadas, por mission_id"""
+        rows = self.db.execute(_active_query(self.character_id, CharacterMission.mission_id.in_(mission_ids)))
+        return {row.mission_id: QueueEntry(*row) for row in rows}
+
+    def _position_bound(self, *criteria, highest: bool) -> Optional[int]:
+        """Posición máxima/mínima del personaje que cumple los criterios (todas las filas, por el índice único)"""
+        return self.db.scalar(_position_bound_query(self.character_id, *criteria, highest=highest))
+
+    def _last_in_progress(self) -> Optional[QueueEntry]:
+        """Última entrada en curso de la cola (leída de la base), o None si no hay ninguna"""
+        row = self.db.execute(_last_in_progress_query(self.character_id)).first()
+        return QueueEntry(*row) if row else None
+
+    def _keeps_in_progress_first(self, target: QueueEntry, position: int) -> bool:
+        """Indica si con la posición nueva las misiones en curso siguen delante de todas las pendientes"""
+        criteria, highest = _order_bound(target)
+        return _keeps_order(target, position, self._position_bound(*criteria, highest=highest))
+
+    def _slot(self, target: QueueEntry, anchor: Optional[QueueEntry], before: bool, tail: int):
+        """Devuelve (posición nueva, hay_hueco) para la entrada; posición None si ya está en su lugar"""
+        criteria, highest = _slot_bound(anchor, before)
+        return _slot_position(target, anchor, before, tail, self._position_bound(*criteria, highest=highest))
+
+    def _rebalance(self, tail: int) -> int:
+        """Renumera la cola activa con POSITION_GAP a partir del final; devuelve el nuevo final.
+
+        Las posiciones nuevas quedan por encima de todas las existentes, así la
+        renumeración no choca con el índice único. Solo ocurre cuando se agota un hueco.
+        """
+        ids = list(self.db.scalars(_active_ids_query(self.character_id)))
+        statements, new_tail = _rebalance_statements(self.character_id, tail, ids)
+        for statement, params in statements:
+            self.db.execute(statement, params)
+        return new_tail
+
+    def _entries(self) -> Optional[Tuple[QueueEntry, ...]]:
+        """Cola activa desde la caché, cargándola de la base la primera vez"""
+        if self.cache is None:
+            return None
+        entries = self.cache.entries(self.character_id)
+        if entries is None:
+            entries = self._load()
+        return entries
+
+    def _lookup(self) -> Optional[Tuple[int, Optional[QueueEntry]]]:
+        if self.cache is None:
+            return None
+        cached = self.cache.lookup(self.character_id)
+        if cached is None:
+            entries = self._load()
+            cached = len(entries), (entries[0] if entries else None)
+        return cached
+
+    def _load(self) -> Tuple[QueueEntry, ...]:
+        token = self.cache.begin_load(self.character_id)
+        entries = tuple(QueueEntry(*row) for row in self.db.execute(_queue_query(self.character_id)))
+        self.cache.fill(self.character_id, entries, token)
+        return entries
+
+    def _record_accepted(self, mission_ids: List[int]) -> None:
+        """Suma las aceptaciones a las tablas de estadísticas, en la transacción actual"""
+        try:
+            record_accepted(self.db, self.character_id, mission_ids, self.catalog)
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _record_archived(self, archived: List[Dict], award_xp: bool = True) -> None:
+        """Suma las entradas movidas al historial a las tablas de estadísticas, en la transacción actual"""
+        try:
+            record_archived(self.db, archived, self.catalog, award_xp)
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _publish_reordered(self) -> None:
+        """Tras renumerar, todas las posiciones cambiaron: se publica la cola completa"""
+        if self.events is None:
+            return
+        rows = self.db.execute(_queue_query(self.character_id))
+        self._publish({"type": "reordered", "entries": [QueueEntry(*row)._asdict() for row in rows]})
+
+    def _flush(self) -> None:
+        try:
+            self.db.flush()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _commit(self) -> None:
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+
+# Sentencias y cálculos compartidos por MissionQueue y AsyncMissionQueue: cada
+# versión solo ejecuta (o espera) las sentencias que se arman aquí
+
+
+def _active_query(character_id: int, *criteria):
+    """Entradas activas del personaje, con las columnas de QueueEntry"""
+    return select(*ENTRY_COLUMNS).where(
+        CharacterMission.character_id == character_id,
+        CharacterMission.status.in_(ACTIVE_STATUSES),
+        *criteria
+    )
+
+
+def _queue_query(character_id: int):
+    """Cola activa del personaje en orden"""
+    return _active_query(character_id).order_by(CharacterMission.queue_position)
+
+
+def _active_ids_query(character_id: int):
+    return select(CharacterMission.id).where(
+        CharacterMission.character_id == character_id,
+        CharacterMission.status.in_(ACTIVE_STATUSES)
+    ).order_by(CharacterMission.queue_position)
+
+
+def _find_query(character_id: int, mission_id: Optional[int]):
+    """Entrada activa de una misión, o el frente de la cola si mission_id es None"""
+    if mission_id is None:
+        return _queue_query(character_id).limit(1)
+    return _active_query(character_id, CharacterMission.mission_id == mission_id).limit(1)
+
+
+def _count_query(character_id: int):
+    return select(func.count()).select_from(CharacterMission).where(
+        CharacterMission.character_id == character_id,
+        CharacterMission.status.in_(ACTIVE_STATUSES)
+    )
+
+
+def _pending_query(character_id: int):
+    """Id de la primera entrada pendiente de la cola"""
+    return select(CharacterMission.id).where(
+        CharacterMission.character_id == character_id,
+        CharacterMission.status == "pending"
+    ).order_by(CharacterMission.queue_position).limit(1)
+
+
+def _reserve_statement(character_id: int, count: int):
+    """Reserva count posiciones al final de la cola y actualiza los contadores desnormalizados"""
+    return (
+        update(Character)
+        .where(Character.id == character_id)
+        .values(
+            next_queue_position=Character.next_queue_position + count * POSITION_GAP,
+            mission_count=Character.mission_count + count,
+            pending_missions=Character.pending_missions + count
+        )
+        .returning(Character.next_queue_position)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _lock_statement(character_id: int):
+    """UPDATE sin cambios que toma el bloqueo de escritura sobre el personaje"""
+    return (
+        update(Character)
+        .where(Character.id == character_id)
+        .values(next_queue_position=Character.next_queue_position)
+        .returning(Character.next_queue_position)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _insert_entries(character_id: int, first_position: int, mission_ids: List[int]):
+    """INSERT ... RETURNING de las entradas nuevas, separadas por POSITION_GAP, y sus filas"""
+    return insert(CharacterMission).returning(*CharacterMission.__table__.columns), [
+        {
+            "character_id": character_id,
+            "mission_id": mission_id,
+            "queue_position": first_position + offset * POSITION_GAP,
+            "status": "pending",
+        }
+        for offset, mission_id in enumerate(mission_ids)
+    ]
+
+
+def _start_statement(entry_id: int):
+    return (
+        update(CharacterMission)
+        .where(CharacterMission.id == entry_id, CharacterMission.status == "pending")
+        .values(status="in_progress")
+        .returning(*CharacterMission.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _move_statement(entry_id: int, position: int):
+    return (
+        update(CharacterMission)
+        .where(CharacterMission.id == entry_id)
+        .values(queue_position=position)
+        .returning(*CharacterMission.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _pending_decrement(character_id: int):
+    """Una entrada salió de la cola sin otorgar XP (dequeue o cancelación)"""
+    return (
+        update(Character)
+        .where(Character.id == character_id)
+        .values(pending_missions=Character.pending_missions - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _progress_statement(character_id: int, xp_reward):
+    """XP y subida de nivel en una sola sentencia; el lado derecho usa los valores previos"""
+    return (
+        update(Character)
+        .where(Character.id == character_id)
+        .values(
+            experience=Character.experience + xp_reward,
+            pending_missions=Character.pending_missions - 1,
+            level=case(
+                (Character.experience + xp_reward >= Character.level * XP_PER_LEVEL, Character.level + 1),
+                else_=Character.level
+            )
+        )
+        .returning(Character.name, Character.experience, Character.level)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _xp_subquery(mission_id: int):
+    """XP de la misión como subconsulta dentro del UPDATE, si no está en el catálogo"""
+    return select(Mission.xp_reward).where(Mission.id == mission_id).scalar_subquery()
+
+
+def _position_bound_query(character_id: int, *criteria, highest: bool):
+    """Posición máxima/mínima del personaje que cumple los criterios (todas las filas, por el índice único)"""
+    aggregate = func.max if highest else func.min
+    return select(aggregate(CharacterMission.queue_position)).where(
+        CharacterMission.character_id == character_id, *criteria
+    )
+
+
+def _slot_bound(anchor: Optional[QueueEntry], before: bool):
+    """Criterios y sentido de la posición vecina que, junto al ancla, delimita el hueco"""
+    if anchor is None:
+        return (), False
+    if before:
+        return (CharacterMission.queue_position < anchor.queue_position,), True
+    return (CharacterMission.queue_position > anchor.queue_position,), False
+
+
+def _slot_position(target: QueueEntry, anchor: Optional[QueueEntry], before: bool, tail: int, bound: Optional[int]):
+    """Devuelve (posición nueva, hay_hueco) para la entrada; posición None si ya está en su lugar.
+
+    bound es la posición leída con los criterios de _slot_bound().
+    """
+    if anchor is not None and anchor.id == target.id:
+        return None, True
+    if anchor is None:
+        if bound == target.queue_position:
+            return None, True
+        return bound - POSITION_GAP, True
+    if before:
+        lower, upper = bound, anchor.queue_position
+        if lower == target.queue_position:
+            return None, True
+        if lower is None:
+            return upper - POSITION_GAP, True
+    else:
+        lower, upper = anchor.queue_position, bound
+        if upper == target.queue_position:
+            return None, True
+        if upper is None:
+            # Después del final: el hueco hasta la siguiente posición reservada para encolar
+            upper = tail
+    if upper - lower < 2:
+        return None, False
+    return lower + (upper - lower) // 2, True
+
+
+def _order_bound(target: QueueEntry):
+    """Criterios y sentido de la posición que la entrada no puede cruzar (en curso delante de pendientes)"""
+    if target.status == "pending":
+        return (CharacterMission.status == "in_progress",), True
+    return (CharacterMission.status == "pending",), False
+
+
+def _keeps_order(target: QueueEntry, position: int, bound: Optional[int]) -> bool:
+    """Indica si con la posición nueva las misiones en curso siguen delante de todas las pendientes"""
+    if bound is None:
+        return True
+    return position > bound if target.status == "pending" else position < bound
+
+
+def _last_in_progress_query(character_id: int):
+    """Última entrada en curso de la cola"""
+    return select(*ENTRY_COLUMNS).where(
+        CharacterMission.character_id == character_id,
+        CharacterMission.status == "in_progress"
+    ).order_by(CharacterMission.queue_position.desc()).limit(1)
+
+
+def _rebalance_statements(character_id: int, tail: int, ids: List[int]):
+    """Sentencias que renumeran las entradas (ids en orden de cola) desde tail; y el nuevo final"""
+    new_tail = tail + len(ids) * POSITION_GAP
+    return [
+        (
+            update(Character)
+            .where(Character.id == character_id)
+            .values(next_queue_position=new_tail)
+            .execution_options(synchronize_session=False),
+            None
+        ),
+        (
+            update(CharacterMission),
+            [{"id": entry_id, "queue_position": tail + index * POSITION_GAP} for index, entry_id in enumerate(ids)]
+        ),
+    ], new_tail
+
+
+def _archive_statement(*criteria):
+    return (
+        delete(CharacterMission)
+        .where(*criteria)
+        .returning(*CharacterMission.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _archived(result, status: str) -> List[Dict]:
+    """Filas borradas por _archive_statement(), tal como quedan en el historial"""
+    completed_at = datetime.utcnow()
+    return [{**row._mapping, "status": status, "completed_at": completed_at} for row in result]
+
+
+def _history_rows(rows: List[Dict], xp_awarded: Optional[int]) -> List[Dict]:
+    return [{**row, "xp_awarded": xp_awarded} for row in rows]
+
+
+def _archive(db: Session, *criteria, status: str = "completed", xp_awarded: Optional[int] = None) -> List[Dict]:
+    """Mueve al historial las entradas activas que cumplen los criterios.
+
+    DELETE ... RETURNING e INSERT en la misma transacción; una entrada que otra
+    petición ya movió no se devuelve. Devuelve las filas tal como quedan en el historial
+    (sin xp_awarded, que solo se guarda si no es la XP de la misión).
+    """
+    rows = _archived(db.execute(_archive_statement(*criteria)), status)
+    if rows:
+        db.execute(insert(CharacterMissionHistory), _history_rows(rows, xp_awarded))
+    return rows
+
+
+class TickResult(NamedTuple):
+    """Resumen por personaje de complete_heads()"""
+    character_id: int
+    character_mission_id: int
+    mission_id: int
+    xp_gained: int
+    experience: int
+    level: int
+
+
+def complete_heads(
+    db: Session,
+    character_ids: Optional[Iterable[int]] = None,
+    chunk_size: int = TICK_CHUNK_SIZE,
+    cache: Optional[MissionQueueCache] = None,
+    events: Optional[EventHub] = None,
+    leaderboard: Optional[Leaderboard] = None
+) -> List[TickResult]:
+    """Completa la misión al frente de la cola de muchos personajes (un "tick" del juego).
+
+    Sin character_ids procesa todos los personajes con alguna misión in_progress.
+    Cada bloque de chunk_size personajes es una transacción con sentencias por
+    conjuntos: buscar las cabezas, moverlas al historial, sumar la XP y subir de nivel.
+    """
+    results = []
+    if character_ids is not None:
+        ids = sorted(set(character_ids))
+        for start in range(0, len(ids), chunk_size):
+            results.extend(_complete_heads_chunk(db, ids[start:start + chunk_size], cache, events, leaderboard))
+        return results
+
+    last_id = 0
+    while True:
+        ids = list(db.scalars(_in_progress_characters_query(last_id, chunk_size)))
+        if not ids:
+            return results
+        results.extend(_complete_heads_chunk(db, ids, cache, events, leaderboard))
+        last_id = ids[-1]
+
+
+def _complete_heads_chunk(
+    db: Session,
+    character_ids: List[int],
+    cache: Optional[MissionQueueCache],
+    events: Optional[EventHub],
+    leaderboard: Optional[Leaderboard]
+) -> List[TickResult]:
+    heads = db.execute(_heads_query(character_ids)).all()
+    if not heads:
+        return []
+    xp_by_entry = dict(heads)
+
+    try:
+        # El filtro por estado descarta las cabezas completadas por otra petición mientras tanto
+        completed = _archive(
+            db, CharacterMission.id.in_(xp_by_entry), CharacterMission.status.in_(ACTIVE_STATUSES)
+        )
+        if not completed:
+            db.rollback()
+            return []
+        record_archived(db, completed)
+        characters = db.execute(_gains_statement(completed)).all()
+    except Exception:
+        db.rollback()
+        raise
+
+    progress = _register_tick_hooks(db, completed, characters, cache, events, leaderboard)
+    db.commit()
+    return _tick_results(completed, xp_by_entry, progress)
+
+
+def _in_progress_characters_query(last_id: int, chunk_size: int):
+    """Siguiente bloque de personajes con alguna misión in_progress, por id"""
+    return select(CharacterMission.character_id).distinct().where(
+        CharacterMission.character_id > last_id,
+        CharacterMission.status == "in_progress"
+    ).order_by(CharacterMission.character_id).limit(chunk_size)
+
+
+def _heads_query(character_ids: List[int]):
+    """(id de entrada, XP de su misión) de la cabeza de la cola de cada personaje"""
+    # La cabeza de cada cola es la entrada activa con la menor posición del personaje
+    inner = aliased(CharacterMission)
+    head_position = select(func.min(inner.queue_position)).where(
+        inner.character_id == CharacterMission.character_id,
+        inner.status.in_(ACTIVE_STATUSES)
+    ).correlate(CharacterMission).scalar_subquery()
+    return select(CharacterMission.id, Mission.xp_reward).join(
+        Mission, CharacterMission.mission_id == Mission.id
+    ).where(
+        CharacterMission.character_id.in_(character_ids),
+        CharacterMission.status.in_(ACTIVE_STATUSES),
+        CharacterMission.queue_position == head_position
+    )
+
+
+def _gains_statement(completed: List[Dict]):
+    """Suma la XP de las entradas completadas a cada personaje y sube de nivel; RETURNING del progreso"""
+    gains = select(
+        CharacterMissionHistory.character_id,
+        func.sum(Mission.xp_reward).label("xp"),
+        func.count().label("completed")
+    ).join(
+        Mission, CharacterMissionHistory.mission_id == Mission.id
+    ).where(
+        CharacterMissionHistory.id.in_([row["id"] for row in completed])
+    ).group_by(CharacterMissionHistory.character_id).subquery()
+    return (
+        update(Character)
+        .where(Character.id == gains.c.character_id)
+        .values(
+            experience=Character.experience + gains.c.xp,
+            pending_missions=Character.pending_missions - gains.c.completed,
+            level=case(
+                (Character.experience + gains.c.xp >= Character.level * XP_PER_LEVEL, Character.level + 1),
+                else_=Character.level
+            )
+        )
+        .returning(Character.id, Character.name, Character.experience, Character.level)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _register_tick_hooks(
+    db,
+    completed: List[Dict],
+    characters,
+    cache: Optional[MissionQueueCache],
+    events: Optional[EventHub],
+    leaderboard: Optional[Leaderboard]
+) -> Dict:
+    """Registra en la sesión los cambios de caché, eventos y clasificación del bloque; devuelve el progreso por personaje"""
+    if cache is not None:
+        hooks = db.info.setdefault(_HOOKS_KEY, [])
+        for row in completed:
+            hooks.append((cache, row["character_id"], lambda row=row: cache.remove(row["character_id"], row["id"])))
+    progress = {row.id: row for row in characters}
+    after_commit = db.info.setdefault(_AFTER_COMMIT_KEY, [])
+    if events is not None:
+        for row in completed:
+            payload = {
+                "type": "completed", "id": row["id"], "mission_id": row["mission_id"],
+                "experience": progress[row["character_id"]].experience,
+                "level": progress[row["character_id"]].level,
+            }
+            after_commit.append(lambda row=row, payload=payload: events.publish(row["character_id"], payload))
+    if leaderboard is not None:
+        after_commit.extend(
+            lambda row=row: leaderboard.update(row.id, row.name, row.level, row.experience)
+            for row in characters
+        )
+    return progress
+
+
+def _tick_results(completed: List[Dict], xp_by_entry: Dict[int, int], progress: Dict) -> List[TickResult]:
+    return [
+        TickResult(
+            row["character_id"],
+            row["id"],
+            row["mission_id"],
+            xp_by_entry[row["id"]],
+            progress[row["character_id"]].experience,
+            progress[row["character_id"]].level
+        )
+        for row in sorted(completed, key=lambda row: row["character_id"])
+    ]
@@ -0,0 +1,55 @@
+"""Compara el modo sync (threadpool) con el modo async (RPG_ASYNC=1) bajo carga concurrente.
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_async --requests 5000 --concurrency 64
+
+Levanta uvicorn con cada modo sobre la misma base sembrada y mide throughput y
+latencias p50/p95/p99 de una mezcla de lecturas de perfil, aceptaciones y completados.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+
+from benchmarks.common import (
+    drive, maybe_write_json, mixed_workload, print_table, run_server, seed_database, sqlite_url
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--characters", type=int, default=2000)
+    parser.add_argument("--missions", type=int, default=500)
+    parser.add_argument("--entries", type=int, default=10, help="Entradas de cola sembradas por personaje")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    try:
+        template = os.path.join(workdir, "template.db")
+        seed_database(sqlite_url(workdir, "template.db"), args.characters, args.missions, args.entries)
+
+        results = {}
+        for mode, use_async in (("sync", "0"), ("async", "1")):
+            # Cada modo parte de una copia idéntica de la base sembrada
+            database = os.path.join(workdir, f"{mode}.db")
+            shutil.copyfile(template, database)
+            env = {"RPG_DATABASE_URL": "sqlite:///" + database, "RPG_ASYNC": use_async}
+            with run_server(env) as base_url:
+                stats = asyncio.run(drive(
+                    base_url, mixed_workload(args.characters, args.missions), args.requests, args.concurrency
+                ))
+            results[mode] = stats
+            print_table(stats, f"\nModo {mode} ({args.requests} peticiones, concurrencia {args.concurrency})")
+
+        print_table({mode: stats["total"] for mode, stats in results.items()}, "\nResumen")
+        maybe_write_json(args.json, {"config": vars(args), "results": results})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
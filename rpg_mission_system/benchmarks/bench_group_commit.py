@@ -0,0 +1,129 @@
+"""Compara un commit por escritura con el group commit (GroupCommitWriter) en las colas de misiones.
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_group_commit --threads 32 --ops 100 --profiles wal tuned
+
+Cada hilo representa un cliente con su propio personaje y acepta --ops misiones
+seguidas (MissionQueue.enqueue), sin HTTP. Se mide ops/s con:
+- commit por escritura: una Session por operación, como get_db
+- group commit: las operaciones se entregan a GroupCommitWriter.submit()
+Al final se comprueba que la cola de cada personaje quedó en el orden enviado.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import maybe_write_json, seed_database, sqlite_url
+
+MODES = ("commit por escritura", "group commit")
+
+
+def run(url: str, profile: str, threads: int, ops: int, grouped: bool, max_batch: int, max_delay: float) -> dict:
+    from sqlalchemy import select
+    from sqlalchemy.orm import sessionmaker
+
+    from app.config import Settings
+    from app.database import create_db_engine
+    from app.models.character_mission import CharacterMission
+    from app.tda.group_commit import GroupCommitWriter
+    from app.tda.queue import MissionQueue, MissionQueueCache
+
+    engine = create_db_engine(url, Settings(sqlite_profile=profile, pool_size=threads, max_overflow=0))
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    cache = MissionQueueCache()
+    writer = GroupCommitWriter(max_batch=max_batch, max_delay=max_delay)
+    if grouped:
+        writer.start(engine)
+    barrier = threading.Barrier(threads + 1)
+    failures = []
+
+    def client(character_id: int):
+        barrier.wait()
+        try:
+            for mission_id in range(1, ops + 1):
+                if grouped:
+                    writer.submit(lambda session: MissionQueue(session, character_id, cache=cache).enqueue(mission_id))
+                else:
+                    with SessionLocal() as db:
+                        MissionQueue(db, character_id, cache=cache).enqueue(mission_id)
+        except Exception as exc:
+            failures.append(exc)
+
+    workers = [threading.Thread(target=client, args=(character_id,)) for character_id in range(1, threads + 1)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    writer.stop()
+
+    # Orden FIFO por personaje: posiciones crecientes en el orden en que se enviaron
+    with SessionLocal() as db:
+        for character_id in range(1, threads + 1):
+            queued = list(db.scalars(
+                select(CharacterMission.mission_id)
+                .where(CharacterMission.character_id == character_id)
+                .order_by(CharacterMission.queue_position)
+            ))
+            assert queued == list(range(1, ops + 1)), f"character {character_id}: {queued[:10]}"
+    engine.dispose()
+    if failures:
+        raise failures[0]
+
+    total = threads * ops
+    return {
+        "ops": total,
+        "seconds": round(elapsed, 3),
+        "ops_per_second": round(total / elapsed, 1),
+        "transactions": writer.batches if grouped else total,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32, help="Clientes concurrentes (uno por personaje)")
+    parser.add_argument("--ops", type=int, default=100, help="Misiones aceptadas por cliente")
+    parser.add_argument("--profiles", nargs="+", default=["wal", "tuned"])
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("RPG_METRICS", "0")
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    try:
+        template = os.path.join(workdir, "template.db")
+        seed_database(sqlite_url(workdir, "template.db"), args.threads, args.ops)
+        results = {}
+        for profile in args.profiles:
+            results[profile] = {}
+            for mode in MODES:
+                database = f"{profile}-{MODES.index(mode)}.db"
+                shutil.copyfile(template, os.path.join(workdir, database))
+                results[profile][mode] = run(
+                    sqlite_url(workdir, database), profile, args.threads, args.ops,
+                    grouped=mode == "group commit", max_batch=args.max_batch, max_delay=args.max_delay_ms / 1000
+                )
+            baseline, grouped = (results[profile][mode]["ops_per_second"] for mode in MODES)
+            results[profile]["speedup"] = round(grouped / baseline, 2)
+
+        print(f"\n{args.threads} clientes x {args.ops} escrituras")
+        print(f"  {'perfil':<10}{'modo':<24}{'ops/s':>10}{'transacciones':>15}")
+        for profile, stats in results.items():
+            for mode in MODES:
+                print(f"  {profile:<10}{mode:<24}{stats[mode]['ops_per_second']:>10}{stats[mode]['transactions']:>15}")
+            print(f"  {'':<10}{'mejora':<24}{stats['speedup']:>9}x")
+        maybe_write_json(args.json, {"config": vars(args), "results": results})
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
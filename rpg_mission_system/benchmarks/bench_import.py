@@ -0,0 +1,114 @@
+"""Compara la importación masiva de misiones con crearlas una por una (POST /misiones/).
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_import --missions 10000 100000
+
+Genera un archivo JSON Lines por tamaño y mide, sin HTTP:
+- una por una: create_mission() con su commit y su refresh por fila (solo --single
+  filas; el total se extrapola)
+- importación: import_missions() leyendo el archivo en bloques de --chunk-size
+El pico de memoria de la importación (tracemalloc) no debería crecer con el archivo.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import maybe_write_json, sqlite_url
+
+
+def write_pack(path: str, missions: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as pack:
+        for index in range(1, missions + 1):
+            pack.write(json.dumps({
+                "title": f"Misión {index}",
+                "description": f"Descripción de la misión {index} en la región {rng.randint(1, 50)}",
+                "xp_reward": rng.randint(10, 200),
+                "difficulty": rng.randint(1, 5),
+            }) + "\n")
+
+
+def run(workdir: str, missions: int, single: int, chunk_size: int) -> dict:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.config import settings
+    from app.database import create_db_engine
+    from app.importer import import_missions, parse_rows
+    from app.migrations import run_migrations
+    from app.routers.missions import create_mission
+    from app.schemas.mission import MissionCreate
+
+    pack = os.path.join(workdir, f"pack-{missions}.jsonl")
+    write_pack(pack, missions)
+    results = {}
+
+    # Una por una, con el perfil de SQLite de la app
+    url = sqlite_url(workdir, f"single-{missions}.db")
+    run_migrations(create_engine(url))
+    engine = create_db_engine(url, settings)
+    with sessionmaker(bind=engine, autoflush=False)() as db, open(pack, encoding="utf-8") as source:
+        started = time.perf_counter()
+        for _, line in zip(range(single), source):
+            create_mission(MissionCreate.model_validate_json(line), db=db)
+        elapsed = time.perf_counter() - started
+    engine.dispose()
+    results["single_rows_per_second"] = round(single / elapsed, 1)
+    results["single_estimated_seconds"] = round(missions / (single / elapsed), 1)
+
+    url = sqlite_url(workdir, f"import-{missions}.db")
+    run_migrations(create_engine(url))
+    engine = create_db_engine(url, settings)
+    with sessionmaker(bind=engine, autoflush=False)() as db:
+        with open(pack, encoding="utf-8", newline="") as source:
+            started = time.perf_counter()
+            summary = import_missions(db, parse_rows(source, "jsonl"), chunk_size=chunk_size)
+            elapsed = time.perf_counter() - started
+        assert summary.imported == missions and summary.failed == 0, summary
+        # Segunda pasada solo para la memoria: tracemalloc hace más lenta la importación
+        with open(pack, encoding="utf-8", newline="") as source:
+            tracemalloc.start()
+            import_missions(db, parse_rows(source, "jsonl"), chunk_size=chunk_size)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    engine.dispose()
+    results["import_seconds"] = round(elapsed, 2)
+    results["import_rows_per_second"] = round(missions / elapsed, 1)
+    results["import_peak_mib"] = round(peak / 2 ** 20, 2)
+    results["speedup"] = round(results["import_rows_per_second"] / results["single_rows_per_second"], 1)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--missions", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--single", type=int, default=2000, help="Filas creadas una por una para estimar ese camino")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("RPG_METRICS", "0")
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    try:
+        results = {}
+        print(f"  {'misiones':>10}{'una/s':>10}{'import/s':>12}{'mejora':>9}{'import s':>10}{'pico MiB':>10}")
+        for missions in args.missions:
+            stats = results[missions] = run(workdir, missions, min(args.single, missions), args.chunk_size)
+            print(
+                f"  {missions:>10}{stats['single_rows_per_second']:>10}{stats['import_rows_per_second']:>12}"
+                f"{stats['speedup']:>8}x{stats['import_seconds']:>10}{stats['import_peak_mib']:>10}"
+            )
+        maybe_write_json(args.json, {"config": vars(args), "results": results})
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
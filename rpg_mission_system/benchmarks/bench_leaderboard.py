@@ -0,0 +1,158 @@
+"""Compara la clasificación en memoria con las consultas ORDER BY equivalentes sobre characters.
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_leaderboard --characters 100000
+
+Siembra personajes con nivel y experiencia aleatorios y mide la mediana de:
+- top 10 (GET /clasificacion/)
+- puesto de un personaje (GET /clasificacion/{id}): en SQL, contar los que van delante
+- vecinos de un personaje (GET /clasificacion/{id}/vecinos?window=5)
+- una actualización tras completar una misión (Leaderboard.update)
+Las consultas SQL usan ix_characters_level_experience; el puesto en SQL sigue
+siendo lineal en la cantidad de personajes que van delante.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import and_, create_engine, func, insert, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import SEED_BATCH_SIZE, maybe_write_json, sqlite_url
+
+WINDOW = 5
+
+
+def seed_characters(url: str, characters: int, seed: int = 42) -> None:
+    from app.database import apply_sqlite_pragmas
+    from app.migrations import run_migrations
+    from app.models.character import Character
+
+    rng = random.Random(seed)
+    engine = create_engine(url)
+    apply_sqlite_pragmas(engine, {"synchronous": "OFF"})
+    try:
+        run_migrations(engine)
+        with engine.begin() as conn:
+            for start in range(0, characters, SEED_BATCH_SIZE):
+                rows = []
+                for character_id in range(start + 1, min(characters, start + SEED_BATCH_SIZE) + 1):
+                    level = rng.randint(1, 60)
+                    rows.append({
+                        "id": character_id,
+                        "name": f"Personaje {character_id}",
+                        "level": level,
+                        "experience": rng.randint((level - 1) * 100, level * 100 - 1),
+                    })
+                conn.execute(insert(Character), rows)
+    finally:
+        engine.dispose()
+
+
+def _median_ms(function, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--characters", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=21, help="Repeticiones por medición (se reporta la mediana)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("RPG_METRICS", "0")
+    from app.models.character import Character
+    from app.tda.leaderboard import Leaderboard
+
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    try:
+        url = sqlite_url(workdir)
+        seed_characters(url, args.characters)
+        engine = create_engine(url)
+        db = sessionmaker(bind=engine)()
+        board = Leaderboard()
+        started = time.perf_counter()
+        board.load(db)
+        load_s = time.perf_counter() - started
+        print(f"{args.characters} personajes cargados en la clasificación en {load_s:.2f}s")
+
+        order = (Character.level.desc(), Character.experience.desc(), Character.id)
+        columns = (Character.id, Character.name, Character.level, Character.experience)
+        # Un personaje a mitad de la tabla: el puesto en SQL cuenta ~la mitad de las filas
+        middle = board.top(1, args.characters // 2)[0]
+        target = db.get(Character, middle.id)
+
+        def ahead_of(character):
+            return or_(
+                Character.level > character.level,
+                and_(Character.level == character.level, Character.experience > character.experience),
+                and_(
+                    Character.level == character.level,
+                    Character.experience == character.experience,
+                    Character.id < character.id
+                )
+            )
+
+        def sql_rank():
+            return db.scalar(select(func.count()).select_from(Character).where(ahead_of(target))) + 1
+
+        def sql_neighbors():
+            # El puesto para ubicar la ventana y luego la página alrededor
+            rank = sql_rank()
+            start = max(0, rank - 1 - WINDOW)
+            return db.execute(
+                select(*columns).order_by(*order).offset(start).limit(rank - start + WINDOW)
+            ).all()
+
+        assert sql_rank() == board.rank(target.id).rank
+
+        rng = random.Random(7)
+        ids = [rng.randint(1, args.characters) for _ in range(args.repeat)]
+
+        def update():
+            character_id = ids.pop() if ids else rng.randint(1, args.characters)
+            entry = board.rank(character_id)
+            board.update(character_id, entry.name, entry.level + 1, entry.experience + 150)
+
+        results = {
+            "top 10": (
+                _median_ms(lambda: db.execute(select(*columns).order_by(*order).limit(10)).all(), args.repeat),
+                _median_ms(lambda: board.top(10), args.repeat),
+            ),
+            "puesto": (
+                _median_ms(sql_rank, args.repeat),
+                _median_ms(lambda: board.rank(target.id), args.repeat),
+            ),
+            f"vecinos (±{WINDOW})": (
+                _median_ms(sql_neighbors, args.repeat),
+                _median_ms(lambda: board.around(target.id, WINDOW), args.repeat),
+            ),
+            "actualización": (None, _median_ms(update, args.repeat)),
+        }
+        print(f"\n  {'operación':<16}{'sql ms':>10}{'memoria ms':>12}")
+        for label, (sql_ms, memory_ms) in results.items():
+            print(f"  {label:<16}{sql_ms if sql_ms is not None else '-':>10}{memory_ms:>12}")
+        db.close()
+        engine.dispose()
+        maybe_write_json(args.json, {
+            "config": vars(args),
+            "load_s": round(load_s, 3),
+            "results": {label: {"sql_ms": sql_ms, "memory_ms": memory_ms} for label, (sql_ms, memory_ms) in results.items()},
+        })
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
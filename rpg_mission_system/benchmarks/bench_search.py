@@ -0,0 +1,167 @@
+"""Compara la búsqueda FTS5 de misiones con un recorrido LIKE sobre un catálogo grande.
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_search --missions 100000
+
+Siembra un catálogo con títulos y descripciones generados a partir de un
+vocabulario con frecuencias de tipo Zipf y mide, por consulta, la mediana
+de la primera página con search_missions() (FTS5 + bm25) y con
+title/description LIKE '%palabra%' (sin índice: recorre la tabla).
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from itertools import accumulate
+
+from sqlalchemy import and_, create_engine, insert, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import SEED_BATCH_SIZE, maybe_write_json, sqlite_url
+
+# Vocabulario con frecuencias de tipo Zipf (la palabra en la posición r aparece ~1/r veces):
+# unas pocas palabras están en casi todas las misiones y la mayoría en muy pocas
+NAMED_WORDS = [
+    "mision", "aldea", "bosque", "cueva", "rescatar", "escoltar", "recolectar", "derrotar",
+    "camino", "rey", "tesoro", "montaña", "rio", "mercader", "guardia", "noche",
+]
+RARE_WORDS = ["dragon", "nigromante", "reliquia", "basilisco"]
+SYLLABLES = ["ka", "ro", "mi", "tel", "dor", "van", "su", "le", "gar", "ni", "os", "bre", "tu", "am", "zel", "pi"]
+VOCABULARY_SIZE = 5000
+
+# (etiqueta, texto, filtros)
+QUERIES = [
+    ("muy frecuente", "mision", {}),
+    ("frecuente", "bosque", {}),
+    ("poco frecuente", "dragon", {}),
+    ("rara", "basilisco", {}),
+    ("dos palabras", "cueva dragon", {}),
+    ("prefijo", "nigro", {}),
+    ("rara + filtros", "reliquia", {"min_difficulty": 4, "min_xp": 100}),
+    ("sin resultados", "zafiro", {}),
+]
+
+
+def build_vocabulary(size: int = VOCABULARY_SIZE):
+    """Palabras y pesos acumulados; las nombradas ocupan las primeras posiciones y las raras, posiciones altas"""
+    words = list(NAMED_WORDS)
+    index = 0
+    while len(words) < size:
+        index += 1
+        word, value = "", index
+        while value:
+            value, digit = divmod(value, len(SYLLABLES))
+            word += SYLLABLES[digit]
+        words.append(word)
+    # dragon en la posición 200, basilisco en la 4000, etc.
+    for position, word in zip((200, 1000, 2500, 4000), RARE_WORDS):
+        words.insert(position, word)
+    return words, list(accumulate(1 / (rank + 1) for rank in range(len(words))))
+
+
+def _text(rng: random.Random, vocabulary, words: int) -> str:
+    return " ".join(rng.choices(vocabulary[0], cum_weights=vocabulary[1], k=words))
+
+
+def seed_catalog(url: str, missions: int, seed: int = 42) -> None:
+    from app.database import apply_sqlite_pragmas
+    from app.migrations import run_migrations
+    from app.models.mission import Mission
+
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary()
+    engine = create_engine(url)
+    apply_sqlite_pragmas(engine, {"synchronous": "OFF"})
+    try:
+        run_migrations(engine)
+        # Los triggers de missions_fts indexan cada fila al insertarla
+        with engine.begin() as conn:
+            for start in range(0, missions, SEED_BATCH_SIZE):
+                conn.execute(insert(Mission), [
+                    {
+                        "title": _text(rng, vocabulary, rng.randint(3, 6)).capitalize(),
+                        "description": _text(rng, vocabulary, rng.randint(20, 40)),
+                        "xp_reward": rng.randint(10, 200),
+                        "difficulty": rng.randint(1, 5),
+                    }
+                    for _ in range(start, min(missions, start + SEED_BATCH_SIZE))
+                ])
+    finally:
+        engine.dispose()
+
+
+def _median_ms(function, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--missions", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20, help="Tamaño de página")
+    parser.add_argument("--repeat", type=int, default=9, help="Repeticiones por consulta (se reporta la mediana)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("RPG_METRICS", "0")
+    from app.models.mission import Mission
+    from app.search import search_missions, search_terms
+    from app.tda.catalog import RECORD_COLUMNS
+
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    try:
+        url = sqlite_url(workdir)
+        started = time.perf_counter()
+        seed_catalog(url, args.missions)
+        print(f"Catálogo de {args.missions} misiones sembrado e indexado en {time.perf_counter() - started:.1f}s")
+
+        engine = create_engine(url)
+        db = sessionmaker(bind=engine)()
+
+        def like(text, min_difficulty=None, min_xp=None):
+            # Lo que haría un cliente filtrando sin índice: cada palabra en título o descripción
+            conditions = [
+                or_(Mission.title.like(f"%{term}%"), Mission.description.like(f"%{term}%"))
+                for term in search_terms(text)
+            ]
+            if min_difficulty is not None:
+                conditions.append(Mission.difficulty >= min_difficulty)
+            if min_xp is not None:
+                conditions.append(Mission.xp_reward >= min_xp)
+            return db.execute(
+                select(*RECORD_COLUMNS).where(and_(*conditions)).order_by(Mission.id).limit(args.limit)
+            ).all()
+
+        results = {}
+        print(f"\n  {'consulta':<18}{'texto':<16}{'coinciden':>10}{'fts5 ms':>10}{'like ms':>10}{'mejora':>9}")
+        for label, text, filters in QUERIES:
+            matches = len(search_missions(db, text, limit=args.missions, **filters))
+            fts_ms = _median_ms(lambda: search_missions(db, text, limit=args.limit, **filters), args.repeat)
+            like_ms = _median_ms(lambda: like(text, **filters), args.repeat)
+            results[label] = {
+                "query": text,
+                "filters": filters,
+                "matches": matches,
+                "fts_ms": fts_ms,
+                "like_ms": like_ms,
+                "speedup": round(like_ms / fts_ms, 1) if fts_ms else None,
+            }
+            print(f"  {label:<18}{text:<16}{matches:>10}{fts_ms:>10}{like_ms:>10}{results[label]['speedup']:>8}x")
+        db.close()
+        engine.dispose()
+        maybe_write_json(args.json, {"config": vars(args), "results": results})
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""Microbenchmark de los listados: camino anterior (ORM/pydantic) frente al camino rápido (columnas + orjson).
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_serialization --rows 1000 10000
+
+Para cada tamaño siembra una base SQLite temporal y mide, sin HTTP, el tiempo de
+consulta + serialización a bytes JSON de tres listados:
+- cola de un personaje (GET /personajes/{id}/misiones)
+- personajes (GET /personajes/)
+- misiones (GET /misiones/)
+El camino "antes" reproduce la implementación previa: consulta de 11 columnas con
+join a Character o carga de objetos ORM, validación por fila con el response_model
+(serialize_response de FastAPI) y json.dumps.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.common import maybe_write_json, seed_database, sqlite_url
+
+
+def _time(function, repeat: int) -> float:
+    """Mediana en milisegundos de `repeat` ejecuciones"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def run(rows: int, repeat: int) -> dict:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.character import Character
+    from app.models.character_mission import CharacterMission
+    from app.models.mission import Mission
+    from app.routers import characters
+    from app.schemas.character import Character as CharacterSchema
+    from app.schemas.mission import MissionQueueItem
+    from app.serialization import FastJSONResponse, dumps
+    from app.tda.catalog import MissionCatalog, MissionRecord, RECORD_COLUMNS
+    from app.tda.queue import ACTIVE_STATUSES, MissionQueue
+
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    url = sqlite_url(workdir)
+    seed_database(url, rows, rows)
+    engine = create_engine(url)
+    db = sessionmaker(bind=engine)()
+    loop = asyncio.new_event_loop()
+    try:
+        MissionQueue(db, 1).enqueue_many(range(1, rows + 1))
+        queue_field = create_response_field(name="Response_queue", type_=List[MissionQueueItem])
+        characters_field = create_response_field(name="Response_characters", type_=List[CharacterSchema])
+
+        def validated(field, content) -> bytes:
+            # Lo que hace FastAPI con el valor devuelto por un endpoint con response_model
+            payload = loop.run_until_complete(serialize_response(field=field, response_content=content))
+            return JSONResponse(payload).body
+
+        def queue_before():
+            entries = db.query(
+                CharacterMission.id, CharacterMission.status, CharacterMission.queue_position,
+                CharacterMission.accepted_at, Character.id.label("character_id"),
+                Character.name.label("character_name"), Mission.id.label("mission_id"),
+                Mission.title, Mission.description, Mission.xp_reward, Mission.difficulty
+            ).join(
+                Mission, CharacterMission.mission_id == Mission.id
+            ).join(
+                Character, CharacterMission.character_id == Character.id
+            ).filter(
+                CharacterMission.character_id == 1, CharacterMission.status.in_(ACTIVE_STATUSES)
+            ).order_by(CharacterMission.queue_position).all()
+            return validated(queue_field, entries)
+
+        def queue_after():
+            return FastJSONResponse(characters.character_queue_items(db, 1)).body
+
+        def characters_before():
+            db.expunge_all()
+            return validated(characters_field, db.query(Character).order_by(Character.id).limit(rows).all())
+
+        def characters_after():
+            return characters.get_characters(skip=0, limit=rows, after_id=None, db=db).body
+
+        def missions_before():
+            db.expunge_all()
+            records = [MissionCatalog.record(m) for m in db.query(Mission).order_by(Mission.id).limit(rows).all()]
+            return json.dumps([record._asdict() for record in records], separators=(",", ":")).encode()
+
+        def missions_after():
+            records = [MissionRecord(*row) for row in db.execute(
+                select(*RECORD_COLUMNS).order_by(Mission.id).limit(rows)
+            )]
+            return dumps([record._asdict() for record in records])
+
+        results = {}
+        for name, before, after in (
+            ("GET /personajes/{id}/misiones", queue_before, queue_after),
+            ("GET /personajes/", characters_before, characters_after),
+            ("GET /misiones/", missions_before, missions_after),
+        ):
+            # Mismo contenido en ambos caminos (salvo espacios y escapes)
+            assert json.loads(before()) == json.loads(after()), name
+            before_ms = _time(before, repeat)
+            after_ms = _time(after, repeat)
+            results[name] = {
+                "before_ms": before_ms,
+                "after_ms": after_ms,
+                "speedup": round(before_ms / after_ms, 2) if after_ms else None,
+            }
+        return results
+    finally:
+        loop.close()
+        db.close()
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=7, help="Repeticiones por medición (se reporta la mediana)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    # Las métricas por petición no aplican fuera de HTTP
+    os.environ.setdefault("RPG_METRICS", "0")
+    from app.serialization import orjson
+
+    encoder = "orjson" if orjson is not None else "json"
+    payload = {"encoder": encoder, "results": {}}
+    for rows in args.rows:
+        results = run(rows, args.repeat)
+        payload["results"][rows] = results
+        print(f"\n{rows} filas (encoder {encoder}, mediana de {args.repeat})")
+        print(f"  {'':<32}{'antes ms':>12}{'después ms':>12}{'mejora':>10}")
+        for name, stats in results.items():
+            print(f"  {name:<32}{stats['before_ms']:>12}{stats['after_ms']:>12}{stats['speedup']:>9}x")
+    maybe_write_json(args.json, payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
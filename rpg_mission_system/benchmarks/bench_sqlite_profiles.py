@@ -0,0 +1,66 @@
+"""Mide el throughput de cada perfil de PRAGMAs de SQLite (RPG_SQLITE_PROFILE).
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_sqlite_profiles --requests 4000 --concurrency 32 --write-fraction 0.5
+
+Cada perfil arranca uvicorn sobre una copia idéntica de la base sembrada y recibe la
+misma mezcla de lecturas y escrituras. Con --async también se prueba RPG_ASYNC=1.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+
+from app.config import SQLITE_PROFILES
+from benchmarks.common import (
+    drive, maybe_write_json, mixed_workload, print_table, run_server, seed_database, sqlite_url
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--characters", type=int, default=2000)
+    parser.add_argument("--missions", type=int, default=500)
+    parser.add_argument("--entries", type=int, default=10, help="Entradas de cola sembradas por personaje")
+    parser.add_argument("--write-fraction", type=float, default=0.30, help="Fracción de peticiones que escriben")
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES), choices=list(SQLITE_PROFILES))
+    parser.add_argument("--workers", type=int, default=1, help="Procesos de uvicorn (varios escritores)")
+    parser.add_argument("--async", dest="include_async", action="store_true", help="Probar también RPG_ASYNC=1")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    modes = [("sync", "0")] + ([("async", "1")] if args.include_async else [])
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    try:
+        template = os.path.join(workdir, "template.db")
+        seed_database(sqlite_url(workdir, "template.db"), args.characters, args.missions, args.entries)
+        workload = mixed_workload(args.characters, args.missions, args.write_fraction)
+
+        results = {}
+        for profile in args.profiles:
+            for mode, use_async in modes:
+                name = f"{profile}/{mode}"
+                # La base sembrada queda en modo rollback; WAL lo activa el PRAGMA del perfil
+                database = os.path.join(workdir, f"{profile}-{mode}.db")
+                shutil.copyfile(template, database)
+                env = {"RPG_DATABASE_URL": "sqlite:///" + database, "RPG_ASYNC": use_async, "RPG_SQLITE_PROFILE": profile}
+                with run_server(env, workers=args.workers) as base_url:
+                    stats = asyncio.run(drive(base_url, workload, args.requests, args.concurrency))
+                results[name] = stats
+                print_table(stats, f"\nPerfil {name}")
+
+        print_table(
+            {name: stats["total"] for name, stats in results.items()},
+            f"\nResumen ({args.requests} peticiones, concurrencia {args.concurrency}, "
+            f"{args.workers} worker(s), escrituras {args.write_fraction:.0%})"
+        )
+        maybe_write_json(args.json, {"config": vars(args), "results": results})
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Mide el costo de arranque de la app: importación, lifespan y primeras peticiones.
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_startup --characters 100000 --missions 10000 --entries 10
+
+Siembra una base y mide:
+- importar app.main en un proceso nuevo (mediana de --imports procesos), junto a
+  importar solo las bibliotecas (FastAPI, SQLAlchemy, pydantic) como referencia
+- por cada RPG_WARMUP: arranque del lifespan de create_app() (motor, comprobación de
+  versión y esquema, migraciones, calentamiento) y latencia de la primera y la segunda
+  petición a la clasificación, a una misión y a completar una misión, en el mismo proceso
+- con --server: tiempo hasta la primera respuesta de uvicorn (mediana de --repeat procesos
+  nuevos, incluye importar y arrancar; el sondeo cada 0.1s de run_server fija la resolución)
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+import httpx
+
+from benchmarks.common import PROJECT_DIR, maybe_write_json, run_server, seed_database, sqlite_url
+
+WARMUP_MODES = ("off", "background", "blocking")
+LIBRARIES = "import fastapi, pydantic, sqlalchemy.orm, starlette.middleware.cors"
+
+
+def _import_seconds(statement: str, env: dict) -> float:
+    """Segundos que tarda statement en un intérprete nuevo (sin contar el arranque de Python)"""
+    code = f"import time; started = time.perf_counter(); {statement}; print(time.perf_counter() - started)"
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        cwd=PROJECT_DIR, env={**os.environ, **env}, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def _median_ms(samples) -> float:
+    return round(statistics.median(samples) * 1000, 2)
+
+
+async def _startup(config, requests) -> dict:
+    """Arranca una app nueva, envía cada petición dos veces y la detiene; tiempos en segundos"""
+    from app.main import create_app
+
+    app = create_app(config)
+    timings = {}
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup"] = time.perf_counter() - started
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for label, method, path in requests:
+                for attempt in ("first", "second"):
+                    sent = time.perf_counter()
+                    response = await client.request(method, path)
+                    response.raise_for_status()
+                    timings[f"{label} {attempt}"] = time.perf_counter() - sent
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--characters", type=int, default=100_000)
+    parser.add_argument("--missions", type=int, default=10_000)
+    parser.add_argument("--entries", type=int, default=10, help="Entradas de cola sembradas por personaje")
+    parser.add_argument("--imports", type=int, default=5, help="Procesos para medir la importación (mediana)")
+    parser.add_argument("--repeat", type=int, default=5, help="Arranques por modo de calentamiento (mediana)")
+    parser.add_argument("--server", action="store_true", help="Medir también uvicorn hasta la primera respuesta")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("RPG_METRICS", "0")
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    try:
+        url = sqlite_url(workdir)
+        env = {"RPG_DATABASE_URL": url}
+        heads = seed_database(url, args.characters, args.missions, args.entries)
+        print(f"Base sembrada: {args.characters} personajes, {args.missions} misiones")
+
+        imports = {
+            "bibliotecas": _median_ms([_import_seconds(LIBRARIES, env) for _ in range(args.imports)]),
+            "app.main": _median_ms([_import_seconds("import app.main", env) for _ in range(args.imports)]),
+        }
+        print(f"\n  importación: {imports['app.main']} ms app.main, {imports['bibliotecas']} ms solo bibliotecas")
+
+        from app.config import settings
+
+        # Cada arranque completa la misión al frente de un personaje distinto
+        rng = random.Random(7)
+        characters = iter(rng.sample(sorted(heads), len(WARMUP_MODES) * (args.repeat + 1)))
+
+        def requests():
+            return [
+                ("clasificación", "GET", "/clasificacion/"),
+                ("misión", "GET", f"/misiones/{rng.randint(1, args.missions)}"),
+                ("completar", "POST", f"/personajes/{next(characters)}/completar"),
+            ]
+
+        # Una vuelta descartada: importaciones diferidas y caché de páginas del sistema
+        asyncio.run(_startup(replace(settings, database_url=url, warmup="off"), requests()))
+        startup = {}
+        for mode in WARMUP_MODES:
+            config = replace(settings, database_url=url, warmup=mode)
+            samples = [asyncio.run(_startup(config, requests())) for _ in range(args.repeat)]
+            startup[mode] = {label: _median_ms([sample[label] for sample in samples]) for label in samples[0]}
+        labels = list(startup[WARMUP_MODES[0]])
+        print(f"\n  {'ms':<24}" + "".join(f"{mode:>12}" for mode in WARMUP_MODES))
+        for label in labels:
+            print(f"  {label:<24}" + "".join(f"{startup[mode][label]:>12}" for mode in WARMUP_MODES))
+
+        server = {}
+        if args.server:
+            print("\n  uvicorn hasta la primera respuesta de GET / y de GET /clasificacion/:")
+            for mode in WARMUP_MODES:
+                ready, board = [], []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    with run_server({**env, "RPG_WARMUP": mode, "PYTHONWARNINGS": "ignore"}) as base_url:
+                        ready.append(time.perf_counter() - started)
+                        httpx.get(base_url + "/clasificacion/").raise_for_status()
+                        board.append(time.perf_counter() - started)
+                server[mode] = {"ready_ms": _median_ms(ready), "leaderboard_ms": _median_ms(board)}
+                print(f"  {mode:<12}{server[mode]['ready_ms']:>10} ms{server[mode]['leaderboard_ms']:>10} ms")
+
+        maybe_write_json(args.json, {
+            "config": vars(args),
+            "import_ms": imports,
+            "startup_ms": startup,
+            "server_ms": server,
+        })
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
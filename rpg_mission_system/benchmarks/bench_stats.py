@@ -0,0 +1,161 @@
+"""Compara las estadísticas calculadas con agregaciones en vivo con las tablas de rollups.
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_stats --characters 10000 --entries 50
+
+Siembra personajes con su cola y su historial (seed_database), reconstruye las
+tablas con rebuild_stats() (el backfill) y mide la mediana de:
+- totales de un personaje, de una misión, por dificultad y de los últimos 30 días,
+  con la agregación sobre character_missions y el historial y con los rollups
+- MissionQueue.complete() con y sin la actualización de los rollups
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from sqlalchemy import create_engine, func, select, union_all
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import maybe_write_json, seed_database, sqlite_url
+
+DAYS = 30
+
+
+def _median_ms(function, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--characters", type=int, default=10_000)
+    parser.add_argument("--missions", type=int, default=1000)
+    parser.add_argument("--entries", type=int, default=50, help="Entradas por personaje; la mitad completadas")
+    parser.add_argument("--repeat", type=int, default=21, help="Repeticiones por medición (se reporta la mediana)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("RPG_METRICS", "0")
+    from app.models.character_mission import CharacterMission
+    from app.models.character_mission_history import CharacterMissionHistory as History
+    from app.models.mission import Mission
+    from app.models.stats import CharacterStats, DailyStats, DifficultyStats, MissionStats
+    from app.stats import rebuild_stats
+    from app.tda.catalog import MissionCatalog
+    from app.tda.queue import MissionQueue
+
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    try:
+        url = sqlite_url(workdir)
+        seed_database(url, args.characters, args.missions, args.entries)
+        engine = create_engine(url)
+        db = sessionmaker(bind=engine, autoflush=False)()
+
+        started = time.perf_counter()
+        rebuilt = rebuild_stats(db)
+        rebuild_s = time.perf_counter() - started
+        print(f"rebuild-stats: {rebuilt.entries} entradas en {rebuild_s:.2f}s")
+
+        rng = random.Random(7)
+        character_id = rng.randint(1, args.characters)
+        mission_id = rng.randint(1, args.missions)
+        seconds = (func.julianday(History.completed_at) - func.julianday(History.accepted_at)) * 86400
+        today = datetime.utcnow().date()
+
+        def live_character():
+            db.execute(select(func.count(), func.sum(Mission.xp_reward), func.avg(seconds)).join(
+                Mission, History.mission_id == Mission.id
+            ).where(History.character_id == character_id, History.status == "completed")).one()
+            db.scalar(select(func.count()).select_from(CharacterMission).where(
+                CharacterMission.character_id == character_id
+            ))
+
+        def live_mission():
+            db.execute(select(func.count(), func.avg(seconds)).where(
+                History.mission_id == mission_id, History.status == "completed"
+            )).one()
+            db.scalar(select(func.count()).select_from(CharacterMission).where(
+                CharacterMission.mission_id == mission_id
+            ))
+
+        def live_difficulties():
+            accepted = union_all(
+                select(CharacterMission.mission_id), select(History.mission_id)
+            ).subquery()
+            db.execute(select(Mission.difficulty, func.count()).join(
+                accepted, accepted.c.mission_id == Mission.id
+            ).group_by(Mission.difficulty)).all()
+            db.execute(select(Mission.difficulty, func.count(), func.avg(seconds)).join(
+                Mission, History.mission_id == Mission.id
+            ).where(History.status == "completed").group_by(Mission.difficulty)).all()
+
+        def live_days():
+            day = func.date(History.completed_at)
+            db.execute(select(day, func.count(), func.sum(Mission.xp_reward)).join(
+                Mission, History.mission_id == Mission.id
+            ).where(History.completed_at >= datetime.combine(today - timedelta(days=DAYS - 1), datetime.min.time()))
+              .group_by(day)).all()
+
+        results = {
+            "personaje": (
+                _median_ms(live_character, args.repeat),
+                _median_ms(lambda: db.get(CharacterStats, character_id, populate_existing=True), args.repeat),
+            ),
+            "misión": (
+                _median_ms(live_mission, args.repeat),
+                _median_ms(lambda: db.get(MissionStats, mission_id, populate_existing=True), args.repeat),
+            ),
+            "dificultades": (
+                _median_ms(live_difficulties, args.repeat),
+                _median_ms(lambda: db.scalars(select(DifficultyStats)).all(), args.repeat),
+            ),
+            f"últimos {DAYS} días": (
+                _median_ms(live_days, args.repeat),
+                _median_ms(lambda: db.scalars(select(DailyStats).where(
+                    DailyStats.day.between(today - timedelta(days=DAYS - 1), today)
+                )).all(), args.repeat),
+            ),
+        }
+        print(f"\n  {'estadística':<18}{'en vivo ms':>12}{'rollup ms':>12}")
+        for label, (live_ms, rollup_ms) in results.items():
+            print(f"  {label:<18}{live_ms:>12}{rollup_ms:>12}")
+
+        # complete() sobre personajes distintos, con el catálogo como en los routers:
+        # con rollups y con record_archived anulado
+        characters = iter(rng.sample(range(1, args.characters + 1), 2 * args.repeat))
+        catalog = MissionCatalog()
+
+        def complete():
+            MissionQueue(db, next(characters), catalog=catalog).complete()
+
+        with_rollups = _median_ms(complete, args.repeat)
+        with mock.patch("app.tda.queue.record_archived"):
+            without_rollups = _median_ms(complete, args.repeat)
+        print(f"\n  complete(): {without_rollups} ms sin rollups, {with_rollups} ms con rollups")
+        db.close()
+        engine.dispose()
+
+        maybe_write_json(args.json, {
+            "config": vars(args),
+            "rebuild_s": round(rebuild_s, 3),
+            "results": {label: {"live_ms": live_ms, "rollup_ms": rollup_ms} for label, (live_ms, rollup_ms) in results.items()},
+            "complete_ms": {"without_rollups": without_rollups, "with_rollups": with_rollups},
+        })
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
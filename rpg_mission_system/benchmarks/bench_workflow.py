@@ -0,0 +1,208 @@
+"""Prueba de carga reproducible del flujo de misiones (crear, aceptar, iniciar, completar, listar, detalle).
+
+Uso (desde la carpeta rpg_mission_system):
+    python -m benchmarks.bench_workflow --characters 100000 --missions 10000 --entries 20 --json resultados.json
+    python -m benchmarks.bench_workflow --json nuevo.json --baseline resultados.json --max-regression 0.15
+
+Siembra una base SQLite temporal, ejecuta cada escenario como una fase independiente
+(más una fase "mixed" con todos combinados) contra la app real y reporta throughput y
+latencias p50/p95/p99 por endpoint. Por defecto la app corre en el mismo proceso
+(httpx.ASGITransport); con --server uvicorn se levanta un servidor local.
+Con --baseline compara contra un JSON anterior y termina con código 1 si alguna fase
+empeora más que --max-regression.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.common import (
+    drive, git_revision, maybe_write_json, print_table, run_server, seed_database, sqlite_url
+)
+
+SCENARIOS = ["create", "accept", "list", "detail", "start", "complete", "mixed"]
+# Peso de cada escenario dentro de la fase mixed
+MIXED_WEIGHTS = {"detail": 40, "list": 20, "accept": 15, "start": 10, "complete": 10, "create": 5}
+
+
+def build_scenarios(characters: int, missions: int, heads: Dict[int, int]):
+    """Generadores de peticiones por escenario: make_request(rng) -> (etiqueta, método, ruta, json)"""
+    counter = [0]
+    queued = list(heads)
+
+    def create(rng):
+        counter[0] += 1
+        if rng.random() < 0.5:
+            return "POST /personajes/", "POST", "/personajes/", {"name": f"Bench {counter[0]}"}
+        return "POST /misiones/", "POST", "/misiones/", {
+            "title": f"Bench {counter[0]}",
+            "description": "Mision creada por el benchmark",
+            "xp_reward": rng.randint(10, 200),
+            "difficulty": rng.randint(1, 5),
+        }
+
+    def accept(rng):
+        character_id = rng.randint(1, characters)
+        mission_id = rng.randint(1, missions)
+        return "POST /personajes/{id}/misiones/{mid}", "POST", f"/personajes/{character_id}/misiones/{mission_id}", None
+
+    def list_(rng):
+        roll = rng.random()
+        if roll < 0.4:
+            return "GET /personajes/{id}/misiones", "GET", f"/personajes/{rng.randint(1, characters)}/misiones", None
+        if roll < 0.7:
+            return "GET /personajes/", "GET", f"/personajes/?limit=100&after_id={rng.randint(0, characters)}", None
+        return "GET /misiones/", "GET", f"/misiones/?limit=100&after_id={rng.randint(0, missions)}", None
+
+    def detail(rng):
+        return "GET /personajes/{id}", "GET", f"/personajes/{rng.randint(1, characters)}", None
+
+    def start(rng):
+        # El frente de cada cola se conoce por la siembra; una vez completado la API responde 400
+        character_id = rng.choice(queued) if queued else rng.randint(1, characters)
+        mission_id = heads.get(character_id, 1)
+        return "POST /misiones/{mid}/start", "POST", f"/misiones/{mission_id}/start?character_id={character_id}", None
+
+    def complete(rng):
+        character_id = rng.choice(queued) if queued else rng.randint(1, characters)
+        return "POST /personajes/{id}/completar", "POST", f"/personajes/{character_id}/completar", None
+
+    scenarios = {
+        "create": create, "accept": accept, "list": list_,
+        "detail": detail, "start": start, "complete": complete,
+    }
+    names = list(MIXED_WEIGHTS)
+    weights = [MIXED_WEIGHTS[name] for name in names]
+
+    def mixed(rng):
+        return scenarios[rng.choices(names, weights)[0]](rng)
+
+    scenarios["mixed"] = mixed
+    return scenarios
+
+
+# Parámetros que deben coincidir para que la comparación tenga sentido
+COMPARABLE_CONFIG = ["characters", "missions", "entries", "requests", "concurrency", "server", "workers", "use_async"]
+
+
+def compare(current: dict, config: dict, baseline: dict, max_regression: float) -> bool:
+    """Imprime la diferencia por fase contra el baseline; devuelve False si hay regresiones"""
+    ok = True
+    print(f"\nComparación con baseline (commit {baseline.get('revision') or '?'}, máximo {max_regression:.0%}):")
+    base_config = baseline.get("config", {})
+    differing = [key for key in COMPARABLE_CONFIG if base_config.get(key) != config.get(key)]
+    if differing:
+        print(f"  Aviso: la configuración difiere del baseline en {', '.join(differing)}")
+    for phase, labels in current.items():
+        base_labels = baseline.get("results", {}).get(phase)
+        if not base_labels:
+            print(f"  {phase}: sin datos en el baseline")
+            continue
+        for label, stats in labels.items():
+            base = base_labels.get(label)
+            if not base or not base.get("p95_ms") or not base.get("throughput_rps"):
+                continue
+            p95_delta = stats["p95_ms"] / base["p95_ms"] - 1
+            rps_delta = stats["throughput_rps"] / base["throughput_rps"] - 1
+            regressed = p95_delta > max_regression or rps_delta < -max_regression
+            # Solo los totales de cada fase deciden el resultado; por endpoint es informativo
+            if regressed and label == "total":
+                ok = False
+            print(
+                f"  {'!!' if regressed else '  '} {phase:<9} {label:<40} "
+                f"p95 {base['p95_ms']:>9.2f} -> {stats['p95_ms']:>9.2f} ms ({p95_delta:+.1%})   "
+                f"rps {base['throughput_rps']:>8.1f} -> {stats['throughput_rps']:>8.1f} ({rps_delta:+.1%})"
+            )
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--characters", type=int, default=10_000)
+    parser.add_argument("--missions", type=int, default=1_000)
+    parser.add_argument("--entries", type=int, default=10, help="Entradas de cola sembradas por personaje")
+    parser.add_argument("--completed-fraction", type=float, default=0.5, help="Fracción de entradas ya completadas")
+    parser.add_argument("--requests", type=int, default=2000, help="Peticiones por fase")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--server", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos de uvicorn (solo --server uvicorn)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Usar RPG_ASYNC=1")
+    parser.add_argument("--sqlite-profile", help="RPG_SQLITE_PROFILE a usar (por defecto el de la app)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--max-regression", type=float, default=0.20, help="Regresión tolerada en p95/throughput")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="rpg-bench-")
+    try:
+        url = sqlite_url(workdir)
+        env = {"RPG_DATABASE_URL": url, "RPG_ASYNC": "1" if args.use_async else "0"}
+        if args.sqlite_profile:
+            env["RPG_SQLITE_PROFILE"] = args.sqlite_profile
+        # Antes de importar la app: su configuración se lee del entorno al importarla
+        os.environ.update(env)
+
+        started = time.perf_counter()
+        heads = seed_database(url, args.characters, args.missions, args.entries, args.completed_fraction)
+        seed_seconds = round(time.perf_counter() - started, 2)
+        print(
+            f"Base sembrada en {seed_seconds}s: {args.characters} personajes, {args.missions} misiones, "
+            f"{args.characters * min(args.entries, args.missions)} entradas de cola"
+        )
+        scenarios = build_scenarios(args.characters, args.missions, heads)
+
+        if args.server == "inprocess":
+            results = asyncio.run(_run_phases(args, scenarios))
+        else:
+            results = _run_server_phases(args, env, scenarios)
+
+        print_table(
+            {phase: stats["total"] for phase, stats in results.items()},
+            f"\nResumen por fase ({args.requests} peticiones, concurrencia {args.concurrency}, {args.server})"
+        )
+        payload = {"revision": git_revision(), "config": vars(args), "seed_seconds": seed_seconds, "results": results}
+        maybe_write_json(args.json, payload)
+
+        if args.baseline:
+            with open(args.baseline) as handle:
+                baseline = json.load(handle)
+            if not compare(results, vars(args), baseline, args.max_regression):
+                print("\nRegresión detectada")
+                return 1
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def _run_phases(args, scenarios) -> Dict[str, dict]:
+    import httpx
+    from app.main import create_app
+
+    results = {}
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport no envía los eventos de lifespan: arrancar y detener la app a mano
+    async with app.router.lifespan_context(app):
+        for phase in args.scenarios:
+            results[phase] = await drive("http://bench", scenarios[phase], args.requests, args.concurrency, transport=transport)
+            print_table(results[phase], f"\nFase {phase}")
+    return results
+
+
+def _run_server_phases(args, env, scenarios) -> Dict[str, dict]:
+    results = {}
+    with run_server(env, workers=args.workers) as base_url:
+        for phase in args.scenarios:
+            results[phase] = asyncio.run(drive(base_url, scenarios[phase], args.requests, args.concurrency))
+            print_table(results[phase], f"\nFase {phase}")
+    return results
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""Utilidades compartidas por los benchmarks.
+
+Los benchmarks se ejecutan desde la carpeta rpg_mission_system, por ejemplo:
+    python -m benchmarks.bench_async
+"""
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import create_engine, delete, insert, select
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_BATCH_SIZE = 10_000
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por el método del rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0, rejected: int = 0) -> Dict[str, float]:
+    """Throughput y percentiles (en milisegundos) de una serie de latencias en segundos"""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rejected": rejected,
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+    }
+
+
+def print_table(rows: Dict[str, Dict[str, float]], title: str) -> None:
+    columns = ["requests", "errors", "rejected", "throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+    width = max([len(name) for name in rows] + [10])
+    print(title)
+    print("  " + "".join(name.ljust(width + 2) if i == 0 else name.rjust(15) for i, name in enumerate([""] + columns)))
+    for name, stats in rows.items():
+        print("  " + name.ljust(width + 2) + "".join(str(stats.get(column, "")).rjust(15) for column in columns))
+
+
+def seed_database(
+    url: str,
+    characters: int,
+    missions: int,
+    entries_per_character: int = 0,
+    completed_fraction: float = 0.5,
+    seed: int = 42
+) -> Dict[int, int]:
+    """Crea el esquema y carga datos sintéticos con inserciones por lotes.
+
+    Devuelve la misión al frente de la cola (primera pendiente) de cada personaje.
+    """
+    # Importación diferida: los benchmarks fijan RPG_* antes de cargar la app
+    from app.database import apply_sqlite_pragmas
+    from app.migrations import run_migrations
+    from app.models.character import Character
+    from app.models.character_mission import CharacterMission
+    from app.models.character_mission_history import CharacterMissionHistory
+    from app.models.mission import Mission
+    from app.tda.queue import POSITION_GAP
+
+    rng = random.Random(seed)
+    heads: Dict[int, int] = {}
+    engine = create_engine(url)
+    # La carga inicial no necesita durabilidad
+    apply_sqlite_pragmas(engine, {"synchronous": "OFF"})
+    try:
+        run_migrations(engine)
+        with engine.begin() as conn:
+            for start in range(0, missions, SEED_BATCH_SIZE):
+                conn.execute(insert(Mission), [
+                    {
+                        "title": f"Mision {i}",
+                        "description": f"Descripcion de la mision {i}",
+                        "xp_reward": rng.randint(10, 200),
+                        "difficulty": rng.randint(1, 5),
+                    }
+                    for i in range(start + 1, min(missions, start + SEED_BATCH_SIZE) + 1)
+                ])
+
+        completed = int(entries_per_character * completed_fraction)
+        now = datetime.utcnow()
+        characters_per_batch = max(1, SEED_BATCH_SIZE // max(1, entries_per_character))
+        for start in range(0, characters, characters_per_batch):
+            ids = range(start + 1, min(characters, start + characters_per_batch) + 1)
+            with engine.begin() as conn:
+                conn.execute(insert(Character), [
+                    {
+                        "id": character_id,
+                        "name": f"Personaje {character_id}",
+                        "level": 1,
+                        "experience": 0,
+                        "next_queue_position": (entries_per_character + 1) * POSITION_GAP,
+                        "mission_count": entries_per_character,
+                        "pending_missions": entries_per_character - completed,
+                    }
+                    for character_id in ids
+                ])
+                if entries_per_character:
+                    rows = []
+                    for character_id in ids:
+                        for position, mission_id in enumerate(
+                            rng.sample(range(1, missions + 1), min(entries_per_character, missions)), start=1
+                        ):
+                            done = position <= completed
+                            if position == completed + 1:
+                                heads[character_id] = mission_id
+                            rows.append({
+                                "character_id": character_id,
+                                "mission_id": mission_id,
+                                "queue_position": position * POSITION_GAP,
+                                "status": "completed" if done else "pending",
+                                "accepted_at": now,
+                                "completed_at": now if done else None,
+                            })
+                    conn.execute(insert(CharacterMission), rows)
+
+        if completed:
+            # Las completadas van al historial con su mismo id, como las mueve MissionQueue
+            columns = ["id", "character_id", "mission_id", "queue_position", "status", "accepted_at", "completed_at"]
+            done = CharacterMission.status == "completed"
+            with engine.begin() as conn:
+                conn.execute(insert(CharacterMissionHistory).from_select(
+                    columns, select(*(CharacterMission.__table__.c[name] for name in columns)).where(done)
+                ))
+                conn.execute(delete(CharacterMission).where(done))
+    finally:
+        engine.dispose()
+    return heads
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def run_server(env: Dict[str, str], workers: int = 1, startup_timeout: float = 30.0):
+    """Levanta la app con uvicorn en un subproceso y devuelve su URL base"""
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=PROJECT_DIR,
+        env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                if httpx.get(base_url + "/").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn no arrancó")
+            time.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+async def drive(
+    base_url: str,
+    make_request: Callable[[random.Random], tuple],
+    total_requests: int,
+    concurrency: int,
+    seed: int = 7,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> Dict[str, Dict[str, float]]:
+    """Envía total_requests peticiones con `concurrency` clientes concurrentes.
+
+    make_request(rng) devuelve (etiqueta, método, ruta, json o None). Las respuestas
+    4xx esperables (ej. misión ya aceptada) se cuentan aparte como rechazadas; solo
+    5xx y errores de transporte cuentan como errores. Con transport=httpx.ASGITransport
+    las peticiones van a la app en el mismo proceso.
+    """
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    rejected: Dict[str, int] = {}
+    remaining = [total_requests]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def worker(worker_id: int, client: httpx.AsyncClient):
+        rng = random.Random(seed * 1000 + worker_id)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            label, method, path, body = make_request(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            latencies.setdefault(label, []).append(time.perf_counter() - started)
+            if status is None or status >= 500:
+                errors[label] = errors.get(label, 0) + 1
+            elif status >= 400:
+                rejected[label] = rejected.get(label, 0) + 1
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60, transport=transport) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i, client) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {
+        label: summarize(values, elapsed, errors.get(label, 0), rejected.get(label, 0))
+        for label, values in sorted(latencies.items())
+    }
+    results["total"] = summarize(
+        [v for values in latencies.values() for v in values], elapsed, sum(errors.values()), sum(rejected.values())
+    )
+    return results
+
+
+def mixed_workload(characters: int, missions: int, write_fraction: float = 0.30):
+    """Mezcla de lecturas de perfil con aceptaciones y completados a partes iguales"""
+    def make_request(rng):
+        character_id = rng.randint(1, characters)
+        roll = rng.random()
+        if roll >= write_fraction:
+            return "GET /personajes/{id}", "GET", f"/personajes/{character_id}", None
+        if roll < write_fraction / 2:
+            mission_id = rng.randint(1, missions)
+            return "POST /personajes/{id}/misiones/{mid}", "POST", f"/personajes/{character_id}/misiones/{mission_id}", None
+        return "POST /personajes/{id}/completar", "POST", f"/personajes/{character_id}/completar", None
+    return make_request
+
+
+def sqlite_url(directory: str, name: str = "bench.db") -> str:
+    return "sqlite:///" + os.path.join(directory, name)
+
+
+def git_revision() -> Optional[str]:
+    """Commit actual del repositorio, para poder comparar resultados entre commits"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def maybe_write_json(path: Optional[str], payload) -> None:
+    if path:
+        with open(path, "w") as handle:
+            json.dump(payload, handle, indent=2)
+        print(f"Resultados guardados en {path}")
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""Fixtures de los tests: una base SQLite temporal, migrada, por test.
+
+Correr desde la carpeta rpg_mission_system con python -m pytest (así app se importa
+desde el directorio actual).
+"""
+from dataclasses import replace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database import create_db_engine, create_session_factory
+from app.main import create_app
+from app.migrations import run_migrations
+from app.models.character import Character
+from app.models.mission import Mission
+
+# Misiones sembradas por seed_character, todas con la misma XP
+SEEDED_MISSIONS = 40
+SEEDED_XP = 10
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # Pool grande: los tests de concurrencia abren una sesión por hilo
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", replace(settings, pool_size=32, max_overflow=0))
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def SessionLocal(engine):
+    return create_session_factory(engine)
+
+
+@pytest.fixture
+def client(engine):
+    """La app (routers sync, sin calentamiento) sobre la misma base que SessionLocal"""
+    app = create_app(replace(settings, database_url=str(engine.url), use_async=False, warmup="off"))
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def character_id(SessionLocal) -> int:
+    """Un personaje sin misiones aceptadas y SEEDED_MISSIONS misiones en el catálogo (ids 1..N)"""
+    with SessionLocal() as db:
+        character = Character(name="Test", level=1, experience=0)
+        db.add(character)
+        db.add_all([
+            Mission(title=f"Mision {i}", description="test", xp_reward=SEEDED_XP, difficulty=1)
+            for i in range(1, SEEDED_MISSIONS + 1)
+        ])
+        db.commit()
+        return character.id
\ No newline at end of file
@@ -0,0 +1,66 @@
+import json
+
+
+def _pages(client, path, limit):
+    """Recorre un listado con after_id / X-Next-Cursor; devuelve los ids de cada página"""
+    pages = []
+    response = client.get(path, params={"limit": limit})
+    while True:
+        assert response.status_code == 200
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        assert cursor == str(pages[-1][-1])
+        response = client.get(path, params={"limit": limit, "after_id": cursor})
+
+
+def test_keyset_paging_walks_characters_and_missions(client):
+    for i in range(5):
+        client.post("/personajes/", json={"name": f"Personaje {i}"}).raise_for_status()
+        client.post(
+            "/misiones/", json={"title": f"Mision {i}", "description": "test", "xp_reward": 10, "difficulty": 1}
+        ).raise_for_status()
+
+    for path in ("/personajes/", "/misiones/"):
+        # La última página llena también trae cursor; la siguiente llega vacía y sin él
+        assert _pages(client, path, 2) == [[1, 2], [3, 4], [5]]
+        assert _pages(client, path, 5) == [[1, 2, 3, 4, 5], []]
+
+
+def test_export_lines_use_the_shared_serializer(client, character_id):
+    client.post(f"/personajes/{character_id}/misiones/1").raise_for_status()
+    client.post(f"/personajes/{character_id}/completar").raise_for_status()
+
+    response = client.get(f"/exportar/personajes/{character_id}/misiones")
+    assert response.status_code == 200
+    lines = response.content.splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert (entry["mission_id"], entry["status"]) == (1, "completed")
+    # Fechas en ISO 8601, con el mismo formato que las respuestas JSON de la API
+    history = client.get(f"/personajes/{character_id}/historial").json()
+    assert entry["accepted_at"] == history[0]["accepted_at"]
+
+
+def test_mission_etags_answer_304_until_the_catalog_changes(client, character_id):
+    for path in ("/misiones/", "/misiones/1"):
+        response = client.get(path)
+        etag = response.headers["ETag"]
+        cached = client.get(path, headers={"If-None-Match": etag})
+        assert (cached.status_code, cached.content) == (304, b"")
+        assert cached.headers["ETag"] == etag
+        # Otro ETag en la lista o con prefijo débil también valida
+        assert client.get(path, headers={"If-None-Match": f'"otro", W/{etag}'}).status_code == 304
+        assert client.get(path, headers={"If-None-Match": '"otro"'}).status_code == 200
+
+    listing = client.get("/misiones/", params={"limit": 1000})
+    created = client.post(
+        "/misiones/", json={"title": "Nueva", "description": "test", "xp_reward": 5, "difficulty": 2}
+    ).json()
+    changed = client.get("/misiones/", params={"limit": 1000}, headers={"If-None-Match": listing.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != listing.headers["ETag"]
+    assert changed.json()[-1] == created
+    # La misión nueva ya está en el catálogo en memoria
+    assert client.app.state.services.catalog._cached(created["id"])._asdict() == created
\ No newline at end of file
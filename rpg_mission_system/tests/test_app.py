@@ -0,0 +1,59 @@
+"""create_app(): cada app tiene su motor y sus servicios, y el calentamiento es configurable."""
+from dataclasses import replace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database import create_db_engine, create_session_factory
+from app.main import create_app
+from app.migrations import run_migrations
+from app.models.character import Character
+from app.models.mission import Mission
+
+
+def _database(tmp_path, name: str, characters: int = 0) -> str:
+    """URL de una base migrada con `characters` personajes y una misión"""
+    url = f"sqlite:///{tmp_path / name}"
+    engine = create_db_engine(url)
+    run_migrations(engine)
+    with create_session_factory(engine)() as db:
+        db.add(Mission(title=f"Mision {name}", description="test", xp_reward=10, difficulty=1))
+        db.add_all([Character(name=f"{name} {i}") for i in range(characters)])
+        db.commit()
+    engine.dispose()
+    return url
+
+
+def test_apps_in_one_process_do_not_share_state(tmp_path):
+    configs = [
+        replace(settings, database_url=_database(tmp_path, name), queue_cache=True, warmup="off")
+        for name in ("a.db", "b.db")
+    ]
+    first, second = (create_app(config) for config in configs)
+    assert first.state.services is not second.state.services
+    with TestClient(first) as a, TestClient(second) as b:
+        assert str(first.state.SessionLocal.kw["bind"].url) != str(second.state.SessionLocal.kw["bind"].url)
+        character = a.post("/personajes/", json={"name": "Solo en A"}).json()
+        a.post(f"/personajes/{character['id']}/misiones/1").raise_for_status()
+        a.post(f"/personajes/{character['id']}/completar").raise_for_status()
+
+        assert a.get("/clasificacion/").json()[0]["name"] == "Solo en A"
+        assert b.get("/clasificacion/").json() == []
+        assert b.get(f"/personajes/{character['id']}").status_code == 404
+        assert b.get("/misiones/1").json()["title"] == "Mision b.db"
+        assert second.state.services.queue_cache.entries(character["id"]) is None
+        assert second.state.services.events.sequence == 0
+
+
+@pytest.mark.parametrize("warmup", ["off", "blocking"])
+def test_warmup_modes(tmp_path, warmup):
+    app = create_app(replace(settings, database_url=_database(tmp_path, "warm.db", characters=3), warmup=warmup))
+    services = app.state.services
+    with TestClient(app):
+        # "blocking" termina antes de aceptar peticiones; "off" no toca los servicios al arrancar
+        assert services.leaderboard.loaded == (warmup == "blocking")
+        assert (services.catalog._cached(1) is not None) == (warmup == "blocking")
+        engine = app.state.SessionLocal.kw["bind"]
+        # Sin calentamiento solo queda abierta la conexión de la migración
+        assert engine.pool.checkedin() == (engine.pool.size() if warmup == "blocking" else 1)
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""Modo async (RPG_ASYNC=1): los routers async con AsyncMissionQueue responden igual que los sync."""
+import asyncio
+from dataclasses import replace
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database import create_async_db_engine, create_async_session_factory, create_db_engine
+from app.main import create_app
+from app.migrations import run_migrations
+from app.models.character import Character
+from app.models.character_mission_history import CharacterMissionHistory
+from app.tda.async_queue import AsyncMissionQueue
+from app.tda.queue import MissionQueue
+
+# Campos que dependen del reloj; el resto de cada respuesta debe coincidir entre modos
+_CLOCK_FIELDS = {"accepted_at", "completed_at"}
+
+
+def _app_client(tmp_path, use_async: bool) -> TestClient:
+    url = f"sqlite:///{tmp_path / ('async.db' if use_async else 'sync.db')}"
+    engine = create_db_engine(url)
+    run_migrations(engine)
+    engine.dispose()
+    return TestClient(create_app(replace(settings, database_url=url, use_async=use_async, warmup="off")))
+
+
+def _without_clock(payload):
+    if isinstance(payload, list):
+        return [_without_clock(item) for item in payload]
+    if isinstance(payload, dict):
+        return {key: _without_clock(value) for key, value in payload.items() if key not in _CLOCK_FIELDS}
+    return payload
+
+
+def _workflow(client):
+    """Un recorrido por todos los endpoints de la cola; devuelve (status, cuerpo) de cada llamada"""
+    calls = [("post", "/personajes/", {"name": "Heroe"}), ("post", "/personajes/", {"name": "Rival"})]
+    calls += [
+        ("post", "/misiones/", {"title": f"Mision {i}", "description": "dragon", "xp_reward": 60, "difficulty": 1})
+        for i in range(1, 7)
+    ]
+    calls += [
+        ("post", "/personajes/1/misiones/1", None),
+        ("post", "/personajes/1/misiones/1", None),
+        ("post", "/personajes/1/misiones", {"mission_ids": [2, 3, 4, 99, 2]}),
+        ("post", "/personajes/1/misiones/4/mover", {"position": "front"}),
+        ("post", "/personajes/1/misiones/2/mover", {"position": "after", "anchor_mission_id": 3}),
+        ("post", "/misiones/4/start?character_id=1", None),
+        ("post", "/personajes/1/misiones/1/mover", {"position": "front"}),
+        ("post", "/misiones/4/complete?character_id=1", None),
+        ("post", "/personajes/1/completar", None),
+        ("post", "/personajes/1/misiones/3/cancelar", None),
+        ("post", "/personajes/1/misiones/3/cancelar", None),
+        ("post", "/misiones/5/accept?character_id=2", None),
+        ("post", "/personajes/completar", {"character_ids": [1, 2, 3]}),
+        ("post", "/personajes/2/completar", None),
+        ("post", "/personajes/9/completar", None),
+        ("get", "/personajes/1/misiones?include_history=true", None),
+        ("get", "/personajes/1/historial?limit=2", None),
+        ("get", "/personajes/1", None),
+        ("get", "/personajes/?limit=1", None),
+        ("get", "/misiones/?limit=4", None),
+        ("get", "/misiones/buscar?q=drag&limit=3", None),
+        ("get", "/misiones/6", None),
+        ("get", "/misiones/99", None),
+    ]
+    responses = []
+    for method, path, body in calls:
+        response = client.request(method, path, json=body)
+        responses.append((method, path, response.status_code, _without_clock(response.json())))
+    return responses
+
+
+def test_async_routers_match_sync_routers(tmp_path):
+    with _app_client(tmp_path, use_async=False) as sync_client:
+        expected = _workflow(sync_client)
+    with _app_client(tmp_path, use_async=True) as async_client:
+        assert async_client.app.state.AsyncSessionLocal is not None
+        actual = _workflow(async_client)
+
+    for expected_call, actual_call in zip(expected, actual):
+        assert actual_call == expected_call
+    # El recorrido pasa por errores y por XP/level-up, no solo por caminos felices
+    statuses = {status for _, _, status, _ in expected}
+    assert {200, 400, 404} <= statuses
+    character = next(body for _, path, _, body in expected if path == "/personajes/1")
+    assert character["level"] > 1
+
+
+def test_async_queue_matches_mission_queue(engine, SessionLocal, character_id):
+    """dequeue no da XP (xp_awarded 0), complete sí (NULL: la XP de la misión); contadores como MissionQueue"""
+    async def run():
+        async_engine = create_async_db_engine(replace(settings, database_url=str(engine.url)))
+        try:
+            async with create_async_session_factory(async_engine)() as db:
+                queue = AsyncMissionQueue(db, character_id)
+                results = await queue.enqueue_many([1, 2, 3, 1])
+                assert [result for _, result, _ in results] == ["accepted", "accepted", "accepted", "duplicate"]
+                assert (await queue.dequeue()).mission_id == 1
+                assert (await queue.complete()).mission_id == 2
+                assert [entry.mission_id for entry in await queue.get_all()] == [3]
+                assert await queue.size() == 1
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(run())
+
+    with SessionLocal() as db:
+        character = db.get(Character, character_id)
+        assert (character.experience, character.mission_count, character.pending_missions) == (10, 3, 1)
+        history = db.query(CharacterMissionHistory).order_by(CharacterMissionHistory.mission_id).all()
+        assert [(entry.mission_id, entry.xp_awarded) for entry in history] == [(1, 0), (2, None)]
+        assert MissionQueue(db, character_id).size() == 1
\ No newline at end of file
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.character import Character
+from app.models.character_mission import CharacterMission
+from app.models.mission import Mission
+from app.tda.events import EventHub
+from app.tda.leaderboard import Leaderboard
+from app.tda.queue import MissionQueue, MissionQueueCache, complete_heads
+from tests.conftest import SEEDED_XP
+
+
+def test_stale_cache_head_completes_next_entry(SessionLocal, character_id):
+    cache = MissionQueueCache()
+    with SessionLocal() as db, SessionLocal() as other:
+        queue = MissionQueue(db, character_id, cache=cache)
+        queue.enqueue_many([1, 2, 3])
+        assert queue.peek().mission_id == 1
+        # Otra escritura sin la caché completa el frente: la caché sigue con la misión 1
+        MissionQueue(other, character_id).complete()
+
+        completed = queue.complete()
+        assert completed is not None and completed.mission_id == 2
+        assert [entry.mission_id for entry in queue.get_all()] == [3]
+
+
+def test_complete_in_progress_only(SessionLocal, character_id):
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id)
+        queue.enqueue_many([1, 2])
+        assert queue.complete(mission_id=1, require_in_progress=True) is None
+        queue.start_next_mission()
+        assert queue.complete(mission_id=1, require_in_progress=True).mission_id == 1
+        assert queue.complete(mission_id=1, require_in_progress=True) is None
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_concurrent_completions_never_miss_a_queued_entry(SessionLocal, character_id, cached):
+    cache = MissionQueueCache() if cached else None
+    workers = 30
+    with SessionLocal() as db:
+        MissionQueue(db, character_id, cache=cache).enqueue_many(list(range(1, 41)))
+
+    results = []
+    barrier = threading.Barrier(workers)
+
+    def complete():
+        with SessionLocal() as db:
+            barrier.wait()
+            results.append(MissionQueue(db, character_id, cache=cache).complete())
+
+    threads = [threading.Thread(target=complete) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Quedaban entradas para todas: ninguna petición responde "cola vacía" y ninguna se completa dos veces
+    assert all(result is not None for result in results)
+    assert len({result.id for result in results}) == workers
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(CharacterMission)) == 40 - workers
+        assert db.get(Character, character_id).experience == workers * SEEDED_XP
+
+
+def test_lost_races_are_bounded_by_the_queued_entries(SessionLocal, character_id, monkeypatch):
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id)
+        queue.enqueue_many([1, 2, 3])
+        # Cada intento pierde la carrera: la cola nunca se vacía y complete() no puede girar para siempre
+        monkeypatch.setattr("app.tda.queue._archive", lambda *args, **kwargs: [])
+        with pytest.raises(ValueError):
+            queue.complete()
+        monkeypatch.undo()
+        assert [entry.mission_id for entry in queue.get_all()] == [1, 2, 3]
+
+
+def test_tick_completes_heads_across_chunks(SessionLocal, character_id):
+    cache = MissionQueueCache()
+    leaderboard = Leaderboard()
+    with SessionLocal() as db:
+        # Cuatro personajes con cola y uno sin; la primera cabeza da XP para subir de nivel
+        big = Mission(title="Jefe", description="test", xp_reward=150, difficulty=5)
+        others = [Character(name=f"Otro {i}", level=1, experience=0) for i in range(4)]
+        db.add_all([big, *others])
+        db.commit()
+        busy = [character_id] + [other.id for other in others[:3]]
+        idle = others[3].id
+        MissionQueue(db, character_id, cache=cache).enqueue_many([big.id, 1])
+        for other in busy[1:]:
+            MissionQueue(db, other, cache=cache).enqueue_many([1, 2])
+        for cid in busy:
+            MissionQueue(db, cid, cache=cache).peek()
+
+        async def scenario():
+            events = EventHub()
+            subscription = events.subscribe(character_id)
+            # Bloques de 2: tres transacciones, los ids inexistentes o sin cola se saltan
+            results = complete_heads(
+                db, busy + [idle, 999], chunk_size=2, cache=cache, events=events, leaderboard=leaderboard
+            )
+            return results, await asyncio.wait_for(subscription.get(), 1)
+
+        results, (_, event) = asyncio.run(scenario())
+
+        assert [result.character_id for result in results] == sorted(busy)
+        head = next(result for result in results if result.character_id == character_id)
+        assert (head.mission_id, head.xp_gained, head.experience, head.level) == (big.id, 150, 150, 2)
+        assert all(
+            (result.mission_id, result.xp_gained, result.level) == (1, SEEDED_XP, 1)
+            for result in results if result.character_id != character_id
+        )
+        assert (event["type"], event["id"], event["level"]) == ("completed", head.character_mission_id, 2)
+        assert leaderboard.rank(character_id).level == 2 and leaderboard.rank(idle) is None
+        for cid in busy:
+            assert [entry.mission_id for entry in cache.entries(cid)] == [1 if cid == character_id else 2]
+        assert db.get(Character, idle).experience == 0
+
+        # Sin ids: solo los personajes con una misión in_progress, también de a bloques
+        for cid in busy[1:]:
+            MissionQueue(db, cid).start_next_mission()
+        results = complete_heads(db, chunk_size=1, cache=cache)
+        assert [(result.character_id, result.mission_id) for result in results] == [(cid, 2) for cid in busy[1:]]
+        assert all(cache.entries(cid) == () for cid in busy[1:])
\ No newline at end of file
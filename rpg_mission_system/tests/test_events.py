@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+from app.tda.events import DROPPED, EventHub
+
+
+def test_full_buffer_drops_the_subscriber_without_blocking_the_publisher():
+    async def scenario():
+        hub = EventHub(buffer_size=2)
+        slow = hub.subscribe(1)
+        other = hub.subscribe(2)
+        for i in range(3):
+            hub.publish(1, {"type": "enqueued", "n": i})
+        hub.publish(2, {"type": "enqueued", "n": 0})
+
+        # El buffer se vació y solo queda el aviso final, con la secuencia del evento que no entró
+        assert slow.dropped and slow.queue.qsize() == 1
+        assert await slow.get() == (3, DROPPED)
+        assert (hub.dropped, hub.subscriber_count()) == (1, 1)
+        # Descartado: ya no recibe nada; el otro personaje sigue igual
+        hub.publish(1, {"type": "enqueued", "n": 3})
+        assert slow.queue.empty()
+        assert await other.get() == (4, {"type": "enqueued", "n": 0})
+
+    asyncio.run(scenario())
+
+
+def test_events_published_from_other_threads_keep_their_sequence():
+    async def scenario():
+        hub = EventHub()
+        assert hub.sequence == 0
+        subscription = hub.subscribe(1)
+        # Sin suscriptores el evento no se numera
+        hub.publish(2, {"type": "enqueued"})
+        publisher = threading.Thread(target=lambda: [hub.publish(1, {"type": "moved", "n": i}) for i in range(3)])
+        publisher.start()
+        publisher.join()
+        assert hub.sequence == 3
+        received = [await asyncio.wait_for(subscription.get(), 1) for _ in range(3)]
+        assert [sequence for sequence, event in received] == [1, 2, 3]
+        assert [event["n"] for sequence, event in received] == [0, 1, 2]
+
+    asyncio.run(scenario())
\ No newline at end of file
@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+from sqlalchemy import select
+
+from app.models.character import Character
+from app.models.character_mission import CharacterMission
+from app.models.mission import Mission
+from app.tda.group_commit import GroupCommitWriter
+from app.tda.queue import MissionQueue
+
+
+@pytest.fixture
+def writer(engine):
+    # Espera larga: las operaciones de cada test caen en un solo lote
+    writer = GroupCommitWriter(max_delay=0.5)
+    writer.start(engine)
+    yield writer
+    writer.stop()
+
+
+def submit_all(writer, operations):
+    """Entrega las operaciones a la vez desde un hilo cada una; devuelve resultado o excepción de cada una"""
+    outcomes = [None] * len(operations)
+    barrier = threading.Barrier(len(operations))
+
+    def submit(index, operation):
+        barrier.wait()
+        try:
+            outcomes[index] = writer.submit(operation)
+        except Exception as exc:
+            outcomes[index] = exc
+
+    threads = [threading.Thread(target=submit, args=item) for item in enumerate(operations)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_failed_operation_is_rolled_back_alone(SessionLocal, character_id, writer):
+    def accept(mission_id):
+        return lambda session: MissionQueue(session, character_id).enqueue(mission_id).mission_id
+
+    def fail(session):
+        session.add(Mission(title="Fantasma", description="no se confirma", xp_reward=1, difficulty=1))
+        session.execute(
+            Character.__table__.update().where(Character.id == character_id).values(name="Fantasma")
+        )
+        session.flush()
+        raise RuntimeError("boom")
+
+    def roll_back(session):
+        session.execute(Character.__table__.update().where(Character.id == character_id).values(level=99))
+        session.rollback()
+        return "rolled back"
+
+    outcomes = submit_all(writer, [accept(1), fail, accept(2), roll_back, accept(3)])
+
+    assert writer.batches == 1
+    assert isinstance(outcomes[1], RuntimeError)
+    assert sorted(outcome for outcome in outcomes if isinstance(outcome, int)) == [1, 2, 3]
+    assert "rolled back" in outcomes
+    with SessionLocal() as db:
+        character = db.get(Character, character_id)
+        assert (character.name, character.level) == ("Test", 1)
+        assert db.scalar(select(Mission).where(Mission.title == "Fantasma")) is None
+        queued = db.scalars(
+            select(CharacterMission.mission_id).where(CharacterMission.character_id == character_id)
+        ).all()
+        assert sorted(queued) == [1, 2, 3]
+        assert character.mission_count == character.pending_missions == 3
+
+
+def test_run_outside_the_writer_uses_the_request_session(SessionLocal, character_id):
+    writer = GroupCommitWriter()
+    with SessionLocal() as db:
+        assert writer.run(db, lambda session: session is db)
\ No newline at end of file
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from sqlalchemy import select, text
+
+from app.models.mission import Mission
+
+
+def _mission(title, **overrides):
+    return json.dumps({"title": title, "description": "test", "xp_reward": 10, "difficulty": 1, **overrides})
+
+
+def _titles(SessionLocal):
+    with SessionLocal() as db:
+        return list(db.scalars(select(Mission.title).order_by(Mission.id)))
+
+
+@pytest.mark.parametrize("chunk_size", [2, 100])
+def test_jsonl_bad_rows_are_reported_and_good_rows_in_the_chunk_imported(client, engine, SessionLocal, chunk_size):
+    # Una fila que la base rechaza: el bloque se reintenta fila por fila
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TRIGGER reject_boom BEFORE INSERT ON missions WHEN NEW.title = 'boom' "
+            "BEGIN SELECT RAISE(ABORT, 'boom rejected'); END"
+        ))
+    body = "\n".join([
+        _mission("uno"),
+        "{not json",
+        "",
+        json.dumps({"title": "sin xp", "description": "test", "difficulty": 1}),
+        _mission("dos"),
+        _mission("boom"),
+        _mission("tres"),
+    ]) + "\n"
+
+    response = client.post("/importar/misiones", params={"chunk_size": chunk_size}, content=body.encode())
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["imported"], summary["failed"]) == (3, 3)
+    assert [error["line"] for error in summary["errors"]] == [2, 4, 6]
+    assert "xp_reward" in summary["errors"][1]["error"]
+    assert "boom rejected" in summary["errors"][2]["error"]
+    assert _titles(SessionLocal) == ["uno", "dos", "tres"]
+
+
+def test_csv_errors_use_file_line_numbers(client, SessionLocal):
+    body = (
+        "title,description,xp_reward,difficulty\n"
+        "uno,test,10,1\n"
+        'dos,"dos\nlineas",10,1\n'
+        "tres,test,abc,1\n"
+        "cuatro,test,10,1\n"
+    )
+    response = client.post(
+        "/importar/misiones", params={"chunk_size": 2}, content=body.encode(), headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 200
+    summary = response.json()
+    # El encabezado es la línea 1 y el campo entre comillas ocupa las líneas 3 y 4
+    assert (summary["imported"], summary["failed"]) == (3, 1)
+    assert [error["line"] for error in summary["errors"]] == [5]
+    assert _titles(SessionLocal) == ["uno", "dos", "cuatro"]
\ No newline at end of file
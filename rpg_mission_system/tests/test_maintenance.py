@@ -0,0 +1,50 @@
+from sqlalchemy import update
+
+from app.maintenance import CounterDrift, reconcile_counters
+from app.models.character import Character
+from app.tda.queue import MissionQueue
+
+
+def _counters(SessionLocal, character_id):
+    with SessionLocal() as db:
+        character = db.get(Character, character_id)
+        return character.mission_count, character.pending_missions
+
+
+def test_queue_operations_keep_the_counters(SessionLocal, character_id):
+    steps = [
+        (lambda queue: queue.enqueue_many([1, 2, 3, 4]), (4, 4)),
+        (lambda queue: queue.enqueue(5), (5, 5)),
+        (lambda queue: queue.start_next_mission(), (5, 5)),
+        (lambda queue: queue.complete(), (5, 4)),
+        (lambda queue: queue.cancel(4), (5, 3)),
+        (lambda queue: queue.dequeue(), (5, 2)),
+    ]
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id)
+        for step, expected in steps:
+            step(queue)
+            assert _counters(SessionLocal, character_id) == expected
+        # Los contadores llevados al día coinciden con el recálculo
+        assert reconcile_counters(db, fix=False) == []
+
+
+def test_reconcile_reports_and_fixes_drift(SessionLocal, character_id):
+    with SessionLocal() as db:
+        other = Character(name="Sin misiones")
+        db.add(other)
+        db.commit()
+        MissionQueue(db, character_id).enqueue_many([1, 2, 3])
+        MissionQueue(db, character_id).complete()
+        db.execute(update(Character).where(Character.id == character_id).values(mission_count=7, pending_missions=5))
+        db.execute(update(Character).where(Character.id == other.id).values(pending_missions=1))
+        db.commit()
+
+        expected = [CounterDrift(character_id, 7, 3, 5, 2), CounterDrift(other.id, 0, 0, 1, 0)]
+        assert reconcile_counters(db, fix=False) == expected
+        assert _counters(SessionLocal, character_id) == (7, 5)
+
+        assert reconcile_counters(db) == expected
+        assert _counters(SessionLocal, character_id) == (3, 2)
+        assert _counters(SessionLocal, other.id) == (0, 0)
+        assert reconcile_counters(db, fix=False) == []
\ No newline at end of file
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from app.migrations import run_migrations
+from app.models.character_mission import CharacterMission
+from app.models.character_mission_history import CharacterMissionHistory
+from app.routers.characters import character_queue_items
+from app.tda.queue import MissionQueue
+
+
+def test_migrations_archive_completed_entries_left_in_the_queue(engine, SessionLocal, character_id):
+    completed_at = datetime(2023, 5, 1, 12, 0)
+    with SessionLocal() as db:
+        MissionQueue(db, character_id).enqueue_many([1, 2])
+        # Base anterior al historial: las completadas quedaban en character_missions
+        db.execute(insert(CharacterMission), [{
+            "character_id": character_id,
+            "mission_id": 3,
+            "queue_position": 0,
+            "status": "completed",
+            "accepted_at": completed_at,
+            "completed_at": completed_at,
+        }])
+        db.commit()
+
+    run_migrations(engine)
+
+    with SessionLocal() as db:
+        assert list(db.scalars(select(CharacterMission.mission_id).order_by(CharacterMission.id))) == [1, 2]
+        archived = db.execute(select(CharacterMissionHistory)).scalar_one()
+        assert (archived.mission_id, archived.completed_at, archived.xp_awarded) == (3, completed_at, None)
+        items = character_queue_items(db, character_id, include_history=True)
+        assert sorted(item["title"] for item in items) == ["Mision 1", "Mision 2", "Mision 3"]
\ No newline at end of file
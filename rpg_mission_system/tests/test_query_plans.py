@@ -0,0 +1,14 @@
+from app.query_plans import capture_hot_path_statements, find_full_scans
+
+
+def test_hot_paths_have_no_full_scans(engine):
+    statements = capture_hot_path_statements(engine)
+    assert statements
+    assert find_full_scans(engine, statements) == []
+
+
+def test_missing_index_is_reported(engine):
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_character_mission_history_character_completed")
+    offenders = find_full_scans(engine, capture_hot_path_statements(engine))
+    assert any("character_mission_history" in statement for statement, plan in offenders)
\ No newline at end of file
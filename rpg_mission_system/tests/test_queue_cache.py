@@ -0,0 +1,91 @@
+from dataclasses import replace
+
+import pytest
+
+from app.config import settings
+from app.main import create_app
+from app.models.character_mission import CharacterMission
+from app.tda.queue import ACTIVE_STATUSES, MissionQueue, MissionQueueCache, QueueEntry
+
+
+def active_entries(SessionLocal, character_id):
+    """Cola activa leída de la base con una sesión nueva"""
+    with SessionLocal() as db:
+        rows = db.query(
+            CharacterMission.id,
+            CharacterMission.mission_id,
+            CharacterMission.status,
+            CharacterMission.queue_position
+        ).filter(
+            CharacterMission.character_id == character_id,
+            CharacterMission.status.in_(ACTIVE_STATUSES)
+        ).order_by(CharacterMission.queue_position).all()
+        return tuple(QueueEntry(*row) for row in rows)
+
+
+def test_cache_is_opt_in():
+    assert create_app(replace(settings, queue_cache=False)).state.services.queue_cache is None
+    assert isinstance(create_app(replace(settings, queue_cache=True)).state.services.queue_cache, MissionQueueCache)
+
+
+def test_cache_follows_committed_writes(SessionLocal, character_id):
+    cache = MissionQueueCache()
+    steps = [
+        lambda queue: queue.enqueue_many([1, 2, 3, 4, 5]),
+        lambda queue: queue.start_next_mission(),
+        lambda queue: queue.move_to_front(4),
+        lambda queue: queue.move_after(2, 5),
+        lambda queue: queue.cancel(3),
+        lambda queue: queue.complete(),
+        lambda queue: queue.enqueue(6),
+    ]
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id, cache=cache)
+        queue.size()
+        for step in steps:
+            step(queue)
+            assert cache.entries(character_id) == active_entries(SessionLocal, character_id)
+    assert [entry.mission_id for entry in cache.entries(character_id)] == [4, 5, 2, 6]
+
+
+def test_writes_from_another_session_update_shared_cache(SessionLocal, character_id):
+    cache = MissionQueueCache()
+    with SessionLocal() as first, SessionLocal() as second:
+        MissionQueue(first, character_id, cache=cache).enqueue_many([1, 2])
+        assert MissionQueue(second, character_id, cache=cache).complete().mission_id == 1
+        assert [entry.mission_id for entry in cache.entries(character_id)] == [2]
+        assert MissionQueue(first, character_id, cache=cache).peek().mission_id == 2
+
+
+def test_failed_commit_invalidates_cache(SessionLocal, character_id, monkeypatch):
+    cache = MissionQueueCache()
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id, cache=cache)
+        queue.enqueue_many([1, 2])
+        queue.size()
+        before = cache.entries(character_id)
+        assert before == active_entries(SessionLocal, character_id)
+
+        def fail():
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(db, "commit", fail)
+        with pytest.raises(RuntimeError):
+            queue.enqueue(3)
+        monkeypatch.undo()
+
+        # La entrada que no se confirmó no queda en la caché: la cola se vuelve a leer de la base
+        assert cache.entries(character_id) is None
+        assert active_entries(SessionLocal, character_id) == before
+        assert queue.size() == 2 and cache.entries(character_id) == before
+
+
+def test_appends_applied_out_of_commit_order_keep_position_order():
+    cache = MissionQueueCache()
+    cache.fill(1, [QueueEntry(1, 1, "pending", 1024)], cache.begin_load(1))
+    # Los hooks de dos enqueue llegan al revés: primero la posición mayor
+    cache.append(1, QueueEntry(3, 3, "pending", 3072))
+    cache.append(1, QueueEntry(2, 2, "pending", 2048))
+    cache.append(1, QueueEntry(2, 2, "pending", 2048))
+    assert [entry.id for entry in cache.entries(1)] == [1, 2, 3]
+    assert cache.lookup(1) == (3, QueueEntry(1, 1, "pending", 1024))
\ No newline at end of file
@@ -0,0 +1,81 @@
+import pytest
+
+from app.models.character import Character
+from app.tda.queue import POSITION_GAP, MissionQueue
+
+
+def order(queue):
+    return [entry.mission_id for entry in queue.get_all()]
+
+
+def test_moves_write_only_the_moved_entry(SessionLocal, character_id):
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id)
+        queue.enqueue_many([1, 2, 3, 4])
+        positions = {entry.mission_id: entry.queue_position for entry in queue.get_all()}
+
+        queue.move_to_front(4)
+        queue.move_after(1, 3)
+        queue.move_before(2, 4)
+        assert order(queue) == [2, 4, 3, 1]
+        assert {entry.mission_id: entry.queue_position for entry in queue.get_all()}[3] == positions[3]
+
+
+def test_exhausted_gap_rebalances_once_and_keeps_order(SessionLocal, character_id):
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id)
+        queue.enqueue_many([1, 2, 3, 4])
+        tail = db.get(Character, character_id).next_queue_position
+        # Cada movimiento parte a la mitad el hueco antes de la misión 4: se agota en log2(POSITION_GAP) vueltas
+        expected = [1, 2, 3, 4]
+        for moves in range(POSITION_GAP.bit_length() + 2):
+            moved = 2 if moves % 2 else 3
+            queue.move_before(moved, 4)
+            expected.remove(moved)
+            expected.insert(expected.index(4), moved)
+            assert order(queue) == expected
+
+        # La renumeración deja toda la cola por encima del final anterior
+        positions = [entry.queue_position for entry in queue.get_all()]
+        assert positions == sorted(set(positions))
+        assert min(positions) >= tail
+
+
+def test_front_of_pending_entries_is_after_the_running_mission(SessionLocal, character_id):
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id)
+        queue.enqueue_many([1, 2, 3])
+        queue.start_next_mission()
+
+        queue.move_to_front(3)
+        assert order(queue) == [1, 3, 2]
+        assert queue.peek().mission_id == 1 and queue.peek().status == "in_progress"
+        # La siguiente en empezar es la movida, detrás de la que ya corre
+        queue.complete()
+        assert queue.start_next_mission().mission_id == 3
+
+
+@pytest.mark.parametrize("move", [
+    lambda queue: queue.move_before(2, 1),
+    lambda queue: queue.move_after(1, 2),
+    lambda queue: queue.move_before(1, 3),
+])
+def test_moves_never_put_pending_entries_ahead_of_running_ones(SessionLocal, character_id, move):
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id)
+        queue.enqueue_many([1, 2, 3])
+        queue.start_next_mission()
+
+        with pytest.raises(ValueError):
+            move(queue)
+        assert order(queue) == [1, 2, 3]
+        assert [entry.status for entry in queue.get_all()] == ["in_progress", "pending", "pending"]
+
+
+def test_move_of_inactive_mission_returns_none(SessionLocal, character_id):
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id)
+        queue.enqueue_many([1, 2])
+        assert queue.move_to_front(5) is None
+        assert queue.move_before(1, 5) is None
+        assert order(queue) == [1, 2]
\ No newline at end of file
@@ -0,0 +1,60 @@
+from sqlalchemy import select
+
+from app.models.character import Character
+from app.models.mission import Mission
+from app.models.stats import CharacterStats, DailyStats, DifficultyStats, MissionStats
+from app.stats import rebuild_stats
+from app.tda.catalog import MissionCatalog
+from app.tda.queue import MissionQueue, complete_heads
+
+
+def _rollups(db):
+    """Filas de las cuatro tablas de agregados, ordenadas por clave"""
+    snapshot = {}
+    for model in (CharacterStats, MissionStats, DifficultyStats, DailyStats):
+        columns = list(model.__table__.columns)
+        snapshot[model.__tablename__] = [
+            tuple(round(value, 6) if isinstance(value, float) else value for value in row)
+            for row in db.execute(select(*columns).order_by(*(column for column in columns if column.primary_key)))
+        ]
+    return snapshot
+
+
+def test_incremental_rollups_match_rebuild_stats(SessionLocal, character_id):
+    with SessionLocal() as db:
+        # Misiones con XP y dificultad distintas a las sembradas (ids 41..45)
+        db.add_all([
+            Mission(title=f"Extra {i}", description="test", xp_reward=25 * i, difficulty=i)
+            for i in range(1, 6)
+        ])
+        other = Character(name="Other", level=1, experience=0)
+        db.add(other)
+        db.commit()
+        other_id = other.id
+
+    catalog = MissionCatalog()
+    with SessionLocal() as db:
+        queue = MissionQueue(db, character_id, catalog=catalog)
+        queue.enqueue_many([41, 42, 43, 44, 45, 1, 2])
+        queue.enqueue(3)
+        queue.complete()
+        queue.start_next_mission()
+        queue.complete(mission_id=42, require_in_progress=True)
+        queue.cancel(44)
+        queue.dequeue()
+        queue.complete(mission_id=2)
+
+        other_queue = MissionQueue(db, other_id)
+        other_queue.enqueue_many([41, 43, 45, 5])
+        other_queue.cancel(5)
+        other_queue.start_next_mission()
+        queue.start_next_mission()
+        complete_heads(db)
+        complete_heads(db, [character_id, other_id])
+
+        incremental = _rollups(db)
+        assert incremental["character_stats"] and incremental["daily_stats"]
+
+        rebuild_stats(db)
+        db.commit()
+        assert _rollups(db) == incremental
\ No newline at end of file